@@ -4,19 +4,62 @@ import logging
 from flask import Flask, jsonify
 from config import config
 from extensions import init_extensions, db
-from routes.datasets import datasets_bp
-from routes.ml_models import ml_models_bp
-from routes.api_export import api_export_bp
-from routes.prediction import prediction_bp
-from routes.monitoring import monitoring_bp
+from services.prediction_service import PredictionService
+from services.api_export_service import APIExportService
+from services.warmup_service import WarmupService
+from services.request_log_writer import RequestLogWriter
+from services.usage_counters import UsageCounters
+from services.resource_sampler import ResourceSampler
 
 
-def create_app(config_name='default'):
-    """Factory pour créer l'application Flask"""
+PROFILES = ('full', 'serving')
+
+
+def register_blueprints(app, profile):
+    """
+    Enregistre les routes du profil
+    
+    Les blueprints sont importés ici: un worker 'serving' n'importe ni les
+    routes d'entraînement ni scikit-learn (chargé au premier modèle non compilé).
+    """
+    from routes.prediction import prediction_bp
+    from routes.metrics import metrics_bp
+    
+    app.register_blueprint(prediction_bp)
+    app.register_blueprint(metrics_bp)
+    if profile == 'serving':
+        return
+    
+    from routes.datasets import datasets_bp
+    from routes.ml_models import ml_models_bp
+    from routes.api_export import api_export_bp
+    from routes.monitoring import monitoring_bp
+    from routes.scoring_jobs import scoring_jobs_bp
+    
+    app.register_blueprint(datasets_bp)
+    app.register_blueprint(ml_models_bp)
+    app.register_blueprint(api_export_bp)
+    app.register_blueprint(monitoring_bp)
+    app.register_blueprint(scoring_jobs_bp)
+
+
+def create_app(config_name='default', profile=None):
+    """
+    Factory pour créer l'application Flask
+    
+    Args:
+        config_name: Configuration (development, production)
+        profile: 'full' (défaut) ou 'serving' pour un worker de prédiction seul;
+                 None pour utiliser APP_PROFILE
+    """
     app = Flask(__name__)
     
     # Configuration
     app.config.from_object(config[config_name])
+    profile = profile or app.config['APP_PROFILE']
+    if profile not in PROFILES:
+        raise ValueError(f"Profil inconnu: {profile} (attendu: {', '.join(PROFILES)})")
+    app.config['APP_PROFILE'] = profile
     
     # Créer les dossiers nécessaires
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -24,6 +67,8 @@ def create_app(config_name='default'):
     
     # Initialiser les extensions
     init_extensions(app)
+    PredictionService.init_app(app)
+    APIExportService.init_app(app)
     
     # Configurer le logging
     logging.basicConfig(
@@ -36,11 +81,7 @@ def create_app(config_name='default'):
     )
     
     # Enregistrer les blueprints
-    app.register_blueprint(datasets_bp)
-    app.register_blueprint(ml_models_bp)
-    app.register_blueprint(api_export_bp)
-    app.register_blueprint(prediction_bp)
-    app.register_blueprint(monitoring_bp)
+    register_blueprints(app, profile)
     
     # Error handlers
     @app.errorhandler(404)
@@ -52,14 +93,25 @@ def create_app(config_name='default'):
         app.logger.error(f"Erreur interne: {str(error)}")
         return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Une erreur est survenue'}}), 500
     
-    # Route de santé
+    # Route de santé (503 tant que le préchargement des modèles est en cours)
     @app.route('/health', methods=['GET'])
     def health():
-        return jsonify({'status': 'ok'}), 200
+        if not WarmupService.is_ready():
+            return jsonify({'status': 'warming', 'warmup': WarmupService.get_state()}), 503
+        return jsonify({'status': 'ok', 'warmup': WarmupService.get_state()}), 200
+    
+    # Créer les tables (un worker 'serving' utilise la base préparée par l'application complète)
+    if profile == 'full':
+        with app.app_context():
+            db.create_all()
+    
+    # Écriture différée des logs de requêtes
+    RequestLogWriter.init_app(app)
+    UsageCounters.init_app(app)
+    ResourceSampler.init_app(app)
     
-    # Créer les tables
-    with app.app_context():
-        db.create_all()
+    # Précharger les modèles des APIs actives (optionnel)
+    WarmupService.init_app(app)
     
     return app
 
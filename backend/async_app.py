@@ -0,0 +1,335 @@
+"""Serveur de prédiction asynchrone (aiohttp)
+
+Alternative à app.run pour les routes /api/predict: l'authentification, la
+lecture du JSON et les logs se font sur la boucle asyncio, le décodage et le
+predict des modèles dans un pool de processus (services/prediction_pool.py).
+Les clés, modèles et logs sont ceux de l'application Flask: même base, même
+cache de clés API, même écriture différée des logs de requêtes.
+"""
+import json
+import time
+import asyncio
+import logging
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from extensions import db
+from middleware.api_auth import api_key_error
+from services.api_export_service import APIExportService
+from services.prediction_service import PredictionService
+from services.prediction_pool import PredictionPool, AsyncMicroBatcher
+from services.rate_limiter import RateLimiter
+from services.metrics_service import MetricsService
+from services.request_log_writer import RequestLogWriter
+from services.usage_counters import UsageCounters
+from services.warmup_service import WarmupService
+from utils.api_key_cache import ResolvedModel
+from utils.result_cache import ResultCache
+from utils.timing import PhaseTimer
+from utils.npy_payload import NPY_MIMETYPE, wants_npy, load_npy, dump_npy, npy_headers
+
+logger = logging.getLogger(__name__)
+
+
+def _error(code, message, status):
+    return web.json_response({'error': {'code': code, 'message': message}}, status=status)
+
+
+def _timed_response(response, timer):
+    """Ajoute le header Server-Timing (mêmes phases que le serveur Flask, predict dans le pool)"""
+    response.headers['Server-Timing'] = timer.header()
+    return response
+
+
+def _call_in_app_context(flask_app, func, *args):
+    with flask_app.app_context():
+        return func(*args)
+
+
+async def _run_io(request, func, *args):
+    """Exécute un appel bloquant (base de données) dans le pool de threads d'E/S"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        request.app['io_executor'], _call_in_app_context, request.app['flask_app'], func, *args
+    )
+
+
+async def _record(request, func, *args):
+    """Log et compteurs: sur la boucle si l'écriture est différée, sinon dans un thread"""
+    if RequestLogWriter.is_running() and UsageCounters.is_running():
+        func(*args)
+    else:
+        await _run_io(request, func, *args)
+
+
+async def _authenticate(request):
+    """
+    Valide la clé API et l'ID demandé
+
+    Returns:
+        tuple: (API résolue, None) ou (None, réponse d'erreur)
+    """
+    api_id = int(request.match_info['api_id'])
+    api_key = request.headers.get('X-API-Key')
+
+    api = None
+    if api_key:
+        # Cache des clés en mémoire: aucune E/S en régime établi
+        api = APIExportService.get_cached_api(api_key)
+        if api is None:
+            api = await _run_io(request, APIExportService.resolve_api_key, api_key)
+
+    error = api_key_error(api_key, api)
+    if error:
+        body, status_code = error
+        return None, web.json_response(body, status=status_code)
+
+    if api.id != api_id:
+        return None, _error('API_MISMATCH', 'API key does not match the requested API', 403)
+
+    return api, None
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def _authenticated(handler):
+    """
+    Authentifie la requête et applique les limites de l'API avant le handler
+
+    Même ordre que require_api_key: clé, puis débit et concurrence
+    (RateLimiter, 429 avec Retry-After), puis handler(request, api, timer).
+    """
+    @wraps(handler)
+    async def wrapper(request):
+        timer = PhaseTimer()
+        with timer.phase('auth'):
+            api, error_response = await _authenticate(request)
+        if error_response is not None:
+            return _observed(None, handler, _timed_response(error_response, timer), timer)
+
+        rejection = RateLimiter.admit(api)
+        if rejection:
+            body, status_code, retry_after = rejection
+            response = web.json_response(body, status=status_code, headers={'Retry-After': str(retry_after)})
+            return _observed(api.id, handler, _timed_response(response, timer), timer)
+
+        try:
+            return _observed(api.id, handler, _timed_response(await handler(request, api, timer), timer), timer)
+        finally:
+            RateLimiter.release(api)
+
+    return wrapper
+
+
+def _observed(api_id, handler, response, timer):
+    MetricsService.observe_request(api_id, handler.__name__, response.status, timer)
+    return response
+
+
+async def _predict_decoded(api, input_data, timer):
+    """
+    Prédiction unitaire avec le cache de résultats et le micro-batching de l'API
+
+    Mêmes réglages et mêmes phases que PredictionService.predict: la ligne est
+    décodée sur la boucle (clé du cache, empilement des requêtes regroupées),
+    seul le predict part dans le pool.
+
+    Returns:
+        list ou numpy array: Prédiction de la ligne
+    """
+    with timer.phase('load'):
+        spec = await PredictionPool.input_spec(api.model)
+    with timer.phase('decode'):
+        X = spec.decode(input_data)
+
+    result_cache = PredictionService._result_cache(api) if api.result_cache_enabled else None
+    if result_cache is not None:
+        lookup_start = time.perf_counter()
+        cache_key = ResultCache.make_key(PredictionService._model_version(api.model), X)
+        cached = result_cache.get(cache_key)
+        timer.add('cache_hit' if cached is not None else 'cache', time.perf_counter() - lookup_start)
+        if cached is not None:
+            return cached
+
+    # Avec le micro-batching, inclut l'attente de la fenêtre de regroupement
+    with timer.phase('predict'):
+        if api.micro_batch_enabled:
+            batcher = AsyncMicroBatcher.for_api(api.id, api.micro_batch_window_ms, api.micro_batch_max_size)
+            prediction = await batcher.submit(api.model, X)
+        else:
+            prediction = await PredictionPool.predict_encoded(api.model, X)
+
+    if result_cache is not None:
+        result_cache.put(cache_key, prediction.tolist())
+    return prediction
+
+
+@_authenticated
+async def predict(request, api, timer):
+    """POST /api/predict/<api_id>: même contrat que la route Flask"""
+    with timer.phase('parse'):
+        input_data = await _read_json(request)
+    if not input_data:
+        return _error('MISSING_DATA', 'Request body is required', 400)
+
+    start_time = time.time()
+    try:
+        if api.result_cache_enabled or api.micro_batch_enabled:
+            prediction = await _predict_decoded(api, input_data, timer)
+        else:
+            # Chargement, décodage et predict dans un processus du pool (attente incluse)
+            with timer.phase('predict'):
+                prediction = await PredictionPool.predict(api.model, input_data)
+        with timer.phase('serialize'):
+            result = PredictionService.build_result(api, prediction)
+            request_data, response_data = json.dumps(input_data), json.dumps(result)
+    except Exception as e:
+        await _record(
+            request, PredictionService.record_failure, api.id, json.dumps(input_data), start_time, e,
+            timer.durations_ms()
+        )
+        if isinstance(e, ValueError):
+            return _error('VALIDATION_ERROR', str(e), 400)
+        logger.error(f"Erreur prediction: {str(e)}", exc_info=True)
+        return _error('PREDICTION_ERROR', 'An error occurred during prediction', 500)
+
+    phases = timer.durations_ms()
+    with timer.phase('log'):
+        await _record(request, PredictionService.record_success, api.id, request_data, response_data, start_time, phases)
+    return web.json_response(result)
+
+
+@_authenticated
+async def predict_batch(request, api, timer):
+    """POST /api/predict/<api_id>/batch: même contrat que la route Flask (JSON ou .npy)"""
+    binary_input = request.content_type == NPY_MIMETYPE
+    binary_output = wants_npy(request.headers.get('Accept'))
+    with timer.phase('parse'):
+        if binary_input:
+            try:
+                payload = load_npy(await request.read())
+            except ValueError as e:
+                return _error('VALIDATION_ERROR', str(e), 400)
+        else:
+            payload = await _read_json(request)
+    if not binary_input and not payload:
+        return _error('MISSING_DATA', 'Request body is required', 400)
+
+    start_time = time.time()
+    batch_size = None
+    try:
+        records = PredictionService._normalize_batch(payload)
+        batch_size = len(records)
+
+        max_batch_size = request.app['flask_app'].config['PREDICTION_MAX_BATCH_SIZE']
+        if max_batch_size and batch_size > max_batch_size:
+            raise ValueError(f"Lot trop volumineux: {batch_size} enregistrements (max {max_batch_size})")
+
+        with timer.phase('predict'):
+            if binary_input:
+                predictions, errors = await PredictionPool.predict_array(api.model, records), []
+            else:
+                predictions, errors = await PredictionPool.predict_records(api.model, records)
+        with timer.phase('serialize'):
+            predictions = PredictionService.format_predictions(predictions, errors, binary_output)
+            result = PredictionService.build_batch_result(api, predictions, errors)
+            body = dump_npy(predictions) if binary_output else None
+    except Exception as e:
+        await _record(
+            request, PredictionService.record_failure, api.id, json.dumps({'batch_size': batch_size}), start_time, e,
+            timer.durations_ms()
+        )
+        if isinstance(e, ValueError):
+            return _error('VALIDATION_ERROR', str(e), 400)
+        logger.error(f"Erreur batch prediction: {str(e)}", exc_info=True)
+        return _error('PREDICTION_ERROR', 'An error occurred during prediction', 500)
+
+    phases = timer.durations_ms()
+    with timer.phase('log'):
+        await _record(
+            request, PredictionService.record_success, api.id,
+            json.dumps({'batch_size': batch_size}), PredictionService.batch_log_summary(result), start_time, phases
+        )
+    if binary_output:
+        return web.Response(body=body, content_type=NPY_MIMETYPE, headers=npy_headers(result))
+    return web.json_response(result)
+
+
+@_authenticated
+async def get_api_info(request, api, timer):
+    """GET /api/predict/<api_id>/info"""
+    return web.json_response({
+        'api_id': api.id,
+        'model_id': api.model_id,
+        'model_name': api.model.name,
+        'status': api.status,
+        'inputs': api.model.inputs,
+        'outputs': api.model.outputs,
+        'algorithm': api.model.algorithm,
+        'created_at': api.created_at.isoformat()
+    })
+
+
+async def metrics(request):
+    """GET /metrics: métriques du processus serveur (les processus du pool n'en exposent pas)"""
+    with request.app['flask_app'].app_context():
+        text = MetricsService.render(db.engine)
+    return web.Response(text=text, content_type='text/plain', charset='utf-8')
+
+
+async def health(request):
+    stats = PredictionPool.stats()
+    if not stats['running']:
+        return web.json_response({'status': 'starting', 'pool': stats}, status=503)
+    return web.json_response({'status': 'ok', 'pool': stats})
+
+
+def _preload_models():
+    """Modèles des APIs actives, dans l'ordre de préchargement du WarmupService"""
+    return [ResolvedModel(api.model) for api in WarmupService.get_active_apis()]
+
+
+def create_async_app(flask_app, workers=None):
+    """
+    Construit l'application aiohttp
+
+    Args:
+        flask_app: Application Flask créée par create_app (config, base, services)
+        workers: Nombre de processus du pool (défaut: ASYNC_PREDICTION_WORKERS)
+
+    Returns:
+        web.Application: Application prête pour web.run_app
+    """
+    aio_app = web.Application(client_max_size=flask_app.config['MAX_UPLOAD_SIZE'])
+    aio_app['flask_app'] = flask_app
+    aio_app['io_executor'] = ThreadPoolExecutor(
+        max_workers=flask_app.config['ASYNC_IO_THREADS'], thread_name_prefix='async-io'
+    )
+
+    aio_app.router.add_post('/api/predict/{api_id:\\d+}', predict)
+    aio_app.router.add_post('/api/predict/{api_id:\\d+}/batch', predict_batch)
+    aio_app.router.add_get('/api/predict/{api_id:\\d+}/info', get_api_info)
+    aio_app.router.add_get('/health', health)
+    aio_app.router.add_get('/metrics', metrics)
+
+    async def start_pool(app):
+        loop = asyncio.get_running_loop()
+        models = await loop.run_in_executor(
+            app['io_executor'], _call_in_app_context, flask_app, _preload_models
+        )
+        # Bloque le démarrage jusqu'à la fin du préchargement dans chaque processus
+        await loop.run_in_executor(None, PredictionPool.start, flask_app, models, workers)
+
+    async def stop_pool(app):
+        await asyncio.get_running_loop().run_in_executor(None, PredictionPool.shutdown)
+        app['io_executor'].shutdown(wait=True)
+
+    aio_app.on_startup.append(start_pool)
+    aio_app.on_cleanup.append(stop_pool)
+
+    return aio_app
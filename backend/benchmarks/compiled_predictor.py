@@ -0,0 +1,125 @@
+"""
+Microbenchmark: pipeline scikit-learn vs pipeline compilé en numpy
+
+Pour chaque algorithme supporté par utils/compiled_predictor.py, vérifie que
+les prédictions sont identiques puis compare le temps de predict_encoded
+pour une ligne et pour un lot, ainsi que le temps de chargement du fichier.
+Pour un lot, numpy_only mesure le parcours numpy sans délégation à
+l'estimateur d'origine (arbres au-delà de max_rows lignes).
+
+Usage:
+    python benchmarks/compiled_predictor.py --features 10 --batch 10000
+"""
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+from utils.ml_algorithms import MLAlgorithms
+from utils.model_pipeline import ModelPipeline
+from utils.compiled_predictor import compile_pipeline
+
+ALGORITHMS = {
+    'classification': ['logistic_regression', 'decision_tree', 'random_forest'],
+    'regression': ['linear_regression', 'decision_tree', 'random_forest']
+}
+
+
+def make_data(problem_type, n_samples, n_features):
+    """Données synthétiques avec quelques valeurs manquantes"""
+    rng = np.random.RandomState(42)
+    X = rng.randn(n_samples, n_features)
+    X[rng.rand(n_samples, n_features) < 0.02] = np.nan
+    signal = np.nan_to_num(X[:, :3]).sum(axis=1)
+    if problem_type == 'classification':
+        y = np.array(['a', 'b', 'c'])[np.digitize(signal, [-1.0, 1.0])]
+    else:
+        y = signal + rng.randn(n_samples) * 0.1
+    return X, y
+
+
+def per_call_us(func, number):
+    """Temps moyen par appel en microsecondes (meilleur de 5 répétitions)"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def load_ms(path):
+    start = time.perf_counter()
+    joblib.load(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', type=int, default=10)
+    parser.add_argument('--samples', type=int, default=5000, help="Lignes d'entraînement")
+    parser.add_argument('--batch', type=int, default=10000)
+    parser.add_argument('--number', type=int, default=500, help="Appels par mesure (ligne unique)")
+    args = parser.parse_args()
+
+    columns = [f"f{i}" for i in range(args.features)]
+    report = []
+
+    with tempfile.TemporaryDirectory() as folder:
+        for problem_type, algorithms in ALGORITHMS.items():
+            X, y = make_data(problem_type, args.samples, args.features)
+            for algorithm in algorithms:
+                result = MLAlgorithms.train_and_evaluate(algorithm, X, X[:100], y, y[:100], problem_type)
+                pipeline = ModelPipeline(result['model_instance'], columns, imputer=result['imputer'],
+                                         scaler=result['scaler'])
+                compiled = compile_pipeline(pipeline)
+
+                batch = np.random.RandomState(0).randn(args.batch, args.features)
+                batch[::50, 1] = np.nan
+                row = batch[:1]
+
+                # Les prédictions doivent être exactement celles de scikit-learn
+                expected = pipeline.predict_encoded(batch)
+                actual = compiled.predict_encoded(batch)
+                if problem_type == 'classification':
+                    assert (expected == actual).all(), algorithm
+                else:
+                    assert np.allclose(expected, actual, rtol=1e-12, atol=1e-12), algorithm
+
+                pipeline_path = os.path.join(folder, f"{problem_type}_{algorithm}.pkl")
+                compiled_path = os.path.join(folder, f"{problem_type}_{algorithm}.compiled.pkl")
+                joblib.dump(pipeline, pipeline_path, compress=0)
+                joblib.dump(compiled, compiled_path, compress=0)
+                # Comme ModelLoader: les gros lots des arbres passent par l'estimateur d'origine (en cache)
+                compiled.source_loader = lambda pipeline=pipeline: pipeline.estimator
+
+                batch_number = max(1, args.number // 100)
+                report.append({
+                    'problem_type': problem_type,
+                    'algorithm': algorithm,
+                    'single_row_us': {
+                        'sklearn': round(per_call_us(lambda: pipeline.predict_encoded(row), args.number), 1),
+                        'compiled': round(per_call_us(lambda: compiled.predict_encoded(row), args.number), 1)
+                    },
+                    'batch_ms': {
+                        'sklearn': round(per_call_us(lambda: pipeline.predict_encoded(batch), batch_number) / 1000, 2),
+                        'compiled': round(per_call_us(lambda: compiled.predict_encoded(batch), batch_number) / 1000, 2),
+                        'numpy_only': round(per_call_us(
+                            lambda: compiled.predictor.predict(compiled.transform_encoded(batch)), batch_number) / 1000, 2)
+                    },
+                    'load_ms': {
+                        'sklearn': round(load_ms(pipeline_path), 2),
+                        'compiled': round(load_ms(compiled_path), 2)
+                    },
+                    'file_bytes': {
+                        'sklearn': os.path.getsize(pipeline_path),
+                        'compiled': os.path.getsize(compiled_path)
+                    }
+                })
+
+    print(json.dumps({'batch_rows': args.batch, 'results': report}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Microbenchmark: décodage des entrées via InputSpec vs DataFrame pandas
+
+Compare, pour une ligne et pour un lot, la préparation des données avant
+imputer/scaler:
+    - pandas: pd.DataFrame([record])[inputs] puis ModelPipeline.transform
+      (chemin utilisé avant InputSpec)
+    - input_spec: InputSpec.decode / decode_records puis transform_encoded
+
+Usage:
+    python benchmarks/input_decoder.py --numeric 8 --categorical 2 --batch 10000
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from utils.model_pipeline import ModelPipeline
+
+
+def build_pipeline(n_numeric, n_categorical):
+    """Pipeline ajusté sur des données synthétiques (colonnes numériques + catégorielles)"""
+    rng = np.random.RandomState(42)
+    n_samples = 1000
+    data = {f"num_{i}": rng.randn(n_samples) for i in range(n_numeric)}
+    categories = np.array(['alpha', 'beta', 'gamma', 'delta'])
+    for i in range(n_categorical):
+        data[f"cat_{i}"] = categories[rng.randint(0, len(categories), n_samples)]
+    df = pd.DataFrame(data)
+
+    encoders = {}
+    encoded = df.copy()
+    for i in range(n_categorical):
+        col = f"cat_{i}"
+        encoders[col] = LabelEncoder()
+        encoded[col] = encoders[col].fit_transform(df[col].astype(str))
+
+    values = encoded.values.astype(float)
+    imputer = SimpleImputer(strategy='mean').fit(values)
+    scaler = StandardScaler().fit(imputer.transform(values))
+    estimator = LinearRegression().fit(scaler.transform(imputer.transform(values)), rng.randn(n_samples))
+
+    return ModelPipeline(estimator, list(df.columns), encoders, imputer, scaler), df
+
+
+def per_call_us(func, number):
+    """Temps moyen par appel en microsecondes (meilleur de 5 répétitions)"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--numeric', type=int, default=8)
+    parser.add_argument('--categorical', type=int, default=2)
+    parser.add_argument('--batch', type=int, default=10000)
+    parser.add_argument('--number', type=int, default=2000, help="Appels par mesure (ligne unique)")
+    args = parser.parse_args()
+
+    pipeline, df = build_pipeline(args.numeric, args.categorical)
+    inputs = pipeline.input_columns
+    spec = pipeline.input_spec
+
+    record = {k: (v.item() if hasattr(v, 'item') else v) for k, v in df.iloc[0].to_dict().items()}
+    records = [
+        {k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()}
+        for row in df.sample(args.batch, replace=True, random_state=0).to_dict('records')
+    ]
+
+    # Les deux chemins doivent produire exactement la même matrice
+    assert np.allclose(pipeline.transform(pd.DataFrame([record])[inputs]),
+                       pipeline.transform_encoded(spec.decode(record)))
+    assert np.allclose(pipeline.transform(pd.DataFrame.from_records(records, columns=inputs)),
+                       pipeline.transform_encoded(spec.decode_records(records)[0]))
+
+    batch_number = max(1, args.number // 200)
+    report = {
+        'columns': {'numeric': args.numeric, 'categorical': args.categorical},
+        'single_row_us': {
+            'pandas_build': per_call_us(lambda: pd.DataFrame([record])[inputs], args.number),
+            'input_spec_decode': per_call_us(lambda: spec.decode(record), args.number),
+            'pandas_build_and_transform': per_call_us(
+                lambda: pipeline.transform(pd.DataFrame([record])[inputs]), args.number),
+            'input_spec_decode_and_transform': per_call_us(
+                lambda: pipeline.transform_encoded(spec.decode(record)), args.number)
+        },
+        'batch': {
+            'rows': args.batch,
+            'pandas_build_and_transform_ms': per_call_us(
+                lambda: pipeline.transform(pd.DataFrame.from_records(records, columns=inputs)),
+                batch_number) / 1000,
+            'input_spec_decode_and_transform_ms': per_call_us(
+                lambda: pipeline.transform_encoded(spec.decode_records(records)[0]),
+                batch_number) / 1000
+        }
+    }
+
+    for section in ('single_row_us', 'batch'):
+        report[section] = {k: round(v, 2) if isinstance(v, float) else v for k, v in report[section].items()}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Mesure la mémoire par worker avec et sans chargement mmap des modèles
+
+Lance N processus (méthode spawn, comme des workers indépendants), chacun
+charge le même artefact avec joblib.load puis fait une prédiction. Pendant
+que tous les workers sont vivants, on relève pour chacun:
+    - rss: mémoire résidente (compte aussi les pages partagées)
+    - uss: mémoire privée au processus
+    - pss: part proportionnelle des pages partagées (Linux)
+
+Usage:
+    python benchmarks/model_memory.py --algorithm knn --workers 4
+    python benchmarks/model_memory.py --model-path saved_models/model_1.pkl --features 3
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import multiprocessing as mp
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import psutil
+
+MB = 1024 * 1024
+
+
+def build_artifact(algorithm, n_samples, n_features, path):
+    """Entraîne un modèle synthétique et le sauvegarde comme en production"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.svm import SVR
+    from utils.model_pipeline import ModelPipeline
+
+    rng = np.random.RandomState(42)
+    X = rng.randn(n_samples, n_features)
+    y = X @ rng.randn(n_features) + rng.randn(n_samples) * 0.1
+
+    estimators = {
+        'knn': lambda: KNeighborsRegressor(n_neighbors=5, algorithm='brute'),
+        'random_forest': lambda: RandomForestRegressor(n_estimators=100, random_state=42),
+        'svm': lambda: SVR()
+    }
+    estimator = estimators[algorithm]().fit(X, y)
+    pipeline = ModelPipeline(estimator, [f"f{i}" for i in range(n_features)])
+    joblib.dump(pipeline, path, compress=0)
+
+
+def memory_snapshot(pid):
+    """Relève rss/uss/pss d'un processus en Mo"""
+    info = psutil.Process(pid).memory_full_info()
+    return {
+        'rss_mb': round(info.rss / MB, 2),
+        'uss_mb': round(info.uss / MB, 2),
+        'pss_mb': round(getattr(info, 'pss', 0) / MB, 2)
+    }
+
+
+def worker(model_path, mmap_mode, n_features, ready, release):
+    """Charge le modèle, prédit, puis attend que le parent ait mesuré"""
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
+    model.predict(np.zeros((8, n_features)))
+    ready.put(os.getpid())
+    release.wait()
+
+
+def measure(model_path, mmap_mode, workers, n_features):
+    """Lance les workers et mesure leur mémoire une fois tous chargés"""
+    ctx = mp.get_context('spawn')
+    ready = ctx.Queue()
+    release = ctx.Event()
+    processes = [
+        ctx.Process(target=worker, args=(model_path, mmap_mode, n_features, ready, release))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    pids = [ready.get(timeout=300) for _ in processes]
+    snapshots = [memory_snapshot(pid) for pid in pids]
+
+    release.set()
+    for process in processes:
+        process.join()
+
+    return {
+        'mmap_mode': mmap_mode,
+        'workers': snapshots,
+        'total_rss_mb': round(sum(s['rss_mb'] for s in snapshots), 2),
+        'total_uss_mb': round(sum(s['uss_mb'] for s in snapshots), 2),
+        'total_pss_mb': round(sum(s['pss_mb'] for s in snapshots), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', help="Artefact existant (sinon un modèle synthétique est entraîné)")
+    parser.add_argument('--algorithm', default='knn', choices=['knn', 'random_forest', 'svm'])
+    parser.add_argument('--samples', type=int, default=200000)
+    parser.add_argument('--features', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model_path
+        if not model_path:
+            model_path = os.path.join(tmp_dir, 'model.pkl')
+            build_artifact(args.algorithm, args.samples, args.features, model_path)
+
+        report = {
+            'model_path': args.model_path,
+            'algorithm': None if args.model_path else args.algorithm,
+            'file_size_mb': round(os.path.getsize(model_path) / MB, 2),
+            'results': [
+                measure(model_path, None, args.workers, args.features),
+                measure(model_path, 'r', args.workers, args.features)
+            ]
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
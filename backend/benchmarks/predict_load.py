@@ -0,0 +1,414 @@
+"""
+Benchmark de charge des endpoints de prédiction
+
+Crée une application complète (create_app, base SQLite dans un dossier
+temporaire), y importe un dataset synthétique puis entraîne et exporte
+quelques modèles par algorithme en passant par les routes habituelles.
+Chaque scénario (algorithme x endpoint) envoie ensuite un nombre fixe de
+requêtes avec une concurrence fixe, réparties entre les APIs de
+l'algorithme, et mesure:
+    - throughput_rps: requêtes par seconde (rows_per_s pour /batch)
+    - latency_ms: p50/p95/p99 côté client
+    - phases_ms: moyenne et p95 de chaque phase côté serveur, lues dans le
+      header Server-Timing (auth, parse, load, decode, predict, ...)
+
+Le résultat est un JSON (commit, machine, paramètres, scénarios) à comparer
+d'un commit à l'autre avec les mêmes arguments. Avec --transport http
+(défaut), les requêtes passent par un serveur werkzeug local en HTTP/1.1;
+avec --transport wsgi, par le client de test Flask (sans socket). Le
+client tourne dans le même processus que le serveur: comparer des runs
+faits sur la même machine avec la même concurrence.
+
+Les variables d'environnement de config.py (REQUEST_LOG_ASYNC,
+MODEL_CACHE_MAX_BYTES, ...) s'appliquent comme pour le serveur.
+
+Usage:
+    python benchmarks/predict_load.py --concurrency 8 --requests 2000
+    python benchmarks/predict_load.py --algorithms random_forest,knn --batch-size 500 --output before.json
+    python benchmarks/predict_load.py --api-settings '{"result_cache_enabled": true}'
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np
+import pandas as pd
+
+ALL_ALGORITHMS = ['linear_regression', 'logistic_regression', 'knn', 'decision_tree', 'random_forest', 'svm']
+
+
+def make_dataset(n_samples, n_features, seed=42):
+    """Dataset synthétique: features numériques (avec valeurs manquantes), une catégorielle, deux cibles"""
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({f"f{i}": rng.randn(n_samples).round(4) for i in range(n_features)})
+    df['segment'] = rng.choice(['north', 'south', 'east', 'west'], n_samples)
+    signal = df['f0'] * 2 + df['f1'] - df[f"f{min(2, n_features - 1)}"] + (df['segment'] == 'north') * 1.5
+    df['target_value'] = (signal + rng.randn(n_samples) * 0.3).round(4)
+    df['target_class'] = np.array(['low', 'mid', 'high'])[np.digitize(signal, [-1.0, 1.0])]
+    for column in ('f0', 'f1'):
+        df.loc[rng.rand(n_samples) < 0.01, column] = np.nan
+    return df
+
+
+def make_records(df, inputs, count, seed=0):
+    """Enregistrements à envoyer (lignes du dataset tirées au hasard, NaN -> null)"""
+    rows = df[inputs].sample(n=count, replace=True, random_state=seed)
+    rows = rows.astype(object).where(rows.notna(), None)
+    return rows.to_dict(orient='records')
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+def parse_server_timing(header):
+    """'auth;dur=0.04, predict;dur=0.38' -> {'auth': 0.04, 'predict': 0.38} (ms)"""
+    phases = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur' and name:
+                try:
+                    phases[name] = float(value)
+                except ValueError:
+                    pass
+    return phases
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def setup_apis(client, df, inputs, algorithms, models_per_algorithm, api_settings):
+    """
+    Importe le dataset, entraîne et exporte les modèles par les routes de l'application
+
+    Les algorithmes des deux types alternent classification et régression.
+
+    Returns:
+        dict: {algorithme: [{'api_id', 'api_key', 'problem_type'}, ...]}
+    """
+    from utils.ml_algorithms import MLAlgorithms
+
+    response = client.post(
+        '/datasets/upload',
+        data={'file': (io.BytesIO(df.to_csv(index=False).encode()), 'benchmark.csv')},
+        content_type='multipart/form-data'
+    )
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Import du dataset impossible: {response.get_json()}")
+    dataset_id = response.get_json()['id']
+
+    targets = {'classification': 'target_class', 'regression': 'target_value'}
+    apis = {}
+    for algorithm in algorithms:
+        algo_type = MLAlgorithms.ALGORITHMS[algorithm]['type']
+        problem_types = ['classification', 'regression'] if algo_type == 'both' else [algo_type]
+        apis[algorithm] = []
+
+        for copy in range(models_per_algorithm):
+            problem_type = problem_types[copy % len(problem_types)]
+            model_id = client.post('/models/create', json={
+                'name': f"benchmark {algorithm} {copy}", 'dataset_id': dataset_id
+            }).get_json()['id']
+            client.post(f'/models/{model_id}/select-io', json={
+                'inputs': inputs, 'outputs': [targets[problem_type]]
+            })
+
+            response = client.post(f'/models/{model_id}/train', json={'algorithm': algorithm})
+            if response.status_code != 200:
+                raise RuntimeError(f"Entraînement {algorithm} impossible: {response.get_json()}")
+
+            exported = client.post(f'/api/export/{model_id}').get_json()
+            if api_settings:
+                response = client.put(f"/api/export/s/{exported['id']}/settings", json=api_settings)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Réglages refusés: {response.get_json()}")
+
+            apis[algorithm].append({
+                'api_id': exported['id'],
+                'api_key': exported['api_key'],
+                'problem_type': problem_type
+            })
+    return apis
+
+
+class HTTPTransport:
+    """Requêtes HTTP/1.1 vers un serveur werkzeug local, une connexion keep-alive par thread"""
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class KeepAliveHandler(WSGIRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self._server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                '127.0.0.1', self._server.server_port, timeout=60
+            )
+        return connection
+
+    def post(self, path, body, headers):
+        for attempt in (1, 2):
+            connection = self._connection()
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status, response.getheader('Server-Timing')
+            except (http.client.HTTPException, OSError):
+                # Connexion fermée par le serveur: on en rouvre une
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class WSGITransport:
+    """Requêtes via le client de test Flask (pas de socket ni de serveur HTTP)"""
+
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+
+    def post(self, path, body, headers):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        response = client.post(path, data=body, headers=headers)
+        response.get_data()
+        return response.status_code, response.headers.get('Server-Timing')
+
+    def close(self):
+        pass
+
+
+def run_scenario(transport, requests_, concurrency):
+    """
+    Envoie les requêtes (path, body, headers) avec `concurrency` threads
+
+    Returns:
+        dict: latences (ms), codes HTTP, phases Server-Timing et durée totale
+    """
+    latencies = []
+    statuses = {}
+    phases = {}
+    lock = threading.Lock()
+    next_index = iter(range(len(requests_)))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            path, body, headers = requests_[index]
+            start = time.perf_counter()
+            try:
+                status, server_timing = transport.post(path, body, headers)
+            except Exception:
+                status, server_timing = 'error', None
+            latency = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(latency)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                for name, duration in parse_server_timing(server_timing).items():
+                    phases.setdefault(name, []).append(duration)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return {'latencies': latencies, 'statuses': statuses, 'phases': phases,
+            'duration': time.perf_counter() - start}
+
+
+def summarize(name, endpoint, run, rows_per_request):
+    latencies = run['latencies']
+    count = len(latencies)
+    errors = sum(n for status, n in run['statuses'].items() if status != '200')
+    duration = run['duration']
+    return {
+        'scenario': name,
+        'endpoint': endpoint,
+        'requests': count,
+        'errors': errors,
+        'status_codes': run['statuses'],
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(count / duration, 1) if duration else None,
+        'rows_per_s': round(count * rows_per_request / duration, 1) if duration else None,
+        'latency_ms': {
+            'mean': round(float(np.mean(latencies)), 3) if latencies else None,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': round(max(latencies), 3) if latencies else None
+        },
+        'phases_ms': {
+            phase: {'mean': round(float(np.mean(values)), 3), 'p95': percentile(values, 95)}
+            for phase, values in run['phases'].items()
+        }
+    }
+
+
+def build_requests(apis, endpoint, records, batch_size, count):
+    """Requêtes réparties à tour de rôle entre les APIs d'un algorithme"""
+    requests_ = []
+    for i in range(count):
+        api = apis[i % len(apis)]
+        headers = {'X-API-Key': api['api_key'], 'Content-Type': 'application/json'}
+        if endpoint == 'predict':
+            path = f"/api/predict/{api['api_id']}"
+            payload = records[i % len(records)]
+        else:
+            path = f"/api/predict/{api['api_id']}/batch"
+            offset = (i * batch_size) % len(records)
+            payload = (records[offset:] + records[:offset])[:batch_size]
+        requests_.append((path, json.dumps(payload).encode(), headers))
+    return requests_
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--algorithms', default=','.join(ALL_ALGORITHMS),
+                        help="Algorithmes séparés par des virgules (défaut: tous)")
+    parser.add_argument('--models-per-algorithm', type=int, default=2)
+    parser.add_argument('--samples', type=int, default=2000, help="Lignes du dataset d'entraînement")
+    parser.add_argument('--features', type=int, default=8, help="Features numériques (plus une catégorielle)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help="Requêtes mesurées par scénario")
+    parser.add_argument('--warmup', type=int, default=50, help="Requêtes non mesurées avant chaque scénario")
+    parser.add_argument('--batch-size', type=int, default=100, help="Lignes par requête /batch (0 pour ignorer /batch)")
+    parser.add_argument('--transport', choices=['http', 'wsgi'], default='http')
+    parser.add_argument('--api-settings', type=json.loads, default=None,
+                        help="Réglages JSON appliqués à chaque API (PUT /api/export/s/<id>/settings)")
+    parser.add_argument('--output', help="Fichier JSON de sortie (défaut: stdout)")
+    parser.add_argument('--keep-workdir', action='store_true', help="Conserver la base et les modèles")
+    args = parser.parse_args()
+
+    algorithms = [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    unknown = sorted(set(algorithms) - set(ALL_ALGORITHMS))
+    if unknown:
+        parser.error(f"Algorithmes inconnus: {', '.join(unknown)}")
+
+    # L'application lit sa configuration à l'import: tout pointe vers le dossier temporaire
+    workdir = tempfile.mkdtemp(prefix='predict_load_')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.environ['UPLOAD_FOLDER'] = os.path.join(workdir, 'uploads')
+    os.environ['LOG_FILE'] = os.path.join(workdir, 'app.log')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.chdir(workdir)  # MODEL_FOLDER est relatif
+
+    from app import create_app
+    from services.request_log_writer import RequestLogWriter
+    from services.usage_counters import UsageCounters
+    from services.resource_sampler import ResourceSampler
+
+    transport = None
+    try:
+        app = create_app('production')
+        df = make_dataset(args.samples, args.features)
+        inputs = [f"f{i}" for i in range(args.features)] + ['segment']
+
+        setup_start = time.perf_counter()
+        apis = setup_apis(app.test_client(), df, inputs, algorithms, args.models_per_algorithm, args.api_settings)
+        setup_seconds = time.perf_counter() - setup_start
+
+        records = make_records(df, inputs, max(1000, args.batch_size))
+        transport = HTTPTransport(app) if args.transport == 'http' else WSGITransport(app)
+
+        endpoints = [('predict', 1)] + ([('batch', args.batch_size)] if args.batch_size > 0 else [])
+        scenarios = []
+        for algorithm in algorithms:
+            for endpoint, rows in endpoints:
+                if args.warmup:
+                    run_scenario(transport, build_requests(apis[algorithm], endpoint, records, args.batch_size,
+                                                           args.warmup), args.concurrency)
+                requests_ = build_requests(apis[algorithm], endpoint, records, args.batch_size, args.requests)
+                run = run_scenario(transport, requests_, args.concurrency)
+                summary = summarize(algorithm, endpoint, run, rows)
+                scenarios.append(summary)
+                print(f"{algorithm:>20} {endpoint:>8}: {summary['throughput_rps']} req/s, "
+                      f"p50 {summary['latency_ms']['p50']} ms, p99 {summary['latency_ms']['p99']} ms, "
+                      f"{summary['errors']} erreur(s)", file=sys.stderr)
+
+        report = {
+            'benchmark': 'predict_load',
+            'timestamp': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'parameters': {
+                'algorithms': algorithms,
+                'models_per_algorithm': args.models_per_algorithm,
+                'samples': args.samples,
+                'features': args.features + 1,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'batch_size': args.batch_size,
+                'transport': args.transport,
+                'api_settings': args.api_settings
+            },
+            'setup_s': round(setup_seconds, 3),
+            'scenarios': scenarios
+        }
+    finally:
+        if transport is not None:
+            transport.close()
+        # Écritures en attente faites avant de supprimer la base
+        RequestLogWriter.shutdown()
+        UsageCounters.shutdown()
+        ResourceSampler.shutdown()
+        os.chdir(BACKEND_DIR)
+        if args.keep_workdir:
+            print(f"Dossier de travail conservé: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
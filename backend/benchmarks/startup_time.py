@@ -0,0 +1,189 @@
+"""
+Temps de démarrage d'un worker: import de l'application et première prédiction
+
+Prépare une base SQLite temporaire avec l'application complète (un modèle
+entraîné et exporté par algorithme), puis lance pour chaque profil
+d'application (full, serving) et chaque algorithme des processus neufs qui
+mesurent:
+    - import_s: import du module app (routes, services, dépendances)
+    - create_app_s: create_app(profile=...)
+    - first_prediction_s: première requête /api/predict (chargement du modèle compris)
+    - ready_s: total depuis le début du processus jusqu'à la première réponse
+    - second_prediction_ms: requête suivante, modèle en cache
+et si scikit-learn / pandas ont été importés avant et après la première
+prédiction. Les valeurs sont des médianes sur --repeat processus.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --algorithms random_forest --repeat 10 --output startup.json
+"""
+import time
+PROCESS_START = time.perf_counter()
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROFILES = ['full', 'serving']
+
+
+def loaded(module):
+    return module in sys.modules
+
+
+def measure_child(profile, api_id, api_key, record):
+    """Exécuté dans un processus neuf: imports, create_app et premières prédictions"""
+    timings = {}
+
+    start = time.perf_counter()
+    from app import create_app
+    timings['import_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = create_app('production', profile=profile)
+    timings['create_app_s'] = time.perf_counter() - start
+    modules = {'sklearn_before_prediction': loaded('sklearn'), 'pandas_before_prediction': loaded('pandas')}
+
+    client = app.test_client()
+    headers = {'X-API-Key': api_key}
+    start = time.perf_counter()
+    response = client.post(f'/api/predict/{api_id}', json=record, headers=headers)
+    timings['first_prediction_s'] = time.perf_counter() - start
+    timings['ready_s'] = time.perf_counter() - PROCESS_START
+    if response.status_code != 200:
+        raise RuntimeError(f"Prédiction en échec ({response.status_code}): {response.get_json()}")
+
+    start = time.perf_counter()
+    client.post(f'/api/predict/{api_id}', json=record, headers=headers)
+    timings['second_prediction_ms'] = (time.perf_counter() - start) * 1000
+
+    modules.update({'sklearn_after_prediction': loaded('sklearn'), 'pandas_after_prediction': loaded('pandas')})
+    return {**{name: round(value, 4) for name, value in timings.items()}, **modules}
+
+
+def prepare(workdir, algorithms):
+    """Base et modèles de test, créés dans un sous-processus pour que ce processus reste léger"""
+    code = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "from predict_load import make_dataset, make_records, setup_apis\n"
+        "from app import create_app\n"
+        "from services.request_log_writer import RequestLogWriter\n"
+        "from services.usage_counters import UsageCounters\n"
+        "app = create_app('production', profile='full')\n"
+        "df = make_dataset(1000, 8)\n"
+        "inputs = [f'f{i}' for i in range(8)] + ['segment']\n"
+        f"apis = setup_apis(app.test_client(), df, inputs, {algorithms!r}, 1, None)\n"
+        "RequestLogWriter.shutdown(); UsageCounters.shutdown()\n"
+        "print(json.dumps({'apis': apis, 'record': make_records(df, inputs, 1)[0]}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=child_env(workdir),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def child_env(workdir):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'benchmark.db'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+        'LOG_FILE': os.path.join(workdir, 'app.log'),
+        'LOG_LEVEL': env.get('LOG_LEVEL', 'WARNING'),
+        'MODEL_WARMUP': 'false',
+        'PYTHONPATH': BACKEND_DIR
+    })
+    return env
+
+
+def run_child(workdir, profile, api, record):
+    args = json.dumps({'profile': profile, 'api_id': api['api_id'], 'api_key': api['api_key'], 'record': record})
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', args], cwd=workdir,
+                            env=child_env(workdir), capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Processus de mesure en échec:\n{result.stderr}")
+    measures = json.loads(result.stdout.strip().splitlines()[-1])
+    measures['process_wall_s'] = round(wall, 4)
+    return measures
+
+
+def summarize(runs):
+    summary = {}
+    for key, value in runs[0].items():
+        if isinstance(value, bool):
+            summary[key] = all(run[key] for run in runs)
+        else:
+            values = [run[key] for run in runs]
+            summary[key] = {'median': round(statistics.median(values), 4), 'min': round(min(values), 4)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--algorithms', default='random_forest,knn',
+                        help="Algorithmes séparés par des virgules (random_forest: modèle compilé, knn: scikit-learn)")
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--repeat', type=int, default=5, help="Processus mesurés par combinaison")
+    parser.add_argument('--output', help="Fichier JSON de sortie (défaut: stdout)")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        params = json.loads(args.child)
+        print(json.dumps(measure_child(params['profile'], params['api_id'], params['api_key'], params['record'])))
+        return
+
+    algorithms = [name.strip() for name in args.algorithms.split(',') if name.strip()]
+    profiles = [name.strip() for name in args.profiles.split(',') if name.strip()]
+    unknown = sorted(set(profiles) - set(PROFILES))
+    if unknown:
+        parser.error(f"Profils inconnus: {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix='startup_time_')
+    try:
+        prepared = prepare(workdir, algorithms)
+        results = []
+        for algorithm in algorithms:
+            api = prepared['apis'][algorithm][0]
+            for profile in profiles:
+                runs = [run_child(workdir, profile, api, prepared['record']) for _ in range(args.repeat)]
+                summary = summarize(runs)
+                results.append({'algorithm': algorithm, 'profile': profile, **summary})
+                print(f"{algorithm:>15} {profile:>8}: import {summary['import_s']['median']}s, "
+                      f"prêt {summary['ready_s']['median']}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                         stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    output = json.dumps({
+        'benchmark': 'startup_time',
+        'timestamp': datetime.utcnow().isoformat(),
+        'commit': commit,
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'repeat': args.repeat,
+        'results': results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,12 +23,59 @@ class Config:
     # Flask
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     DEBUG = FLASK_ENV == 'development'
+    # 'full': toutes les routes; 'serving': prédiction uniquement (/api/predict,
+    # /metrics, /health), sans routes d'entraînement ni db.create_all()
+    APP_PROFILE = os.getenv('APP_PROFILE', 'full')
     
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
+    # Jobs de scoring de datasets (fichiers de sortie dans UPLOAD_FOLDER/scoring)
+    SCORING_CHUNK_SIZE = int(os.getenv('SCORING_CHUNK_SIZE', 10000))  # lignes par morceau
+    SCORING_MAX_WORKERS = int(os.getenv('SCORING_MAX_WORKERS', 4))  # processus par job
+    
+    # Test des algorithmes (processus workers réutilisés)
+    TOURNAMENT_MAX_WORKERS = int(os.getenv('TOURNAMENT_MAX_WORKERS', 0))  # 0 = nombre de CPU, 1 = processus courant
+    TOURNAMENT_TIMEOUT = float(os.getenv('TOURNAMENT_TIMEOUT', 300))  # secondes par algorithme, 0 = illimité
+    TOURNAMENT_MEMORY_LIMIT_MB = int(os.getenv('TOURNAMENT_MEMORY_LIMIT_MB', 4096))  # par processus, 0 = illimité
+    TOURNAMENT_INPROCESS_MAX_ROWS = int(os.getenv('TOURNAMENT_INPROCESS_MAX_ROWS', 5000))  # petits datasets: processus courant
+    TOURNAMENT_CACHE_MAX_ENTRIES = int(os.getenv('TOURNAMENT_CACHE_MAX_ENTRIES', 20))  # prétraitements gardés sur disque
+    
     # Model storage
     MODEL_FOLDER = 'saved_models'
+    MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', 1073741824))  # 1GB par défaut
+    # 'r' pour mapper les tableaux numpy des modèles en mémoire partagée entre workers
+    MODEL_MMAP_MODE = os.getenv('MODEL_MMAP_MODE') or None
+    
+    # Préchargement des modèles des APIs actives au démarrage
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'false').lower() == 'true'
+    MODEL_WARMUP_BACKGROUND = os.getenv('MODEL_WARMUP_BACKGROUND', 'true').lower() == 'true'
+    
+    # Prediction
+    API_KEY_CACHE_TTL = int(os.getenv('API_KEY_CACHE_TTL', 60))  # secondes, 0 pour désactiver
+    PREDICTION_MAX_BATCH_SIZE = int(os.getenv('PREDICTION_MAX_BATCH_SIZE', 50000))
+    PREDICTION_STREAM_CHUNK_SIZE = int(os.getenv('PREDICTION_STREAM_CHUNK_SIZE', 5000))  # lignes par morceau (/stream)
+    
+    # Serveur de prédiction asynchrone (run_async.py)
+    ASYNC_PREDICTION_WORKERS = int(os.getenv('ASYNC_PREDICTION_WORKERS', 0))  # 0 = nombre de CPU
+    ASYNC_IO_THREADS = int(os.getenv('ASYNC_IO_THREADS', 8))  # requêtes en base hors de la boucle
+    
+    # Request logging (écriture différée par lots)
+    REQUEST_LOG_ASYNC = os.getenv('REQUEST_LOG_ASYNC', 'true').lower() == 'true'
+    REQUEST_LOG_QUEUE_SIZE = int(os.getenv('REQUEST_LOG_QUEUE_SIZE', 10000))
+    REQUEST_LOG_BATCH_SIZE = int(os.getenv('REQUEST_LOG_BATCH_SIZE', 500))
+    REQUEST_LOG_FLUSH_INTERVAL = float(os.getenv('REQUEST_LOG_FLUSH_INTERVAL', 1.0))  # secondes
+    # Durées par phase (auth, load, decode, predict...) enregistrées avec chaque requête
+    REQUEST_LOG_PHASE_TIMINGS = os.getenv('REQUEST_LOG_PHASE_TIMINGS', 'true').lower() == 'true'
+    
+    # Compteurs d'utilisation des APIs (agrégés en mémoire, écrits périodiquement)
+    USAGE_COUNTERS_ASYNC = os.getenv('USAGE_COUNTERS_ASYNC', 'true').lower() == 'true'
+    USAGE_COUNTERS_FLUSH_INTERVAL = float(os.getenv('USAGE_COUNTERS_FLUSH_INTERVAL', 5.0))  # secondes
+    
+    # Échantillonnage CPU/mémoire du processus en arrière-plan
+    RESOURCE_SAMPLER_ENABLED = os.getenv('RESOURCE_SAMPLER_ENABLED', 'true').lower() == 'true'
+    RESOURCE_SAMPLE_INTERVAL = float(os.getenv('RESOURCE_SAMPLE_INTERVAL', 1.0))  # secondes
+    RESOURCE_SAMPLE_HISTORY = int(os.getenv('RESOURCE_SAMPLE_HISTORY', 300))  # échantillons conservés
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -1,52 +1,117 @@
 """Middleware pour l'authentification des APIs"""
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, make_response
 from services.api_export_service import APIExportService
+from services.rate_limiter import RateLimiter
+from services.metrics_service import MetricsService
+from utils.timing import start_request_timer
+
+
+def api_key_error(api_key, api):
+    """
+    Vérifie le résultat de la résolution d'une clé API
+    
+    Partagé par le décorateur Flask et le serveur asynchrone (async_app.py).
+    
+    Args:
+        api_key: Clé reçue dans le header X-API-Key (None si absente)
+        api: API résolue pour cette clé (None si invalide)
+    
+    Returns:
+        tuple: (corps d'erreur, code HTTP), None si l'API peut être servie
+    """
+    if not api_key:
+        return {
+            'error': {
+                'code': 'MISSING_API_KEY',
+                'message': 'API key required. Please provide X-API-Key header.'
+            }
+        }, 401
+    
+    if not api:
+        return {
+            'error': {
+                'code': 'INVALID_API_KEY',
+                'message': 'Invalid API key'
+            }
+        }, 403
+    
+    if api.status != 'active':
+        return {
+            'error': {
+                'code': 'INACTIVE_API',
+                'message': 'This API is currently inactive'
+            }
+        }, 403
+    
+    return None
+
+
+def _admitted_response(api, f, *args, **kwargs):
+    """
+    Exécute la route si la requête est admise par le RateLimiter de l'API
+    
+    La place est libérée à la fin de la route, ou à la fermeture de la
+    réponse pour une réponse en flux (/stream).
+    """
+    rejection = RateLimiter.admit(api)
+    if rejection:
+        body, status_code, retry_after = rejection
+        response = make_response(jsonify(body), status_code)
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+    
+    try:
+        # Passer l'API validée à la fonction
+        response = make_response(f(api, *args, **kwargs))
+    except BaseException:
+        RateLimiter.release(api)
+        raise
+    
+    if response.is_streamed:
+        response.call_on_close(lambda: RateLimiter.release(api))
+    else:
+        RateLimiter.release(api)
+    return response
 
 
 def require_api_key(f):
     """
     Décorateur pour valider l'API key
     
+    Applique ensuite les limites de débit et de concurrence de l'API
+    (RateLimiter): une requête hors limite reçoit un 429 avec Retry-After
+    avant tout travail sur le modèle. Démarre aussi la mesure des phases de
+    la requête (utils/timing.py) et ajoute le header Server-Timing.
+    
     Usage:
         @require_api_key
         def my_route(api, ...):
-            # api est l'objet ExportedAPI validé
+            # api est une copie détachée (ResolvedAPI) de l'ExportedAPI validée
             pass
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Récupérer l'API key depuis les headers
-        api_key = request.headers.get('X-API-Key')
-        
-        if not api_key:
-            return jsonify({
-                'error': {
-                    'code': 'MISSING_API_KEY',
-                    'message': 'API key required. Please provide X-API-Key header.'
-                }
-            }), 401
+        timer = start_request_timer()
         
-        # Valider l'API key
-        api = APIExportService.validate_api_key(api_key)
+        with timer.phase('auth'):
+            # Récupérer l'API key depuis les headers
+            api_key = request.headers.get('X-API-Key')
+            
+            # Valider l'API key (via le cache des clés résolues)
+            api = APIExportService.resolve_api_key(api_key) if api_key else None
+            
+            error = api_key_error(api_key, api)
         
-        if not api:
-            return jsonify({
-                'error': {
-                    'code': 'INVALID_API_KEY',
-                    'message': 'Invalid API key'
-                }
-            }), 403
+        if error:
+            body, status_code = error
+            response = make_response(jsonify(body), status_code)
+        else:
+            response = _admitted_response(api, f, *args, **kwargs)
         
-        if api.status != 'active':
-            return jsonify({
-                'error': {
-                    'code': 'INACTIVE_API',
-                    'message': 'This API is currently inactive'
-                }
-            }), 403
-        
-        # Passer l'API validée à la fonction
-        return f(api, *args, **kwargs)
+        # Réponses en flux: seules les phases avant le premier octet sont mesurées
+        response.headers['Server-Timing'] = timer.header()
+        MetricsService.observe_request(api.id if not error else None, f.__name__, response.status_code, timer)
+        return response
     
     return decorated_function
@@ -2,5 +2,6 @@
 from models.dataset import Dataset
 from models.ml_model import MLModel
 from models.exported_api import ExportedAPI
+from models.scoring_job import ScoringJob
 
-__all__ = ['Dataset', 'MLModel', 'ExportedAPI']
+__all__ = ['Dataset', 'MLModel', 'ExportedAPI', 'ScoringJob']
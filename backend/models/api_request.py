@@ -16,6 +16,7 @@ class APIRequest(db.Model):
     error_message = db.Column(db.Text)
     cpu_usage = db.Column(db.Float)  # pourcentage
     memory_usage = db.Column(db.Float)  # en MB
+    phase_timings = db.Column(db.Text)  # JSON {phase: durée en ms} (Server-Timing)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     # Relationship
@@ -33,6 +34,7 @@ class APIRequest(db.Model):
             'error_message': self.error_message,
             'cpu_usage': self.cpu_usage,
             'memory_usage': self.memory_usage,
+            'phase_timings': self.phase_timings,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
     
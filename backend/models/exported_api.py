@@ -17,6 +17,22 @@ class ExportedAPI(db.Model):
     last_used_at = db.Column(db.DateTime)
     total_requests = db.Column(db.Integer, default=0, nullable=False)
     
+    # Micro-batching des prédictions unitaires concurrentes (désactivé par défaut)
+    micro_batch_enabled = db.Column(db.Boolean, default=False, nullable=False)
+    micro_batch_window_ms = db.Column(db.Float, default=2.0, nullable=False)
+    micro_batch_max_size = db.Column(db.Integer, default=32, nullable=False)
+    
+    # Mémoïsation des résultats des prédictions unitaires (désactivée par défaut)
+    result_cache_enabled = db.Column(db.Boolean, default=False, nullable=False)
+    result_cache_ttl = db.Column(db.Integer, default=60, nullable=False)  # secondes
+    result_cache_max_entries = db.Column(db.Integer, default=1000, nullable=False)
+    
+    # Contrôle d'admission: débit (seau à jetons) et requêtes simultanées (0 = illimité)
+    rate_limit_enabled = db.Column(db.Boolean, default=False, nullable=False)
+    rate_limit_per_second = db.Column(db.Float, default=10.0, nullable=False)
+    rate_limit_burst = db.Column(db.Integer, default=20, nullable=False)
+    max_in_flight = db.Column(db.Integer, default=0, nullable=False)
+    
     # Relationships
     model = db.relationship('MLModel', backref='exported_api')
     
@@ -35,5 +51,21 @@ class ExportedAPI(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
-            'total_requests': self.total_requests
+            'total_requests': self.total_requests,
+            'settings': self.settings_dict()
+        }
+    
+    def settings_dict(self):
+        """Réglages de service de l'API (modifiables via PUT /api/export/s/<id>/settings)"""
+        return {
+            'micro_batch_enabled': self.micro_batch_enabled,
+            'micro_batch_window_ms': self.micro_batch_window_ms,
+            'micro_batch_max_size': self.micro_batch_max_size,
+            'result_cache_enabled': self.result_cache_enabled,
+            'result_cache_ttl': self.result_cache_ttl,
+            'result_cache_max_entries': self.result_cache_max_entries,
+            'rate_limit_enabled': self.rate_limit_enabled,
+            'rate_limit_per_second': self.rate_limit_per_second,
+            'rate_limit_burst': self.rate_limit_burst,
+            'max_in_flight': self.max_in_flight
         }
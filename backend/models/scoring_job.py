@@ -0,0 +1,67 @@
+"""Scoring job model"""
+from datetime import datetime
+from extensions import db
+
+
+class ScoringJob(db.Model):
+    """Modèle pour les jobs de scoring d'un dataset complet par un modèle entraîné"""
+    
+    __tablename__ = 'scoring_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model_id = db.Column(db.Integer, db.ForeignKey('ml_models.id', ondelete='CASCADE'), nullable=False)
+    dataset_id = db.Column(db.Integer, db.ForeignKey('datasets.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, completed, failed, cancelled
+    chunk_size = db.Column(db.Integer, nullable=False)
+    workers = db.Column(db.Integer, default=1, nullable=False)
+    total_rows = db.Column(db.Integer)
+    processed_rows = db.Column(db.Integer, default=0, nullable=False)
+    error_rows = db.Column(db.Integer, default=0, nullable=False)
+    output_path = db.Column(db.String(500))
+    error_message = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    # Relationships
+    model = db.relationship('MLModel')
+    dataset = db.relationship('Dataset')
+    
+    def __repr__(self):
+        return f'<ScoringJob {self.id}: model {self.model_id} / dataset {self.dataset_id}>'
+    
+    def to_dict(self):
+        """Convertit le job en dictionnaire (avec progression et débit)"""
+        progress = None
+        if self.total_rows:
+            progress = round(min(self.processed_rows / self.total_rows, 1.0) * 100, 1)
+        
+        rows_per_second = None
+        if self.started_at and self.processed_rows:
+            end = self.finished_at or datetime.utcnow()
+            duration = (end - self.started_at).total_seconds()
+            if duration > 0:
+                rows_per_second = round(self.processed_rows / duration, 1)
+        
+        return {
+            'id': self.id,
+            'model_id': self.model_id,
+            'model_name': self.model.name if self.model else None,
+            'dataset_id': self.dataset_id,
+            'dataset_filename': self.dataset.filename if self.dataset else None,
+            'status': self.status,
+            'chunk_size': self.chunk_size,
+            'workers': self.workers,
+            'total_rows': self.total_rows,
+            'processed_rows': self.processed_rows,
+            'error_rows': self.error_rows,
+            'progress': progress,
+            'rows_per_second': rows_per_second,
+            'output_path': self.output_path if self.status == 'completed' else None,
+            'error_message': self.error_message,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
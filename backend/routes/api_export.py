@@ -1,6 +1,8 @@
 """Routes pour l'export de modèles en API"""
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, jsonify, current_app, request
+from marshmallow import ValidationError
 from services.api_export_service import APIExportService
+from schemas.exported_api_schema import APISettingsSchema
 
 api_export_bp = Blueprint('api_export', __name__, url_prefix='/api/export')
 
@@ -66,6 +68,24 @@ def update_api_status(api_id):
         return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de la mise à jour'}}), 500
 
 
+@api_export_bp.route('s/<int:api_id>/settings', methods=['PUT'])
+def update_api_settings(api_id):
+    """Met à jour les réglages de service d'une API (micro-batching, cache des résultats)"""
+    try:
+        schema = APISettingsSchema()
+        settings = schema.load(request.get_json(silent=True) or {})
+        
+        api = APIExportService.update_settings(api_id, settings)
+        return jsonify(api), 200
+    except ValidationError as e:
+        return jsonify({'error': {'code': 'VALIDATION_ERROR', 'message': 'Données invalides', 'details': e.messages}}), 400
+    except ValueError as e:
+        return jsonify({'error': {'code': 'NOT_FOUND', 'message': str(e)}}), 404
+    except Exception as e:
+        current_app.logger.error(f"Erreur update settings: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de la mise à jour'}}), 500
+
+
 @api_export_bp.route('s/<int:api_id>/regenerate-key', methods=['POST'])
 def regenerate_api_key(api_id):
     """Régénère la clé API"""
@@ -0,0 +1,18 @@
+"""Route d'export des métriques au format Prometheus"""
+from flask import Blueprint, Response
+from extensions import db
+from services.metrics_service import MetricsService
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Métriques en mémoire du processus (format d'exposition texte Prometheus)
+    
+    Compteurs et histogrammes de latence des requêtes de prédiction par API,
+    code HTTP et phase, occupation des caches, file des logs, rejets 429 et
+    pool de connexions. Aucune requête en base.
+    """
+    return Response(MetricsService.render(db.engine), mimetype='text/plain; version=0.0.4')
@@ -1,5 +1,12 @@
+import os
 from flask import Blueprint, jsonify, request
 from services.monitoring_service import MonitoringService
+from services.prediction_service import PredictionService
+from services.request_log_writer import RequestLogWriter
+from services.usage_counters import UsageCounters
+from services.resource_sampler import ResourceSampler
+from services.micro_batcher import MicroBatcher
+from services.rate_limiter import RateLimiter
 from models.exported_api import ExportedAPI
 
 monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/api/monitoring')
@@ -17,7 +24,7 @@ def get_all_apis():
         # Add basic stats to each API
         apis_with_stats = []
         for api in apis:
-            api_dict = api.to_dict()
+            api_dict = UsageCounters.merge(api.to_dict())
             # Get quick stats (24h)
             stats = MonitoringService.get_api_stats(api.id, '24h')
             api_dict['stats'] = {
@@ -81,3 +88,87 @@ def aggregate_metrics():
         return jsonify(result), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/model-cache', methods=['GET'])
+def get_model_cache_stats():
+    """Get model cache occupancy, hit/miss, eviction and load-time counters"""
+    try:
+        return jsonify(PredictionService.get_cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/model-cache', methods=['DELETE'])
+def clear_model_cache():
+    """Drop every cached model (they are reloaded on next use)"""
+    try:
+        PredictionService.clear_cache()
+        return jsonify(PredictionService.get_cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/request-log', methods=['GET'])
+def get_request_log_stats():
+    """Get write-behind request log queue counters (queued, written, dropped)"""
+    try:
+        return jsonify(RequestLogWriter.stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/resources', methods=['GET'])
+def get_resources():
+    """Get process CPU/RSS samples and hourly means recorded by the background sampler"""
+    try:
+        window = request.args.get('window', 60, type=int)
+        cpu_usage, memory_usage = ResourceSampler.latest()
+        avg_cpu_usage, avg_memory_usage = ResourceSampler.window_average(window)
+        
+        return jsonify({
+            'cpu_usage': cpu_usage,
+            'memory_usage': memory_usage,
+            'window': window,
+            'avg_cpu_usage': avg_cpu_usage,
+            'avg_memory_usage': avg_memory_usage,
+            'samples': ResourceSampler.get_samples(),
+            # Hourly means of this process only (API metrics keep per-API request samples)
+            'pid': os.getpid(),
+            'hourly': ResourceSampler.get_hourly_averages()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/micro-batching', methods=['GET'])
+def get_micro_batching_stats():
+    """Get batch-size and queue-wait histograms of every micro-batcher in this process"""
+    try:
+        return jsonify(MicroBatcher.get_all_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/apis/<int:api_id>/micro-batching', methods=['GET'])
+def get_api_micro_batching_stats(api_id):
+    """Get batch-size and queue-wait histograms for a specific API"""
+    try:
+        stats = MicroBatcher.get_stats(api_id)
+        
+        if stats is None:
+            return jsonify({'api_id': api_id, 'running': False}), 200
+        
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/result-cache', methods=['GET'])
+def get_result_cache_stats():
+    """Get memoized prediction cache counters (hits, misses, evictions) per API"""
+    try:
+        return jsonify(PredictionService.get_result_cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@monitoring_bp.route('/rate-limits', methods=['GET'])
+def get_rate_limit_stats():
+    """Get admission counters (admitted, rate-limited, concurrency-limited, in flight) per limited API"""
+    try:
+        return jsonify(RateLimiter.get_all_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,7 +1,10 @@
 """Routes pour les prédictions via API"""
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from middleware.api_auth import require_api_key
 from services.prediction_service import PredictionService
+from utils.stream_reader import iter_csv_records, iter_ndjson_records
+from utils.timing import timed
+from utils.npy_payload import NPY_MIMETYPE, wants_npy, load_npy, dump_npy, npy_headers
 
 prediction_bp = Blueprint('prediction', __name__, url_prefix='/api/predict')
 
@@ -41,7 +44,8 @@ def predict(api, api_id):
             }), 403
         
         # Récupérer les données
-        input_data = request.json
+        with timed('parse'):
+            input_data = request.json
         
         if not input_data:
             return jsonify({
@@ -52,7 +56,7 @@ def predict(api, api_id):
             }), 400
         
         # Effectuer la prédiction
-        result = PredictionService.predict(api_id, input_data)
+        result = PredictionService.predict(api_id, input_data, api=api)
         
         return jsonify(result), 200
         
@@ -73,6 +77,220 @@ def predict(api, api_id):
         }), 500
 
 
+@prediction_bp.route('/<int:api_id>/batch', methods=['POST'])
+@require_api_key
+def predict_batch(api, api_id):
+    """
+    Effectue les prédictions d'un lot d'enregistrements en un seul appel au modèle
+    
+    Headers requis:
+        X-API-Key: Clé API pour l'authentification
+    
+    Body (JSON), au choix:
+        [{"feature1": value1, ...}, {"feature1": value2, ...}]
+        {"records": [{"feature1": value1, ...}, ...]}
+        {"columns": {"feature1": [value1, value2], ...}}
+    
+    Body binaire (Content-Type: application/x-npy), fichier .npy:
+        - tableau structuré, un champ par input (champs texte pour les catégories)
+        - ou matrice numérique (n, nombre d'inputs) dans l'ordre de /info
+        NaN = valeur manquante. Les données sont lues sans copie.
+    
+    Avec "Accept: application/x-npy", la réponse est un fichier .npy des
+    prédictions (headers X-Model-Id et X-Prediction-Count); un lot contenant
+    des lignes invalides est alors refusé (400).
+    
+    Response:
+        {
+            "predictions": [result1, null, ...],
+            "errors": [{"index": 1, "error": "Colonnes manquantes: feature2"}],
+            "count": 2,
+            "success_count": 1,
+            "error_count": 1,
+            "model_id": 1,
+            "model_name": "Mon Modèle",
+            "timestamp": "2025-01-01T12:00:00"
+        }
+    """
+    try:
+        if api.id != api_id:
+            return jsonify({
+                'error': {
+                    'code': 'API_MISMATCH',
+                    'message': 'API key does not match the requested API'
+                }
+            }), 403
+        
+        binary_input = request.mimetype == NPY_MIMETYPE
+        binary_output = wants_npy(request.headers.get('Accept'))
+        
+        with timed('parse'):
+            if binary_input:
+                payload = load_npy(request.get_data(cache=False))
+            else:
+                payload = request.get_json(silent=True)
+        
+        if not binary_input and not payload:
+            return jsonify({
+                'error': {
+                    'code': 'MISSING_DATA',
+                    'message': 'Request body is required'
+                }
+            }), 400
+        
+        result = PredictionService.predict_batch(
+            api_id,
+            payload,
+            max_batch_size=current_app.config['PREDICTION_MAX_BATCH_SIZE'],
+            api=api,
+            as_array=binary_output
+        )
+        
+        if binary_output:
+            with timed('serialize'):
+                body = dump_npy(result['predictions'])
+            return Response(body, mimetype=NPY_MIMETYPE, headers=npy_headers(result)), 200
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': str(e)
+            }
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Erreur batch prediction: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': {
+                'code': 'PREDICTION_ERROR',
+                'message': 'An error occurred during prediction'
+            }
+        }), 500
+
+
+# Formats acceptés par /stream (Content-Type ou extension du fichier uploadé)
+STREAM_FORMATS = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/x-jsonlines': 'ndjson',
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson'
+}
+
+
+def _stream_source():
+    """
+    Détermine le flux à lire et son format
+    
+    Returns:
+        tuple: (flux binaire, 'csv' | 'ndjson' | None)
+    """
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload is not None:
+        extension = '.' + upload.filename.rsplit('.', 1)[-1].lower() if '.' in (upload.filename or '') else ''
+        source, detected = upload.stream, STREAM_FORMATS.get(extension)
+    else:
+        source, detected = request.stream, STREAM_FORMATS.get(request.mimetype)
+    
+    requested = request.args.get('format')
+    return source, requested if requested in ('csv', 'ndjson') else detected
+
+
+@prediction_bp.route('/<int:api_id>/stream', methods=['POST'])
+@require_api_key
+def predict_stream(api, api_id):
+    """
+    Score un fichier CSV ou NDJSON et renvoie les prédictions au fil de l'eau
+    
+    Le corps est lu et prédit par morceaux (PREDICTION_STREAM_CHUNK_SIZE lignes):
+    la mémoire utilisée ne dépend pas de la taille du fichier.
+    
+    Headers requis:
+        X-API-Key: Clé API pour l'authentification
+    
+    Body, au choix:
+        CSV avec ligne d'en-tête (Content-Type: text/csv)
+        NDJSON, un objet par ligne (Content-Type: application/x-ndjson)
+        multipart/form-data avec un champ "file" (.csv, .ndjson ou .jsonl)
+        Le format peut être forcé avec ?format=csv|ndjson
+        Le séparateur du CSV est détecté sur l'en-tête (',', ';' ou tabulation)
+        comme à l'upload du dataset, ou imposé avec ?delimiter=
+    
+    Response (application/x-ndjson, chunked):
+        {"index": 0, "prediction": 1}
+        {"index": 1, "error": "Colonne 'a': valeur numérique attendue, reçu 'abc'"}
+        {"summary": {"rows": 2, "success_count": 1, "error_count": 1, "rows_per_second": 85000.0, ...}}
+    """
+    try:
+        if api.id != api_id:
+            return jsonify({
+                'error': {
+                    'code': 'API_MISMATCH',
+                    'message': 'API key does not match the requested API'
+                }
+            }), 403
+        
+        source, stream_format = _stream_source()
+        
+        if stream_format is None:
+            return jsonify({
+                'error': {
+                    'code': 'UNSUPPORTED_MEDIA_TYPE',
+                    'message': 'Body must be CSV (text/csv) or NDJSON (application/x-ndjson)'
+                }
+            }), 415
+        
+        delimiter = request.args.get('delimiter')
+        if delimiter is not None and len(delimiter) != 1:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'delimiter must be a single character'
+                }
+            }), 400
+        
+        if stream_format == 'csv':
+            records = iter_csv_records(source, delimiter=delimiter)
+        else:
+            records = iter_ndjson_records(source)
+        
+        lines = PredictionService.predict_stream(
+            api_id,
+            records,
+            chunk_size=current_app.config['PREDICTION_STREAM_CHUNK_SIZE'],
+            api=api
+        )
+        
+        # stream_with_context: le corps de la requête est lu pendant la réponse
+        return Response(
+            stream_with_context(lines),
+            mimetype='application/x-ndjson',
+            headers={'X-Accel-Buffering': 'no'}
+        )
+        
+    except ValueError as e:
+        return jsonify({
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': str(e)
+            }
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Erreur stream prediction: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': {
+                'code': 'PREDICTION_ERROR',
+                'message': 'An error occurred during prediction'
+            }
+        }), 500
+
+
 @prediction_bp.route('/<int:api_id>/info', methods=['GET'])
 @require_api_key
 def get_api_info(api, api_id):
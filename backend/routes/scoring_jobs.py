@@ -0,0 +1,95 @@
+"""Routes pour les jobs de scoring de datasets"""
+import os
+from flask import Blueprint, request, jsonify, current_app, send_file
+from marshmallow import ValidationError
+from services.scoring_job_service import ScoringJobService
+from schemas.scoring_job_schema import CreateScoringJobSchema
+
+scoring_jobs_bp = Blueprint('scoring_jobs', __name__, url_prefix='/scoring-jobs')
+
+
+@scoring_jobs_bp.route('', methods=['POST'])
+def create_scoring_job():
+    """Lance le scoring d'un dataset par un modèle entraîné (job en arrière-plan)"""
+    try:
+        schema = CreateScoringJobSchema()
+        data = schema.load(request.get_json(silent=True) or {})
+        
+        job = ScoringJobService.create_job(
+            data['model_id'],
+            data['dataset_id'],
+            chunk_size=data.get('chunk_size'),
+            workers=data.get('workers'),
+            app=current_app._get_current_object()
+        )
+        
+        return jsonify(job), 202
+        
+    except ValidationError as e:
+        return jsonify({'error': {'code': 'VALIDATION_ERROR', 'message': 'Données invalides', 'details': e.messages}}), 400
+    except ValueError as e:
+        return jsonify({'error': {'code': 'VALIDATION_ERROR', 'message': str(e)}}), 400
+    except Exception as e:
+        current_app.logger.error(f"Erreur create scoring job: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de la création du job'}}), 500
+
+
+@scoring_jobs_bp.route('', methods=['GET'])
+def get_scoring_jobs():
+    """Liste les jobs de scoring (filtre optionnel ?model_id=)"""
+    try:
+        jobs = ScoringJobService.get_all_jobs(request.args.get('model_id', type=int))
+        return jsonify(jobs), 200
+    except Exception as e:
+        current_app.logger.error(f"Erreur get scoring jobs: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de la récupération'}}), 500
+
+
+@scoring_jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_scoring_job(job_id):
+    """Récupère l'état et la progression d'un job"""
+    try:
+        job = ScoringJobService.get_job(job_id)
+        return jsonify(job.to_dict()), 200
+    except ValueError as e:
+        return jsonify({'error': {'code': 'NOT_FOUND', 'message': str(e)}}), 404
+    except Exception as e:
+        current_app.logger.error(f"Erreur get scoring job: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de la récupération'}}), 500
+
+
+@scoring_jobs_bp.route('/<int:job_id>/cancel', methods=['POST'])
+def cancel_scoring_job(job_id):
+    """Demande l'annulation d'un job en attente ou en cours"""
+    try:
+        job = ScoringJobService.cancel_job(job_id)
+        return jsonify(job), 200
+    except ValueError as e:
+        if 'introuvable' in str(e):
+            return jsonify({'error': {'code': 'NOT_FOUND', 'message': str(e)}}), 404
+        return jsonify({'error': {'code': 'INVALID_STATE', 'message': str(e)}}), 409
+    except Exception as e:
+        current_app.logger.error(f"Erreur cancel scoring job: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors de l\'annulation'}}), 500
+
+
+@scoring_jobs_bp.route('/<int:job_id>/download', methods=['GET'])
+def download_scoring_output(job_id):
+    """Télécharge le fichier CSV de sortie d'un job terminé"""
+    try:
+        job = ScoringJobService.get_job(job_id)
+        
+        if job.status != 'completed' or not os.path.exists(job.output_path):
+            return jsonify({'error': {'code': 'INVALID_STATE', 'message': f"Aucun fichier disponible (statut: {job.status})"}}), 409
+        
+        return send_file(
+            os.path.abspath(job.output_path),
+            mimetype='text/csv',
+            as_attachment=True,
+            download_name=os.path.basename(job.output_path)
+        )
+    except ValueError as e:
+        return jsonify({'error': {'code': 'NOT_FOUND', 'message': str(e)}}), 404
+    except Exception as e:
+        current_app.logger.error(f"Erreur download scoring output: {str(e)}")
+        return jsonify({'error': {'code': 'INTERNAL_ERROR', 'message': 'Erreur lors du téléchargement'}}), 500
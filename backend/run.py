@@ -8,10 +8,16 @@ load_dotenv()
 # Forcer SQLite
 os.environ['DATABASE_URL'] = 'sqlite:///ml_platform.db'
 
-from app import create_app
 
-# Créer l'application
-app = create_app(os.getenv('FLASK_ENV', 'development'))
+def main():
+    from app import create_app
 
-if __name__ == '__main__':
+    # Créer l'application
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
     app.run(host='0.0.0.0', port=5000, debug=app.config['DEBUG'])
+
+
+# Garde indispensable: les processus du test des algorithmes et des jobs de
+# scoring (spawn) réimportent ce module, ils ne doivent pas recréer l'application
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Script pour lancer le serveur de prédiction asynchrone (routes /api/predict uniquement)
+
+Usage:
+    python run_async.py --port 5001 --workers 4
+"""
+import os
+import argparse
+from dotenv import load_dotenv
+
+# Charger les variables d'environnement
+load_dotenv()
+
+# Même base que run.py
+os.environ['DATABASE_URL'] = 'sqlite:///ml_platform.db'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de prédiction asynchrone")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--workers', type=int, default=None, help="Processus du pool de prédiction")
+    parser.add_argument('--profile', choices=['full', 'serving'], default=os.getenv('APP_PROFILE', 'serving'),
+                        help="Profil de l'application Flask (serving: tables créées par run.py)")
+    args = parser.parse_args()
+
+    from aiohttp import web
+    from app import create_app
+    from async_app import create_async_app
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'), profile=args.profile)
+    web.run_app(create_async_app(app, workers=args.workers), host=args.host, port=args.port)
+
+
+# Garde indispensable: les processus du pool (spawn) réimportent ce module
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""Exported API schemas pour validation"""
+from marshmallow import Schema, fields, validate
+
+
+class APISettingsSchema(Schema):
+    """Schéma pour la mise à jour des réglages de service d'une API (mise à jour partielle)"""
+    micro_batch_enabled = fields.Bool()
+    micro_batch_window_ms = fields.Float(validate=validate.Range(min=0.1, max=1000))
+    micro_batch_max_size = fields.Int(validate=validate.Range(min=1, max=4096))
+    result_cache_enabled = fields.Bool()
+    result_cache_ttl = fields.Int(validate=validate.Range(min=1, max=86400))
+    result_cache_max_entries = fields.Int(validate=validate.Range(min=1, max=1000000))
+    rate_limit_enabled = fields.Bool()
+    rate_limit_per_second = fields.Float(validate=validate.Range(min=0.01, max=100000))
+    rate_limit_burst = fields.Int(validate=validate.Range(min=1, max=100000))
+    max_in_flight = fields.Int(validate=validate.Range(min=0, max=10000))  # 0 = illimité
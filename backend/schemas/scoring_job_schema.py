@@ -0,0 +1,10 @@
+"""Scoring job schemas pour validation"""
+from marshmallow import Schema, fields, validate
+
+
+class CreateScoringJobSchema(Schema):
+    """Schéma pour la création d'un job de scoring"""
+    model_id = fields.Int(required=True)
+    dataset_id = fields.Int(required=True)
+    chunk_size = fields.Int(validate=validate.Range(min=100, max=1000000))
+    workers = fields.Int(validate=validate.Range(min=1, max=64))
@@ -0,0 +1,489 @@
+"""Test des algorithmes candidats en parallèle, dans des processus workers réutilisés"""
+import os
+import json
+import atexit
+import time
+import uuid
+import shutil
+import signal
+import hashlib
+import importlib
+import logging
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+import numpy as np
+from utils.ml_algorithms import MLAlgorithms
+
+try:
+    import resource
+except ImportError:  # Windows: pas de limite mémoire par processus
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DATA_KEYS = ('X_train', 'X_test', 'y_train', 'y_test')
+# À incrémenter quand MLAlgorithms.preprocess_data change: invalide le cache sur disque
+PREPROCESSING_VERSION = 1
+# Bail d'une entrée du cache en cours d'utilisation (ignoré au-delà de LEASE_MAX_AGE: processus mort)
+LEASE_PREFIX = '.lease-'
+LEASE_MAX_AGE = 24 * 3600
+# Message envoyé par un worker une fois scikit-learn importé: le temps limite part de là
+READY = 'ready'
+# Un worker est remplacé après ce nombre d'algorithmes (mémoire fragmentée par les entraînements)
+MAX_TASKS_PER_WORKER = 50
+# Modules importés par MLAlgorithms à l'entraînement
+TRAINING_MODULES = ('sklearn.preprocessing', 'sklearn.impute', 'sklearn.metrics', 'sklearn.linear_model',
+                    'sklearn.neighbors', 'sklearn.tree', 'sklearn.ensemble', 'sklearn.svm')
+
+
+def _limit_memory(memory_limit_mb):
+    """Plafonne l'espace d'adressage du processus (RLIMIT_AS, sans effet hors Unix)"""
+    if not memory_limit_mb or resource is None:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _load(value):
+    """Tableau .npy mappé en mémoire (lecture seule, pages partagées entre processus) ou valeur telle quelle"""
+    return np.load(value, mmap_mode='r') if isinstance(value, str) else value
+
+
+def _evaluate(algorithm, data, problem_type):
+    """Entraîne et évalue un algorithme (processus worker ou processus courant)"""
+    start_time = time.time()
+    try:
+        X_train, X_test, y_train, y_test = (_load(data[name]) for name in DATA_KEYS)
+        # Données déjà prétraitées par prepare(): seuls les tableaux servent au score
+        prepared = (X_train, X_test, y_train, y_test, None, None, {}) if data['preprocessed'] else None
+        return AlgorithmTournament.summarize(
+            MLAlgorithms.train_and_evaluate(algorithm, X_train, X_test, y_train, y_test, problem_type, prepared)
+        )
+    except Exception as e:
+        # MemoryError hors de train_and_evaluate (limite atteinte pendant la sérialisation...)
+        return AlgorithmTournament.failure(algorithm, str(e) or type(e).__name__, time.time() - start_time)
+
+
+def _worker_main(connection, memory_limit_mb):
+    """Boucle d'un processus worker: signale qu'il est prêt puis exécute les algorithmes reçus"""
+    # Pile d'entraînement importée avant READY: le temps limite ne compte que l'entraînement
+    for module in TRAINING_MODULES:
+        importlib.import_module(module)
+    _limit_memory(memory_limit_mb)
+    connection.send(READY)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        connection.send(_evaluate(*task))
+    connection.close()
+
+
+class _Worker:
+    """Processus worker du tournoi, réutilisé d'un test à l'autre"""
+
+    def __init__(self, context, memory_limit_mb):
+        self.memory_limit_mb = memory_limit_mb
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, memory_limit_mb), name='tournament-worker', daemon=True
+        )
+        self.process.start()
+        # Seul l'enfant garde son côté du pipe: sa mort rend le pipe lisible (EOF)
+        child.close()
+        self.ready = False
+        self.algorithm = None  # algorithme en cours
+        self.started_at = None
+        self.tasks = 0
+
+    def submit(self, algorithm, data, problem_type):
+        self.connection.send((algorithm, data, problem_type))
+        self.algorithm = algorithm
+        self.started_at = time.monotonic()
+
+    def finish(self):
+        self.algorithm = None
+        self.started_at = None
+        self.tasks += 1
+
+    def reusable(self, memory_limit_mb):
+        return (self.algorithm is None and self.process.is_alive()
+                and self.memory_limit_mb == memory_limit_mb and self.tasks < MAX_TASKS_PER_WORKER)
+
+    def close(self):
+        """Arrête le processus (demande de sortie, puis kill s'il ne se termine pas)"""
+        try:
+            if self.algorithm is None:
+                self.connection.send(None)
+        except OSError:
+            pass
+        else:
+            self.process.join(5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class AlgorithmTournament:
+    """
+    Entraîne et évalue les algorithmes candidats en parallèle
+
+    Les données sont prétraitées une seule fois (prepare) puis les
+    algorithmes sont répartis sur des processus workers (spawn, comme les
+    jobs de scoring), au plus max_workers à la fois. Les workers restent
+    démarrés entre deux tests: le coût de démarrage de l'interpréteur et de
+    l'import de scikit-learn n'est payé qu'une fois. Un algorithme qui
+    dépasse le temps limite voit son worker tué et remplacé, un worker qui
+    meurt (mémoire, signal) est signalé: l'algorithme est alors en erreur
+    avec un score de 0 et les autres continuent. Seul le résumé (score,
+    métriques) revient au parent, pas le modèle entraîné.
+
+    Avec max_workers=1 ou un petit dataset, les algorithmes tournent dans
+    le processus courant, sans temps limite ni plafond mémoire.
+    """
+
+    _idle_workers = []  # workers prêts à être réutilisés
+    _workers_lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(dataset_path, inputs, output, **split):
+        """
+        Clé du prétraitement d'un (dataset, inputs, découpage)
+
+        Le fichier du dataset est identifié par sa taille et sa date de
+        modification: un fichier remplacé donne une nouvelle clé.
+        """
+        stat = os.stat(dataset_path)
+        identity = {
+            'dataset': os.path.abspath(dataset_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'inputs': list(inputs),
+            'output': output,
+            'split': split,
+            'version': PREPROCESSING_VERSION
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:32]
+
+    @staticmethod
+    def prepare(X_train, X_test, y_train, y_test, cache_folder=None, cache_key=None, max_entries=20):
+        """
+        Prétraite les données une fois pour tous les algorithmes
+
+        Avec cache_folder et cache_key, les matrices sont écrites en .npy
+        (réutilisées aux tests suivants sur les mêmes données) et les
+        processus les mappent en mémoire au lieu de les recevoir sérialisées.
+        Les cibles non numériques (étiquettes texte) restent en mémoire.
+        L'entrée du cache est réservée (fichier de bail) jusqu'à release():
+        l'éviction ne la supprime pas pendant que des workers la lisent.
+
+        Returns:
+            dict: {'preprocessed': bool, 'X_train': chemin ou tableau, ...}
+                  (données brutes si le prétraitement a échoué, comme train_and_evaluate)
+        """
+        if cache_folder and cache_key:
+            # Chemins absolus: les workers n'ont pas forcément le même répertoire courant
+            cache_folder = os.path.abspath(cache_folder)
+            folder = os.path.join(cache_folder, cache_key)
+            data = AlgorithmTournament._read_cache(folder, y_train, y_test)
+            if data is not None:
+                logger.info(f"Prétraitement réutilisé depuis le cache: {folder}")
+                return data
+
+        X_train_processed, X_test_processed, y_train, y_test, scaler, _, _ = \
+            MLAlgorithms.preprocess_data(X_train, X_test, y_train, y_test)
+        if scaler is None:
+            # Échec du prétraitement: chaque algorithme réessaie sur les données brutes
+            return {'preprocessed': False, 'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+
+        data = {'preprocessed': True, 'X_train': X_train_processed, 'X_test': X_test_processed,
+                'y_train': y_train, 'y_test': y_test}
+        if cache_folder and cache_key:
+            try:
+                return AlgorithmTournament._write_cache(cache_folder, cache_key, data, max_entries)
+            except OSError as e:
+                logger.warning(f"Cache du prétraitement indisponible, données envoyées aux processus: {str(e)}")
+        return data
+
+    @staticmethod
+    def release(data):
+        """Libère l'entrée du cache réservée par prepare() (à appeler après run)"""
+        lease = data.get('lease')
+        if lease:
+            try:
+                os.remove(lease)
+            except OSError:
+                pass
+
+    @staticmethod
+    def run(algorithms, data, problem_type, max_workers=None, timeout=None, memory_limit_mb=None,
+            inprocess_max_rows=0):
+        """
+        Teste les algorithmes
+
+        Args:
+            algorithms: Clés des algorithmes (MLAlgorithms.ALGORITHMS)
+            data: Données retournées par prepare()
+            problem_type: 'classification' ou 'regression'
+            max_workers: Processus simultanés (défaut: nombre de CPU, 1 = processus courant)
+            timeout: Secondes par algorithme, comptées à partir du moment où le worker est prêt
+                     (None/0 = illimité)
+            memory_limit_mb: Espace d'adressage maximal par worker (None/0 = illimité)
+            inprocess_max_rows: Jeu d'entraînement jusqu'à ce nombre de lignes: processus courant
+
+        Returns:
+            list: Résultats dans l'ordre de algorithms
+        """
+        if max_workers == 1 or len(_load(data['X_train'])) <= inprocess_max_rows:
+            # Démarrer un worker coûterait plus que l'entraînement lui-même
+            return [_evaluate(algorithm, data, problem_type) for algorithm in algorithms]
+
+        count = max(1, min(max_workers or os.cpu_count() or 1, len(algorithms)))
+        workers = AlgorithmTournament._checkout(count, memory_limit_mb)
+        pending = list(algorithms)
+        results = {}
+
+        try:
+            while pending or any(worker.algorithm for worker in workers):
+                for worker in workers:
+                    if worker.ready and worker.algorithm is None and pending:
+                        worker.submit(pending.pop(0), data, problem_type)
+
+                busy = [worker for worker in workers if worker.algorithm is not None]
+                wait_timeout = None
+                if timeout and busy:
+                    oldest = min(worker.started_at for worker in busy)
+                    wait_timeout = max(0.0, oldest + timeout - time.monotonic())
+                wait([worker.connection for worker in workers], timeout=wait_timeout)
+
+                now = time.monotonic()
+                for index, worker in enumerate(workers):
+                    elapsed = now - worker.started_at if worker.algorithm else 0.0
+                    if worker.connection.poll():
+                        try:
+                            message = worker.connection.recv()
+                        except EOFError:
+                            worker.process.join(5)
+                            message = AlgorithmTournament._exit_message(worker.process.exitcode)
+                        else:
+                            if message == READY:
+                                worker.ready = True
+                            else:
+                                results[worker.algorithm] = message
+                                worker.finish()
+                            continue
+                        # Worker mort au démarrage: l'algorithme suivant échoue, pas de redémarrage en boucle
+                        algorithm = worker.algorithm or (pending.pop(0) if pending else None)
+                    elif timeout and worker.algorithm and elapsed >= timeout:
+                        algorithm = worker.algorithm
+                        logger.warning(f"{algorithm}: temps limite de {timeout:g}s dépassé, worker arrêté")
+                        message = f"Temps limite dépassé ({timeout:g}s)"
+                    else:
+                        continue
+
+                    worker.kill()
+                    if algorithm:
+                        results[algorithm] = AlgorithmTournament.failure(algorithm, message, elapsed)
+                    workers[index] = AlgorithmTournament._spawn(memory_limit_mb) if pending else None
+                workers = [worker for worker in workers if worker is not None]
+        finally:
+            AlgorithmTournament._checkin(workers, count)
+
+        return [results[algorithm] for algorithm in algorithms]
+
+    @staticmethod
+    def shutdown_workers():
+        """Arrête les workers inactifs (fin du processus serveur)"""
+        with AlgorithmTournament._workers_lock:
+            workers, AlgorithmTournament._idle_workers = AlgorithmTournament._idle_workers, []
+        for worker in workers:
+            worker.close()
+
+    @staticmethod
+    def _spawn(memory_limit_mb):
+        return _Worker(multiprocessing.get_context('spawn'), memory_limit_mb)
+
+    @staticmethod
+    def _checkout(count, memory_limit_mb):
+        """Réserve count workers: inactifs réutilisables d'abord, nouveaux processus pour le reste"""
+        workers, remaining, stale = [], [], []
+        with AlgorithmTournament._workers_lock:
+            for worker in AlgorithmTournament._idle_workers:
+                if not worker.reusable(memory_limit_mb):
+                    stale.append(worker)
+                elif len(workers) < count:
+                    workers.append(worker)
+                else:
+                    # Disponibles pour un test concurrent
+                    remaining.append(worker)
+            AlgorithmTournament._idle_workers = remaining
+        for worker in stale:
+            worker.close()
+        while len(workers) < count:
+            workers.append(AlgorithmTournament._spawn(memory_limit_mb))
+        return workers
+
+    @staticmethod
+    def _checkin(workers, keep):
+        """Rend les workers inactifs, arrête les autres (surnuméraires, ou occupés après une exception)"""
+        stopped = []
+        with AlgorithmTournament._workers_lock:
+            for worker in workers:
+                if worker.algorithm is None and worker.process.is_alive() \
+                        and len(AlgorithmTournament._idle_workers) < keep:
+                    AlgorithmTournament._idle_workers.append(worker)
+                else:
+                    stopped.append(worker)
+        for worker in stopped:
+            if worker.algorithm is not None:
+                worker.kill()
+            else:
+                worker.close()
+
+    @staticmethod
+    def summarize(result):
+        """Résultat de train_and_evaluate renvoyé au client (sans l'instance du modèle)"""
+        summary = {
+            'algorithm': result['algorithm'],
+            'name': result['name'],
+            'description': result['description'],
+            'score': result['score'],
+            'metrics': result.get('metrics', {}),
+            'training_time': result['training_time']
+        }
+        if 'error' in result:
+            summary['error'] = result['error']
+        return summary
+
+    @staticmethod
+    def failure(algorithm, message, elapsed):
+        """Résultat d'un algorithme en échec (même forme que summarize)"""
+        return {
+            'algorithm': algorithm,
+            'name': MLAlgorithms.ALGORITHMS[algorithm]['name'],
+            'description': MLAlgorithms.ALGORITHMS[algorithm]['description'],
+            'score': 0.0,
+            'metrics': {},
+            'training_time': round(elapsed, 2),
+            'error': message
+        }
+
+    @staticmethod
+    def _read_cache(folder, y_train, y_test):
+        """Données d'un prétraitement déjà écrit (entrée réservée), None si absent ou incomplet"""
+        lease = AlgorithmTournament._acquire_lease(folder)
+        if lease is None:
+            return None
+
+        targets = {'y_train': y_train, 'y_test': y_test}
+        data = {'preprocessed': True, 'lease': lease}
+        for name in DATA_KEYS:
+            path = os.path.join(folder, f"{name}.npy")
+            if os.path.exists(path):
+                data[name] = path
+            elif name in targets and targets[name].dtype.hasobject:
+                data[name] = targets[name]
+            else:
+                AlgorithmTournament.release(data)
+                return None
+        # Date du dossier = dernière utilisation (pour l'éviction)
+        os.utime(folder)
+        return data
+
+    @staticmethod
+    def _write_cache(cache_folder, cache_key, data, max_entries):
+        """Écrit les tableaux dans un dossier temporaire renommé une fois complet"""
+        folder = os.path.join(cache_folder, cache_key)
+        tmp_folder = os.path.join(cache_folder, f".{cache_key}.{uuid.uuid4().hex}")
+        os.makedirs(tmp_folder)
+
+        cached = {'preprocessed': True}
+        try:
+            for name in DATA_KEYS:
+                array = np.asarray(data[name])
+                if array.dtype.hasobject:
+                    cached[name] = data[name]
+                    continue
+                np.save(os.path.join(tmp_folder, f"{name}.npy"), array, allow_pickle=False)
+                cached[name] = os.path.join(folder, f"{name}.npy")
+            try:
+                os.rename(tmp_folder, folder)
+            except OSError:
+                # Écrit entre-temps par une autre requête: même contenu
+                if not os.path.isdir(folder):
+                    raise
+        finally:
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+
+        cached['lease'] = AlgorithmTournament._acquire_lease(folder)
+        if cached['lease'] is None:
+            raise OSError(f"Entrée du cache supprimée pendant l'écriture: {folder}")
+        os.utime(folder)
+        AlgorithmTournament._prune_cache(cache_folder, max_entries, keep=folder)
+        return cached
+
+    @staticmethod
+    def _acquire_lease(folder):
+        """Crée un fichier de bail dans l'entrée du cache, None si elle n'existe pas"""
+        lease = os.path.join(folder, f"{LEASE_PREFIX}{os.getpid()}-{uuid.uuid4().hex}")
+        try:
+            with open(lease, 'x'):
+                pass
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return lease
+
+    @staticmethod
+    def _leased(folder):
+        """Vrai si un test en cours utilise l'entrée (bail plus récent que LEASE_MAX_AGE)"""
+        now = time.time()
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return False
+        for name in names:
+            if not name.startswith(LEASE_PREFIX):
+                continue
+            try:
+                if now - os.path.getmtime(os.path.join(folder, name)) < LEASE_MAX_AGE:
+                    return True
+            except OSError:
+                continue
+        return False
+
+    @staticmethod
+    def _prune_cache(cache_folder, max_entries, keep=None):
+        """Garde les max_entries prétraitements utilisés le plus récemment, sans toucher aux entrées réservées"""
+        entries = [
+            os.path.join(cache_folder, name) for name in os.listdir(cache_folder)
+            if not name.startswith('.') and os.path.isdir(os.path.join(cache_folder, name))
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for folder in entries[max_entries:]:
+            if folder == keep or AlgorithmTournament._leased(folder):
+                continue
+            shutil.rmtree(folder, ignore_errors=True)
+
+    @staticmethod
+    def _exit_message(exitcode):
+        if exitcode is not None and exitcode < 0:
+            try:
+                name = signal.Signals(-exitcode).name
+            except ValueError:
+                name = str(-exitcode)
+            return f"Processus arrêté par le signal {name} (mémoire insuffisante ?)"
+        return f"Processus terminé sans résultat (code {exitcode})"
+
+
+atexit.register(AlgorithmTournament.shutdown_workers)
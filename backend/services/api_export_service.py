@@ -4,6 +4,11 @@ import logging
 from extensions import db
 from models.exported_api import ExportedAPI
 from models.ml_model import MLModel
+from services.prediction_service import PredictionService
+from services.usage_counters import UsageCounters
+from services.micro_batcher import MicroBatcher
+from services.rate_limiter import RateLimiter
+from utils.api_key_cache import APIKeyCache, ResolvedAPI
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +16,24 @@ logger = logging.getLogger(__name__)
 class APIExportService:
     """Service pour gérer l'export de modèles ML en APIs"""
     
+    # Clés API résolues (TTL réglé par init_app via API_KEY_CACHE_TTL)
+    _key_cache = APIKeyCache(ttl=60)
+    
+    @staticmethod
+    def init_app(app):
+        """Configure le service à partir de la configuration Flask"""
+        APIExportService._key_cache.ttl = app.config['API_KEY_CACHE_TTL']
+    
+    @staticmethod
+    def get_key_cache_stats():
+        """Retourne les compteurs du cache des clés API"""
+        return APIExportService._key_cache.stats()
+    
+    @staticmethod
+    def invalidate_model_keys(model_id):
+        """Oublie les clés en cache des APIs d'un modèle (réentraîné ou supprimé)"""
+        APIExportService._key_cache.invalidate_model(model_id)
+    
     @staticmethod
     def export_model(model_id):
         """
@@ -112,6 +135,45 @@ class APIExportService:
         api = ExportedAPI.query.filter_by(api_key=api_key).first()
         return api
     
+    @staticmethod
+    def resolve_api_key(api_key):
+        """
+        Résout une clé API en passant par le cache en mémoire
+        
+        En régime établi, aucune requête n'est faite en base: l'API et les
+        métadonnées de son modèle sont servies depuis le cache.
+        
+        Args:
+            api_key: Clé API à valider
+            
+        Returns:
+            ResolvedAPI: Copie détachée de l'API si la clé est valide, None sinon
+        """
+        if not api_key:
+            return None
+        
+        resolved = APIExportService._key_cache.get(api_key)
+        if resolved is not None:
+            return resolved
+        
+        api = APIExportService.validate_api_key(api_key)
+        if not api:
+            return None
+        
+        resolved = ResolvedAPI(api)
+        APIExportService._key_cache.put(api_key, resolved)
+        return resolved
+    
+    @staticmethod
+    def get_cached_api(api_key):
+        """
+        Retourne l'API résolue si la clé est en cache, sans jamais interroger la base
+        
+        Returns:
+            ResolvedAPI: Copie détachée de l'API, None si la clé n'est pas en cache
+        """
+        return APIExportService._key_cache.get(api_key)
+    
     @staticmethod
     def deactivate_api(api_id):
         """
@@ -126,6 +188,13 @@ class APIExportService:
         
         api.status = 'inactive'
         db.session.commit()
+        APIExportService._key_cache.invalidate_api(api_id)
+        
+        # Libérer la mémoire du modèle tant que l'API ne sert plus
+        APIExportService._release_model(api.model_id)
+        PredictionService.discard_result_cache(api_id)
+        MicroBatcher.discard(api_id)
+        RateLimiter.discard(api_id)
         
         logger.info(f"API {api_id} désactivée")
         return api.to_dict()
@@ -144,6 +213,7 @@ class APIExportService:
         
         api.status = 'active'
         db.session.commit()
+        APIExportService._key_cache.invalidate_api(api_id)
         
         logger.info(f"API {api_id} activée")
         return api.to_dict()
@@ -167,6 +237,7 @@ class APIExportService:
         new_key = APIExportService.generate_api_key()
         api.api_key = new_key
         db.session.commit()
+        APIExportService._key_cache.invalidate_api(api_id)
         
         logger.info(f"Clé API régénérée pour l'API {api_id}")
         
@@ -175,6 +246,38 @@ class APIExportService:
             'api_id': api_id
         }
     
+    @staticmethod
+    def update_settings(api_id, settings):
+        """
+        Met à jour les réglages de service d'une API
+        
+        Args:
+            api_id: ID de l'API
+            settings: Réglages validés par APISettingsSchema (mise à jour partielle)
+            
+        Returns:
+            dict: L'API mise à jour
+        """
+        api = ExportedAPI.query.get(api_id)
+        if not api:
+            raise ValueError(f"API {api_id} introuvable")
+        
+        for name, value in settings.items():
+            setattr(api, name, value)
+        db.session.commit()
+        
+        # Les réglages voyagent avec l'API résolue: forcer sa relecture
+        APIExportService._key_cache.invalidate_api(api_id)
+        if not api.micro_batch_enabled:
+            MicroBatcher.discard(api_id)
+        if not api.result_cache_enabled:
+            PredictionService.discard_result_cache(api_id)
+        if not RateLimiter.is_limited(api):
+            RateLimiter.discard(api_id)
+        
+        logger.info(f"Réglages de l'API {api_id} mis à jour: {settings}")
+        return UsageCounters.merge(api.to_dict())
+    
     @staticmethod
     def delete_api(api_id):
         """
@@ -187,12 +290,34 @@ class APIExportService:
         if not api:
             raise ValueError(f"API {api_id} introuvable")
         
+        model_id = api.model_id
         db.session.delete(api)
         db.session.commit()
+        APIExportService._key_cache.invalidate_api(api_id)
+        
+        APIExportService._release_model(model_id)
+        PredictionService.discard_result_cache(api_id)
+        MicroBatcher.discard(api_id)
+        RateLimiter.discard(api_id)
         
         logger.info(f"API {api_id} supprimée")
         return True
     
+    @staticmethod
+    def _release_model(model_id):
+        """
+        Retire un modèle du cache s'il n'est plus servi par aucune API active
+        
+        Une autre API active du même modèle garderait sinon un modèle à
+        recharger et un cache de résultats vidé à sa prochaine requête.
+        
+        Args:
+            model_id: ID du modèle de l'API désactivée ou supprimée
+        """
+        still_served = ExportedAPI.query.filter_by(model_id=model_id, status='active').first() is not None
+        if not still_served:
+            PredictionService.invalidate_model(model_id)
+    
     @staticmethod
     def get_all_apis():
         """
@@ -202,7 +327,7 @@ class APIExportService:
             list: Liste des APIs
         """
         apis = ExportedAPI.query.order_by(ExportedAPI.created_at.desc()).all()
-        return [api.to_dict() for api in apis]
+        return [UsageCounters.merge(api.to_dict()) for api in apis]
     
     @staticmethod
     def get_api_details(api_id):
@@ -219,4 +344,4 @@ class APIExportService:
         if not api:
             raise ValueError(f"API {api_id} introuvable")
         
-        return api.to_dict()
+        return UsageCounters.merge(api.to_dict())
@@ -0,0 +1,177 @@
+"""Métriques du processus en mémoire, exposées au format texte Prometheus (/metrics)"""
+import logging
+from services.prediction_service import PredictionService
+from services.api_export_service import APIExportService
+from services.rate_limiter import RateLimiter
+from services.request_log_writer import RequestLogWriter
+from utils.metrics import CounterFamily, HistogramFamily, render_family
+
+logger = logging.getLogger(__name__)
+
+# Durée des requêtes et de leurs phases (secondes)
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class MetricsService:
+    """
+    Registre des métriques de prédiction du processus
+
+    Les requêtes sont comptées et leurs durées (totale et par phase, voir
+    utils/timing.py) observées en mémoire au moment de la réponse; les
+    caches, la file des logs, les limites d'admission et le pool de
+    connexions sont lus au moment du scrape. Servir /metrics ne fait
+    aucune requête en base. Comme les autres compteurs en mémoire, les
+    valeurs sont propres à chaque processus worker.
+    """
+
+    _requests = CounterFamily(
+        'ml_api_requests_total',
+        'Prediction API requests by API, endpoint and HTTP status',
+        ('api_id', 'endpoint', 'status')
+    )
+    _request_duration = HistogramFamily(
+        'ml_api_request_duration_seconds',
+        'Prediction API request duration (until the response starts)',
+        ('api_id', 'endpoint'),
+        DURATION_BUCKETS
+    )
+    _phase_duration = HistogramFamily(
+        'ml_api_phase_duration_seconds',
+        'Time spent in each phase of a prediction request (auth, load, decode, predict, ...)',
+        ('api_id', 'phase'),
+        DURATION_BUCKETS
+    )
+
+    @staticmethod
+    def observe_request(api_id, endpoint, status_code, timer):
+        """
+        Comptabilise une requête de prédiction terminée
+
+        Args:
+            api_id: ID de l'API authentifiée (None si la clé a été refusée)
+            endpoint: Nom de la route (predict, predict_batch, ...)
+            status_code: Code HTTP de la réponse
+            timer: PhaseTimer de la requête
+        """
+        api_label = str(api_id) if api_id is not None else 'none'
+        MetricsService._requests.inc(api_label, endpoint, str(status_code))
+        MetricsService._request_duration.observe(timer.elapsed(), api_label, endpoint)
+        for phase, seconds in timer.durations().items():
+            MetricsService._phase_duration.observe(seconds, api_label, phase)
+
+    @staticmethod
+    def reset():
+        """Remet à zéro les compteurs et histogrammes des requêtes"""
+        MetricsService._requests.clear()
+        MetricsService._request_duration.clear()
+        MetricsService._phase_duration.clear()
+
+    @staticmethod
+    def render(engine=None):
+        """
+        Texte de toutes les métriques (format d'exposition Prometheus 0.0.4)
+
+        Args:
+            engine: Engine SQLAlchemy dont le pool de connexions est exposé (optionnel)
+        """
+        blocks = [
+            MetricsService._requests.render(),
+            MetricsService._request_duration.render(),
+            MetricsService._phase_duration.render()
+        ]
+        blocks.extend(MetricsService._cache_blocks())
+        blocks.extend(MetricsService._admission_blocks())
+        blocks.extend(MetricsService._request_log_blocks())
+        if engine is not None:
+            blocks.extend(MetricsService._db_pool_blocks(engine))
+        return '\n'.join(blocks) + '\n'
+
+    @staticmethod
+    def _cache_blocks():
+        model_cache = PredictionService.get_cache_stats()
+        key_cache = APIExportService.get_key_cache_stats()
+        result_caches = sorted(PredictionService.get_result_cache_stats().items())
+
+        return [
+            render_family('ml_model_cache_entries', 'gauge', 'Models loaded in the model cache',
+                          [('', {}, model_cache['entries'])]),
+            render_family('ml_model_cache_bytes', 'gauge', 'Estimated size of the cached models',
+                          [('', {}, model_cache['current_bytes'])]),
+            render_family('ml_model_cache_max_bytes', 'gauge', 'Model cache capacity',
+                          [('', {}, model_cache['max_bytes'])]),
+            render_family('ml_model_cache_hits_total', 'counter', 'Model cache hits',
+                          [('', {}, model_cache['hits'])]),
+            render_family('ml_model_cache_misses_total', 'counter', 'Model cache misses',
+                          [('', {}, model_cache['misses'])]),
+            render_family('ml_model_cache_evictions_total', 'counter', 'Models evicted from the cache',
+                          [('', {}, model_cache['evictions'])]),
+            render_family('ml_model_load_seconds_total', 'counter', 'Time spent loading models from disk',
+                          [('', {}, model_cache['total_load_time'])]),
+            render_family('ml_api_key_cache_entries', 'gauge', 'Resolved API keys in cache',
+                          [('', {}, key_cache['entries'])]),
+            render_family('ml_api_key_cache_hits_total', 'counter', 'API key cache hits',
+                          [('', {}, key_cache['hits'])]),
+            render_family('ml_api_key_cache_misses_total', 'counter', 'API key cache misses',
+                          [('', {}, key_cache['misses'])]),
+            render_family('ml_result_cache_entries', 'gauge', 'Memoized predictions per API',
+                          [('', {'api_id': api_id}, stats['entries']) for api_id, stats in result_caches]),
+            render_family('ml_result_cache_hits_total', 'counter', 'Result cache hits per API',
+                          [('', {'api_id': api_id}, stats['hits']) for api_id, stats in result_caches]),
+            render_family('ml_result_cache_misses_total', 'counter', 'Result cache misses per API',
+                          [('', {'api_id': api_id}, stats['misses']) for api_id, stats in result_caches])
+        ]
+
+    @staticmethod
+    def _admission_blocks():
+        limiters = sorted(RateLimiter.get_all_stats(), key=lambda stats: stats['api_id'])
+        rejected = []
+        for stats in limiters:
+            rejected.append(('', {'api_id': stats['api_id'], 'reason': 'rate_limit'}, stats['rate_limited']))
+            rejected.append(('', {'api_id': stats['api_id'], 'reason': 'concurrency'}, stats['concurrency_limited']))
+
+        return [
+            render_family('ml_api_in_flight', 'gauge', 'Requests in progress per rate-limited API',
+                          [('', {'api_id': stats['api_id']}, stats['in_flight']) for stats in limiters]),
+            render_family('ml_api_rejected_total', 'counter', 'Requests rejected with 429 per API and reason',
+                          rejected)
+        ]
+
+    @staticmethod
+    def _request_log_blocks():
+        stats = RequestLogWriter.stats()
+        return [
+            render_family('ml_request_log_queued', 'gauge', 'Request logs waiting to be written',
+                          [('', {}, stats['queued'])]),
+            render_family('ml_request_log_written_total', 'counter', 'Request logs written to the database',
+                          [('', {}, stats['written'])]),
+            render_family('ml_request_log_dropped_total', 'counter', 'Request logs dropped (queue full)',
+                          [('', {}, stats['dropped'])])
+        ]
+
+    @staticmethod
+    def _db_pool_blocks(engine):
+        """Occupation du pool de connexions (pools à taille fixe, QueuePool)"""
+        pool = engine.pool
+        if not all(hasattr(pool, name) for name in ('size', 'checkedin', 'checkedout', 'overflow')):
+            return []
+        try:
+            values = {
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow()
+            }
+        except Exception as e:
+            logger.warning(f"Lecture du pool de connexions impossible: {str(e)}")
+            return []
+
+        return [
+            render_family('ml_db_pool_size', 'gauge', 'Database connection pool size',
+                          [('', {}, values['size'])]),
+            render_family('ml_db_pool_checked_in', 'gauge', 'Idle connections in the pool',
+                          [('', {}, values['checked_in'])]),
+            render_family('ml_db_pool_checked_out', 'gauge', 'Connections in use',
+                          [('', {}, values['checked_out'])]),
+            render_family('ml_db_pool_overflow', 'gauge', 'Connections opened beyond the pool size',
+                          [('', {}, values['overflow'])])
+        ]
@@ -0,0 +1,224 @@
+"""Regroupement (micro-batching) des prédictions unitaires concurrentes"""
+import time
+import queue
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+import numpy as np
+from utils.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Taille des lots exécutés (nombre de requêtes)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+# Attente d'une requête dans la file avant l'appel au modèle (millisecondes)
+QUEUE_WAIT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class MicroBatcher:
+    """
+    File des prédictions unitaires d'une API, vidée par un thread dédié
+
+    La première requête arrivée ouvre une fenêtre de window_ms; le lot part
+    à la fin de la fenêtre ou dès qu'il atteint max_size requêtes. Les lignes
+    déjà décodées sont empilées et passées en un seul appel predict_encoded,
+    puis chaque requête reçoit sa ligne de résultat via un Future.
+
+    Une instance par API et par processus (registre de classe); changer les
+    réglages de l'API remplace l'instance et remet ses histogrammes à zéro.
+    """
+
+    _batchers = {}  # api_id -> MicroBatcher
+    _registry_lock = threading.Lock()
+
+    # Délai maximal d'attente d'un résultat par la requête (secondes)
+    result_timeout = 30
+
+    def __init__(self, api_id, window_ms, max_size):
+        self.api_id = api_id
+        self.window_ms = window_ms
+        self.max_size = max_size
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_waits = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self._window = window_ms / 1000
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        # Protège le dépôt dans la file contre un arrêt concurrent
+        self._accepting = threading.Lock()
+        self._lock = threading.Lock()
+        self._counters = {'batches': 0, 'requests': 0, 'errors': 0}
+        self._thread = threading.Thread(
+            target=self._run, name=f'micro-batcher-{api_id}', daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def for_api(api_id, window_ms, max_size):
+        """
+        Retourne le batcher de l'API, créé ou remplacé si ses réglages ont changé
+
+        Args:
+            api_id: ID de l'API
+            window_ms: Fenêtre d'attente en millisecondes
+            max_size: Nombre maximal de requêtes par lot
+
+        Returns:
+            MicroBatcher: Le batcher actif de l'API
+        """
+        with MicroBatcher._registry_lock:
+            batcher = MicroBatcher._batchers.get(api_id)
+            if batcher is not None and batcher.window_ms == window_ms and batcher.max_size == max_size:
+                return batcher
+            if batcher is not None:
+                batcher.stop()
+            batcher = MicroBatcher(api_id, window_ms, max_size)
+            MicroBatcher._batchers[api_id] = batcher
+            return batcher
+
+    @staticmethod
+    def discard(api_id):
+        """Arrête le batcher d'une API (désactivée, supprimée ou micro-batching coupé)"""
+        with MicroBatcher._registry_lock:
+            batcher = MicroBatcher._batchers.pop(api_id, None)
+        if batcher is not None:
+            batcher.stop()
+
+    @staticmethod
+    def get_stats(api_id):
+        """Retourne les statistiques du batcher d'une API, None s'il n'existe pas"""
+        batcher = MicroBatcher._batchers.get(api_id)
+        return batcher.stats() if batcher is not None else None
+
+    @staticmethod
+    def get_all_stats():
+        """Retourne les statistiques de tous les batchers du processus"""
+        with MicroBatcher._registry_lock:
+            batchers = list(MicroBatcher._batchers.values())
+        return [batcher.stats() for batcher in batchers]
+
+    @staticmethod
+    def shutdown_all(timeout=5):
+        """Arrête tous les batchers après exécution des requêtes en file"""
+        with MicroBatcher._registry_lock:
+            batchers = list(MicroBatcher._batchers.values())
+            MicroBatcher._batchers.clear()
+        for batcher in batchers:
+            batcher.stop()
+        for batcher in batchers:
+            batcher._thread.join(timeout)
+
+    def submit(self, model, X):
+        """
+        Dépose une ligne encodée et attend sa prédiction
+
+        Args:
+            model: ModelPipeline chargé
+            X: Ligne encodée (1, n_colonnes) produite par InputSpec.decode
+
+        Returns:
+            numpy array: Prédiction de la ligne, identique à model.predict_encoded(X)
+        """
+        future = Future()
+        with self._accepting:
+            if self._stop.is_set():
+                # Batcher remplacé entre-temps: prédiction directe
+                return model.predict_encoded(X)
+            self._queue.put((time.perf_counter(), model, X, future))
+        return future.result(timeout=MicroBatcher.result_timeout)
+
+    def stop(self):
+        """Refuse les nouvelles requêtes; le thread termine celles déjà en file"""
+        with self._accepting:
+            self._stop.set()
+
+    def stats(self):
+        """Retourne les réglages, les compteurs et les histogrammes du batcher"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update({
+            'api_id': self.api_id,
+            'window_ms': self.window_ms,
+            'max_size': self.max_size,
+            'running': self._thread.is_alive() and not self._stop.is_set(),
+            'queued': self._queue.qsize(),
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_ms': self.queue_waits.snapshot()
+        })
+        return stats
+
+    def _run(self):
+        """Boucle du thread: attend une première requête puis remplit la fenêtre"""
+        while True:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+                continue
+
+            batch = [first]
+            deadline = first[0] + self._window
+            while len(batch) < self.max_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Fenêtre écoulée: prendre quand même ce qui est déjà en file
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            self._execute(batch)
+
+        # Arrêt: plus aucun dépôt possible, exécuter ce qui reste
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(remaining), self.max_size):
+            self._execute(remaining[start:start + self.max_size])
+
+    def _execute(self, batch):
+        """Un appel au modèle par lot, puis répartition des lignes de résultat"""
+        started = time.perf_counter()
+        for enqueued_at, _, _, _ in batch:
+            self.queue_waits.observe((started - enqueued_at) * 1000)
+        self.batch_sizes.observe(len(batch))
+
+        # Un réentraînement pendant la fenêtre peut mêler deux versions du modèle
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+
+        errors = 0
+        for items in groups.values():
+            model = items[0][1]
+            try:
+                predictions = model.predict_encoded(np.vstack([item[2] for item in items]))
+            except Exception as e:
+                if len(items) == 1:
+                    items[0][3].set_exception(e)
+                    errors += 1
+                    continue
+                # Ne pas faire échouer tout le lot: reprise ligne par ligne
+                logger.warning(f"Micro-batch de l'API {self.api_id} en échec, reprise ligne par ligne: {str(e)}")
+                for item in items:
+                    try:
+                        item[3].set_result(model.predict_encoded(item[2]))
+                    except Exception as row_error:
+                        item[3].set_exception(row_error)
+                        errors += 1
+                continue
+
+            for position, item in enumerate(items):
+                item[3].set_result(predictions[position:position + 1])
+
+        with self._lock:
+            self._counters['batches'] += 1
+            self._counters['requests'] += len(batch)
+            self._counters['errors'] += errors
+
+
+atexit.register(MicroBatcher.shutdown_all)
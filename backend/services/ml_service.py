@@ -5,7 +5,6 @@ import joblib
 import pandas as pd
 import logging
 from datetime import datetime
-from sklearn.model_selection import train_test_split
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from extensions import db
@@ -13,6 +12,11 @@ from models.ml_model import MLModel
 from models.dataset import Dataset
 from utils.ml_algorithms import MLAlgorithms
 from utils.file_handler import FileHandler
+from utils.model_pipeline import ModelPipeline
+from utils.compiled_predictor import compile_pipeline, compiled_path
+from services.prediction_service import PredictionService
+from services.api_export_service import APIExportService
+from services.algorithm_tournament import AlgorithmTournament
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +69,9 @@ class MLService:
     
     @staticmethod
     def test_algorithms(model_id):
-        """Teste tous les algorithmes disponibles"""
+        """Teste tous les algorithmes disponibles (en parallèle, voir AlgorithmTournament)"""
+        from flask import current_app
+        
         ml_model = MLModel.query.get(model_id)
         if not ml_model:
             raise ValueError(f"Modèle {model_id} introuvable")
@@ -99,32 +105,37 @@ class MLService:
         logger.info(f"Algorithmes à tester: {appropriate_algos}")
         
         # Split train/test
+        from sklearn.model_selection import train_test_split
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
         )
         
-        # Tester chaque algorithme
-        results = []
-        for algo in appropriate_algos:
-            logger.info(f"Test de l'algorithme: {algo}")
-            result = MLAlgorithms.train_and_evaluate(
-                algo, X_train, X_test, y_train, y_test, problem_type
+        # Prétraiter une seule fois pour tous les algorithmes (réutilisé si les données n'ont pas changé)
+        data = AlgorithmTournament.prepare(
+            X_train, X_test, y_train, y_test,
+            cache_folder=os.path.join(current_app.config['UPLOAD_FOLDER'], 'preprocessed'),
+            cache_key=AlgorithmTournament.cache_key(
+                dataset.path, ml_model.inputs, ml_model.outputs[0], test_size=0.2, random_state=42
+            ),
+            max_entries=current_app.config['TOURNAMENT_CACHE_MAX_ENTRIES']
+        )
+        
+        # Tester les algorithmes en parallèle (workers réutilisés, ou processus courant pour un petit dataset)
+        try:
+            results = AlgorithmTournament.run(
+                appropriate_algos, data, problem_type,
+                max_workers=current_app.config['TOURNAMENT_MAX_WORKERS'],
+                timeout=current_app.config['TOURNAMENT_TIMEOUT'],
+                memory_limit_mb=current_app.config['TOURNAMENT_MEMORY_LIMIT_MB'],
+                inprocess_max_rows=current_app.config['TOURNAMENT_INPROCESS_MAX_ROWS']
             )
-            # Ne pas inclure l'instance du modèle dans les résultats
-            result_dict = {
-                'algorithm': result['algorithm'],
-                'name': result['name'],
-                'description': result['description'],
-                'score': result['score'],
-                'metrics': result.get('metrics', {}),
-                'training_time': result['training_time']
-            }
+        finally:
+            AlgorithmTournament.release(data)
+        for result in results:
             if 'error' in result:
-                result_dict['error'] = result['error']
-                logger.error(f"Erreur pour {algo}: {result['error']}")
+                logger.error(f"Erreur pour {result['algorithm']}: {result['error']}")
             else:
-                logger.info(f"Résultat pour {algo}: score={result['score']:.4f}")
-            results.append(result_dict)
+                logger.info(f"Résultat pour {result['algorithm']}: score={result['score']:.4f}")
         
         # Trier par score décroissant
         results.sort(key=lambda x: x['score'], reverse=True)
@@ -155,6 +166,7 @@ class MLService:
         problem_type = MLAlgorithms.detect_problem_type(y)
         
         # Split pour évaluation
+        from sklearn.model_selection import train_test_split
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
         )
@@ -171,10 +183,27 @@ class MLService:
         if not os.path.exists(model_folder):
             os.makedirs(model_folder)
         
-        # Sauvegarder le modèle
+        # Sauvegarder le pipeline complet (prétraitement + estimateur)
+        pipeline = ModelPipeline(
+            estimator=result['model_instance'],
+            input_columns=ml_model.inputs,
+            label_encoders=result['label_encoders'],
+            imputer=result['imputer'],
+            scaler=result['scaler']
+        )
         model_filename = f"model_{model_id}.pkl"
         model_path = os.path.join(model_folder, model_filename)
-        joblib.dump(result['model_instance'], model_path)
+        # Écriture dans un fichier temporaire puis remplacement atomique: les workers
+        # qui servent ce modèle ne lisent jamais un fichier à moitié écrit, et ceux
+        # qui l'ont mappé en mémoire (MODEL_MMAP_MODE) gardent l'ancien inode valide.
+        # Sans compression, joblib aligne les tableaux numpy pour mmap_mode='r'.
+        tmp_path = f"{model_path}.tmp"
+        joblib.dump(pipeline, tmp_path, compress=0)
+        os.replace(tmp_path, model_path)
+        
+        # Version numpy du pipeline pour le service de prédiction (arbres, forêts,
+        # modèles linéaires); l'ancienne est retirée si l'algorithme n'est pas supporté
+        MLService.save_compiled_pipeline(pipeline, model_path)
         
         # Mettre à jour le modèle en base
         ml_model.algorithm = algorithm
@@ -184,6 +213,10 @@ class MLService:
         ml_model.trained_at = datetime.utcnow()
         db.session.commit()
         
+        # La nouvelle date d'entraînement change la version; libérer l'ancienne tout de suite
+        PredictionService.invalidate_model(model_id)
+        APIExportService.invalidate_model_keys(model_id)
+        
         return {
             'status': 'success',
             'score': result['score'],
@@ -191,6 +224,35 @@ class MLService:
             'algorithm': algorithm
         }
     
+    @staticmethod
+    def save_compiled_pipeline(pipeline, model_path):
+        """
+        Écrit l'artefact compilé (numpy seul) à côté du fichier .pkl du modèle
+        
+        Args:
+            pipeline: ModelPipeline entraîné
+            model_path: Chemin du fichier .pkl
+            
+        Returns:
+            bool: True si le pipeline a pu être compilé
+        """
+        target = compiled_path(model_path)
+        try:
+            compiled = compile_pipeline(pipeline)
+        except Exception as e:
+            logger.warning(f"Compilation du pipeline impossible ({model_path}): {str(e)}")
+            compiled = None
+        
+        if compiled is None:
+            if os.path.exists(target):
+                os.remove(target)
+            return False
+        
+        tmp_path = f"{target}.tmp"
+        joblib.dump(compiled, tmp_path, compress=0)
+        os.replace(tmp_path, target)
+        return True
+    
     @staticmethod
     def delete_model(model_id):
         """Supprime un modèle ML et ses fichiers associés"""
@@ -200,19 +262,25 @@ class MLService:
         if not ml_model:
             raise ValueError(f"Modèle {model_id} introuvable")
         
-        # Supprimer le fichier physique si existe
-        if ml_model.model_path and os.path.exists(ml_model.model_path):
+        # Supprimer les fichiers physiques s'ils existent (pipeline et version compilée)
+        paths = [ml_model.model_path, compiled_path(ml_model.model_path)] if ml_model.model_path else []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
             try:
-                os.remove(ml_model.model_path)
-                current_app.logger.info(f"Fichier modèle supprimé: {ml_model.model_path}")
+                os.remove(path)
+                current_app.logger.info(f"Fichier modèle supprimé: {path}")
             except Exception as e:
                 # Logger l'erreur mais continuer
-                current_app.logger.warning(f"Impossible de supprimer le fichier {ml_model.model_path}: {str(e)}")
+                current_app.logger.warning(f"Impossible de supprimer le fichier {path}: {str(e)}")
         
         # Supprimer l'enregistrement en base
         db.session.delete(ml_model)
         db.session.commit()
         
+        PredictionService.invalidate_model(model_id)
+        APIExportService.invalidate_model_keys(model_id)
+        
         return True
     
     @staticmethod
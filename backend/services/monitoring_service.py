@@ -1,9 +1,13 @@
+import json
 from datetime import datetime, timedelta
 from sqlalchemy import func
 from extensions import db
 from models.exported_api import ExportedAPI
 from models.api_request import APIRequest
 from models.api_metrics import APIMetrics
+from services.usage_counters import UsageCounters
+from services.prediction_service import PredictionService
+from services.rate_limiter import RateLimiter
 
 class MonitoringService:
     """Service for monitoring API usage and performance"""
@@ -69,8 +73,11 @@ class MonitoringService:
             APIRequest.api_id == api_id
         ).order_by(APIRequest.timestamp.desc()).first()
         
+        # Include usage counted in memory but not flushed yet
+        pending_requests, _ = UsageCounters.pending(api_id)
+        
         return {
-            'total_requests': api.total_requests,
+            'total_requests': api.total_requests + pending_requests,
             'requests_24h': requests_24h,
             'requests_7d': requests_7d,
             'avg_response_time': round(avg_response_time, 2),
@@ -78,9 +85,40 @@ class MonitoringService:
             'error_rate': round(error_rate, 2),
             'avg_cpu_usage': round(avg_cpu_usage, 2),
             'avg_memory_usage': round(avg_memory_usage, 2),
-            'last_request': last_request.timestamp.isoformat() if last_request else None
+            'last_request': last_request.timestamp.isoformat() if last_request else None,
+            # Where time goes: per-phase durations recorded with each request (Server-Timing)
+            'phase_breakdown': MonitoringService.get_phase_breakdown(requests),
+            # Result cache hits are logged like other requests, with a 'cache_hit' phase
+            'result_cache': PredictionService.get_result_cache_stats(api_id),
+            # Requests rejected with 429 are not logged
+            'rate_limit': RateLimiter.get_stats(api_id)
         }
     
+    @staticmethod
+    def get_phase_breakdown(requests):
+        """Aggregate the per-phase durations (ms) of requests that recorded them"""
+        samples = {}
+        for r in requests:
+            if not r.phase_timings:
+                continue
+            try:
+                phases = json.loads(r.phase_timings)
+            except ValueError:
+                continue
+            for name, duration in phases.items():
+                samples.setdefault(name, []).append(duration)
+        
+        breakdown = {}
+        for name, durations in samples.items():
+            durations.sort()
+            breakdown[name] = {
+                'count': len(durations),
+                'avg_ms': round(sum(durations) / len(durations), 3),
+                'p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+                'max_ms': round(durations[-1], 3)
+            }
+        return breakdown
+    
     @staticmethod
     def get_all_apis_summary():
         """Get summary statistics for all APIs"""
@@ -88,7 +126,7 @@ class MonitoringService:
         
         total_apis = len(apis)
         active_apis = len([api for api in apis if api.status == 'active'])
-        total_requests = sum(api.total_requests for api in apis)
+        total_requests = sum(api.total_requests for api in apis) + UsageCounters.total_pending()
         
         # Get requests in last 24h
         now = datetime.utcnow()
@@ -0,0 +1,313 @@
+"""Pool de processus pour les prédictions du serveur asynchrone"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from services import prediction_worker
+from services.micro_batcher import BATCH_SIZE_BUCKETS, QUEUE_WAIT_BUCKETS_MS
+from utils.histogram import Histogram
+from utils.input_decoder import InputSpec
+from utils.model_loader import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionPool:
+    """
+    Exécute le décodage et le predict des modèles dans un pool de processus
+
+    Chaque processus garde son propre cache de modèles (ModelLoader, voir
+    services/prediction_worker.py: ni Flask ni SQLAlchemy dans le pool),
+    rempli au démarrage avec les modèles des APIs actives; la boucle asyncio
+    du serveur ne fait que l'authentification, la lecture JSON et les logs.
+    Les modèles transitent sous forme de ResolvedModel (copie détachée,
+    picklable): un modèle réentraîné change de version et est rechargé par
+    le processus qui le reçoit. Avec MODEL_MMAP_MODE='r', les tableaux
+    numpy des modèles sont partagés entre processus via le page cache.
+    """
+
+    _executor = None
+    _settings = None  # (workers, cache_max_bytes, mmap_mode, modèles préchargés)
+    _lock = threading.Lock()
+    _counters = {
+        'submitted': 0,
+        'broken': 0,
+        'restarts': 0
+    }
+    # model_id -> (version, InputSpec): décodage sur la boucle (cache de résultats, micro-batching)
+    _input_specs = {}
+
+    @staticmethod
+    def start(app, models, workers=None):
+        """
+        Démarre le pool et précharge les modèles dans chaque processus
+
+        Args:
+            app: Application Flask (configuration du cache)
+            models: ResolvedModel à précharger, les plus utilisés d'abord
+            workers: Nombre de processus (défaut: ASYNC_PREDICTION_WORKERS ou nombre de CPU)
+        """
+        PredictionPool.shutdown()
+        workers = workers or app.config['ASYNC_PREDICTION_WORKERS'] or os.cpu_count() or 1
+        PredictionPool._settings = (
+            workers,
+            app.config['MODEL_CACHE_MAX_BYTES'],
+            app.config['MODEL_MMAP_MODE'],
+            list(models)
+        )
+        PredictionPool._executor = PredictionPool._create_executor()
+        
+        # Les processus sont créés à la demande: une tâche par processus les lance
+        # tous maintenant et attend la fin de leur préchargement
+        pings = [PredictionPool._executor.submit(prediction_worker.ping) for _ in range(workers)]
+        for ping in pings:
+            ping.result()
+        logger.info(f"Pool de prédiction démarré: {workers} processus, {len(models)} modèle(s) à précharger")
+
+    @staticmethod
+    def shutdown():
+        executor = PredictionPool._executor
+        if executor is None:
+            return
+        PredictionPool._executor = None
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    async def predict(ml_model, input_data):
+        """
+        Prédiction unitaire dans un processus du pool
+
+        Returns:
+            list: Prédiction (même contenu que PredictionService.predict_values)
+        """
+        return await PredictionPool._submit(prediction_worker.predict, ml_model, input_data)
+
+    @staticmethod
+    async def input_spec(ml_model):
+        """
+        Spécification des entrées du modèle, demandée une fois par version à un processus du pool
+
+        Permet de décoder les lignes dans le processus principal: clé du cache
+        de résultats et empilement des requêtes regroupées, sans charger le
+        modèle hors du pool.
+
+        Returns:
+            InputSpec: Même décodage que dans les processus du pool
+        """
+        version = ModelLoader.version(ml_model)
+        cached = PredictionPool._input_specs.get(ml_model.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        columns, category_maps = await PredictionPool._submit(prediction_worker.input_spec, ml_model)
+        spec = InputSpec(columns, category_maps)
+        PredictionPool._input_specs[ml_model.id] = (version, spec)
+        return spec
+
+    @staticmethod
+    async def predict_encoded(ml_model, X):
+        """
+        Prédiction de lignes déjà décodées dans un processus du pool
+
+        Returns:
+            numpy array: Prédictions, une par ligne de X
+        """
+        return await PredictionPool._submit(prediction_worker.predict_encoded, ml_model, X)
+
+    @staticmethod
+    async def predict_records(ml_model, records):
+        """
+        Prédiction d'un lot dans un processus du pool
+
+        Returns:
+            tuple: (prédictions alignées sur records, erreurs par ligne)
+        """
+        return await PredictionPool._submit(prediction_worker.predict_records, ml_model, records)
+
+    @staticmethod
+    async def predict_array(ml_model, array):
+        """
+        Prédiction d'un tableau numpy (corps .npy) dans un processus du pool
+
+        Returns:
+            numpy array: Prédictions, une par ligne du tableau
+        """
+        return await PredictionPool._submit(prediction_worker.predict_array, ml_model, array)
+
+    @staticmethod
+    def stats():
+        with PredictionPool._lock:
+            stats = dict(PredictionPool._counters)
+        settings = PredictionPool._settings
+        stats['running'] = PredictionPool._executor is not None
+        stats['workers'] = settings[0] if settings else 0
+        stats['preloaded_models'] = len(settings[3]) if settings else 0
+        stats['micro_batchers'] = AsyncMicroBatcher.get_all_stats()
+        return stats
+
+    @staticmethod
+    async def _submit(func, *args):
+        executor = PredictionPool._executor
+        if executor is None:
+            raise RuntimeError("Le pool de prédiction n'est pas démarré")
+
+        PredictionPool._increment('submitted')
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Un processus est mort (OOM, segfault): recréer le pool pour les requêtes suivantes
+            PredictionPool._increment('broken')
+            PredictionPool._restart(executor)
+            raise
+
+    @staticmethod
+    def _restart(broken_executor):
+        with PredictionPool._lock:
+            if PredictionPool._executor is not broken_executor:
+                return
+            logger.error("Pool de prédiction interrompu, redémarrage")
+            PredictionPool._executor = PredictionPool._create_executor()
+            PredictionPool._counters['restarts'] += 1
+        broken_executor.shutdown(wait=False)
+
+    @staticmethod
+    def _create_executor():
+        workers, cache_max_bytes, mmap_mode, models = PredictionPool._settings
+        # spawn: pas de fork des threads du processus principal (logs, compteurs)
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=prediction_worker.init_worker,
+            initargs=(cache_max_bytes, mmap_mode, models)
+        )
+
+    @staticmethod
+    def _increment(counter):
+        with PredictionPool._lock:
+            PredictionPool._counters[counter] += 1
+
+
+class AsyncMicroBatcher:
+    """
+    Micro-batching des prédictions unitaires du serveur asynchrone
+
+    Même fonctionnement que MicroBatcher (fenêtre ouverte par la première
+    requête, lot envoyé à la fin de la fenêtre ou à max_size requêtes, même
+    reprise ligne par ligne), mais sur la boucle asyncio: les lignes décodées
+    des requêtes regroupées partent en un seul appel au pool de processus.
+
+    Une instance par API (registre de classe), utilisée uniquement depuis la
+    boucle; changer les réglages de l'API remplace l'instance.
+    """
+
+    _batchers = {}  # api_id -> AsyncMicroBatcher
+
+    def __init__(self, api_id, window_ms, max_size):
+        self.api_id = api_id
+        self.window_ms = window_ms
+        self.max_size = max_size
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_waits = Histogram(QUEUE_WAIT_BUCKETS_MS)
+        self._pending = []  # (mis en file à, ResolvedModel, ligne, Future)
+        self._timer = None
+        self._tasks = set()  # lots en cours (référence gardée jusqu'à la fin)
+        self._counters = {'batches': 0, 'requests': 0, 'errors': 0}
+
+    @staticmethod
+    def for_api(api_id, window_ms, max_size):
+        """Retourne le batcher de l'API, créé ou remplacé si ses réglages ont changé"""
+        batcher = AsyncMicroBatcher._batchers.get(api_id)
+        if batcher is None or batcher.window_ms != window_ms or batcher.max_size != max_size:
+            # Les requêtes déjà en file de l'ancienne instance partent avec sa fenêtre
+            batcher = AsyncMicroBatcher(api_id, window_ms, max_size)
+            AsyncMicroBatcher._batchers[api_id] = batcher
+        return batcher
+
+    @staticmethod
+    def get_all_stats():
+        """Retourne les statistiques de tous les batchers du serveur"""
+        return [batcher.stats() for batcher in AsyncMicroBatcher._batchers.values()]
+
+    async def submit(self, ml_model, X):
+        """
+        Ajoute une ligne décodée au lot en cours et attend sa prédiction
+
+        Returns:
+            numpy array: Prédiction de la ligne, identique à PredictionPool.predict_encoded
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((time.perf_counter(), ml_model, X, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        # shield: une requête abandonnée par le client n'annule pas la ligne du lot
+        return await asyncio.shield(future)
+
+    def stats(self):
+        """Retourne les réglages, les compteurs et les histogrammes du batcher"""
+        stats = dict(self._counters)
+        stats.update({
+            'api_id': self.api_id,
+            'window_ms': self.window_ms,
+            'max_size': self.max_size,
+            'queued': len(self._pending),
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_ms': self.queue_waits.snapshot()
+        })
+        return stats
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._execute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch):
+        """Un appel au pool par lot, puis répartition des lignes de résultat"""
+        started = time.perf_counter()
+        for enqueued_at, _, _, _ in batch:
+            self.queue_waits.observe((started - enqueued_at) * 1000)
+        self.batch_sizes.observe(len(batch))
+
+        # Un réentraînement pendant la fenêtre peut mêler deux versions du modèle
+        groups = {}
+        for item in batch:
+            groups.setdefault((item[1].id, ModelLoader.version(item[1])), []).append(item)
+
+        errors = 0
+        for items in groups.values():
+            ml_model = items[0][1]
+            try:
+                predictions = await PredictionPool.predict_encoded(ml_model, np.vstack([item[2] for item in items]))
+            except Exception as e:
+                if len(items) == 1:
+                    items[0][3].set_exception(e)
+                    errors += 1
+                    continue
+                # Ne pas faire échouer tout le lot: reprise ligne par ligne
+                logger.warning(f"Micro-batch de l'API {self.api_id} en échec, reprise ligne par ligne: {str(e)}")
+                for item in items:
+                    try:
+                        item[3].set_result(await PredictionPool.predict_encoded(ml_model, item[2]))
+                    except Exception as row_error:
+                        item[3].set_exception(row_error)
+                        errors += 1
+                continue
+
+            for position, item in enumerate(items):
+                item[3].set_result(predictions[position:position + 1])
+
+        self._counters['batches'] += 1
+        self._counters['requests'] += len(batch)
+        self._counters['errors'] += errors
@@ -1,16 +1,22 @@
 """Service pour les prédictions via API"""
-import joblib
 import json
 import time
-import psutil
 import os
 import logging
-import numpy as np
-import pandas as pd
+import threading
 from datetime import datetime
+import numpy as np
 from extensions import db
 from models.exported_api import ExportedAPI
 from models.api_request import APIRequest
+from services.request_log_writer import RequestLogWriter
+from services.usage_counters import UsageCounters
+from services.resource_sampler import ResourceSampler
+from services.micro_batcher import MicroBatcher
+from utils.model_loader import ModelLoader
+from utils.result_cache import ResultCache
+from utils.stream_reader import iter_chunks
+from utils.timing import current_timer, record_phase, timed
 
 logger = logging.getLogger(__name__)
 
@@ -18,175 +24,563 @@ logger = logging.getLogger(__name__)
 class PredictionService:
     """Service pour effectuer des prédictions via les APIs exportées"""
     
-    # Cache pour les modèles chargés (évite de recharger à chaque requête)
-    _model_cache = {}
-    _cache_size = 10
+    # Les modèles chargés sont gardés par ModelLoader (cache LRU borné en octets,
+    # capacité et mode mmap réglés par init_app via MODEL_CACHE_MAX_BYTES / MODEL_MMAP_MODE)
+    
+    # Caches des résultats des APIs qui ont activé la mémoïsation (api_id -> ResultCache)
+    _result_caches = {}
+    _result_caches_lock = threading.Lock()
+    
+    # Durées par phase enregistrées avec chaque requête (REQUEST_LOG_PHASE_TIMINGS)
+    _log_phase_timings = True
+    
+    @staticmethod
+    def init_app(app):
+        """Configure le service à partir de la configuration Flask"""
+        PredictionService.configure(app.config['MODEL_CACHE_MAX_BYTES'], app.config['MODEL_MMAP_MODE'])
+        PredictionService._log_phase_timings = app.config['REQUEST_LOG_PHASE_TIMINGS']
+    
+    @staticmethod
+    def configure(cache_max_bytes, mmap_mode=None):
+        """Règle la capacité du cache et le mode mmap (aussi utilisé par les processus du pool)"""
+        ModelLoader.configure(cache_max_bytes, mmap_mode)
+    
+    @staticmethod
+    def get_cache_stats():
+        """Retourne les compteurs du cache des modèles"""
+        return ModelLoader.cache.stats()
+    
+    @staticmethod
+    def clear_cache():
+        """Vide le cache des modèles"""
+        ModelLoader.cache.clear()
+    
+    @staticmethod
+    def invalidate_model(model_id):
+        """
+        Retire toutes les versions d'un modèle du cache
+        
+        À appeler quand le modèle est réentraîné, supprimé ou que son API est désactivée.
+        
+        Args:
+            model_id: ID du modèle
+        """
+        removed = ModelLoader.cache.invalidate_id(model_id)
+        if removed:
+            logger.info(f"Modèle {model_id} retiré du cache")
+        
+        # Les résultats mémoïsés de l'ancienne version ne doivent plus être servis
+        with PredictionService._result_caches_lock:
+            caches = [cache for cache in PredictionService._result_caches.values() if cache.model_id == model_id]
+        for cache in caches:
+            cache.clear()
+    
+    @staticmethod
+    def discard_result_cache(api_id):
+        """Supprime le cache des résultats d'une API (mémoïsation désactivée, API supprimée)"""
+        with PredictionService._result_caches_lock:
+            PredictionService._result_caches.pop(api_id, None)
     
     @staticmethod
-    def predict(api_id, input_data):
+    def get_result_cache_stats(api_id=None):
+        """
+        Retourne les compteurs hits/misses des caches de résultats
+        
+        Args:
+            api_id: ID de l'API, ou None pour toutes les APIs
+            
+        Returns:
+            dict: Statistiques du cache de l'API (None s'il n'existe pas),
+                ou {api_id: statistiques} pour toutes les APIs
+        """
+        with PredictionService._result_caches_lock:
+            caches = dict(PredictionService._result_caches)
+        if api_id is not None:
+            cache = caches.get(api_id)
+            return cache.stats() if cache is not None else None
+        return {cached_api_id: cache.stats() for cached_api_id, cache in caches.items()}
+    
+    @staticmethod
+    def _result_cache(api):
+        """Cache des résultats de l'API, créé ou recréé si ses réglages ont changé"""
+        with PredictionService._result_caches_lock:
+            cache = PredictionService._result_caches.get(api.id)
+            if (cache is None or cache.model_id != api.model_id
+                    or cache.max_entries != api.result_cache_max_entries or cache.ttl != api.result_cache_ttl):
+                cache = ResultCache(api.model_id, api.result_cache_max_entries, api.result_cache_ttl)
+                PredictionService._result_caches[api.id] = cache
+            return cache
+    
+    @staticmethod
+    def warm_model(ml_model):
+        """
+        Charge un modèle dans le cache et exécute une prédiction factice
+        pour préchauffer les chemins de code (imports, validation sklearn)
+        
+        Args:
+            ml_model: Instance de MLModel
+            
+        Returns:
+            bool: False si le modèle ne tient pas dans le budget restant du cache
+        """
+        return ModelLoader.warm(ml_model)
+    
+    @staticmethod
+    def _model_version(ml_model):
+        """Version d'un modèle pour les clés de cache (voir ModelLoader.version)"""
+        return ModelLoader.version(ml_model)
+    
+    @staticmethod
+    def predict(api_id, input_data, api=None):
         """
         Effectue une prédiction avec le modèle
         
         Args:
             api_id: ID de l'API
             input_data: Dictionnaire avec les données d'entrée
+            api: API déjà résolue par require_api_key (évite une requête en base)
             
         Returns:
             dict: Résultat de la prédiction
         """
         start_time = time.time()
-        process = psutil.Process(os.getpid())
-        cpu_before = process.cpu_percent()
-        mem_before = process.memory_info().rss / 1024 / 1024  # MB
         
         try:
             # Récupérer l'API
-            api = ExportedAPI.query.get(api_id)
-            if not api:
-                raise ValueError(f"API {api_id} introuvable")
-            
-            if api.status != 'active':
-                raise ValueError(f"API {api_id} est inactive")
+            if api is None:
+                api = PredictionService._get_active_api(api_id)
             
             # Charger le modèle
-            model = PredictionService._load_model(api.model)
+            with timed('load'):
+                model = PredictionService._load_model(api.model)
             
-            # Valider les inputs
-            PredictionService._validate_inputs(input_data, api.model.inputs)
+            # Valider et décoder les inputs directement en ligne numpy
+            with timed('decode'):
+                X = model.input_spec.decode(input_data)
             
-            # Préparer les données
-            X = PredictionService._prepare_data(input_data, api.model.inputs)
+            result_cache = PredictionService._result_cache(api) if api.result_cache_enabled else None
+            if result_cache is not None:
+                lookup_start = time.perf_counter()
+                cache_key = ResultCache.make_key(PredictionService._model_version(api.model), X)
+                cached = result_cache.get(cache_key)
+                # Phase 'cache_hit' pour un résultat mémoïsé: distingue les hits dans les logs
+                record_phase('cache_hit' if cached is not None else 'cache', time.perf_counter() - lookup_start)
+                if cached is not None:
+                    # Pas de prédiction, mais la requête est loggée comme les autres
+                    # (volume, taux d'erreur et latences du monitoring)
+                    with timed('serialize'):
+                        result = PredictionService.build_result(api, cached)
+                        request_data, response_data = json.dumps(input_data), json.dumps(result)
+                    PredictionService.record_success(api_id, request_data, response_data, start_time)
+                    return result
             
-            # Faire la prédiction
-            prediction = model.predict(X)
+            # Avec le micro-batching, inclut l'attente de la fenêtre de regroupement
+            with timed('predict'):
+                if api.micro_batch_enabled:
+                    # Regroupée avec les requêtes concurrentes de la même API
+                    batcher = MicroBatcher.for_api(api.id, api.micro_batch_window_ms, api.micro_batch_max_size)
+                    prediction = batcher.submit(model, X)
+                else:
+                    prediction = model.predict_encoded(X)
             
-            # Formater le résultat
-            result = {
-                'prediction': prediction.tolist() if hasattr(prediction, 'tolist') else list(prediction),
-                'model_id': api.model_id,
-                'model_name': api.model.name,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            if result_cache is not None:
+                result_cache.put(cache_key, prediction.tolist() if hasattr(prediction, 'tolist') else list(prediction))
+            
+            with timed('serialize'):
+                result = PredictionService.build_result(api, prediction)
+                request_data, response_data = json.dumps(input_data), json.dumps(result)
+            
+            PredictionService.record_success(api_id, request_data, response_data, start_time)
+            
+            return result
+            
+        except Exception as e:
+            PredictionService.record_failure(
+                api_id, json.dumps(input_data) if input_data else None, start_time, e
+            )
+            raise
+    
+    @staticmethod
+    def predict_values(ml_model, input_data):
+        """
+        Charge le modèle (via le cache), décode un enregistrement et prédit
+        
+        Args:
+            ml_model: MLModel ou ResolvedModel
+            input_data: Dictionnaire avec les données d'entrée
+            
+        Returns:
+            numpy array: Prédiction brute de l'estimateur
+        """
+        model = PredictionService._load_model(ml_model)
+        
+        # Valider et décoder les inputs directement en ligne numpy
+        return model.predict_encoded(model.input_spec.decode(input_data))
+    
+    @staticmethod
+    def predict_records(ml_model, records):
+        """
+        Charge le modèle (via le cache), décode un lot et prédit en un seul appel
+        
+        Args:
+            ml_model: MLModel ou ResolvedModel
+            records: Liste d'enregistrements
             
-            # Calculer les métriques
-            response_time = time.time() - start_time
-            cpu_after = process.cpu_percent()
-            mem_after = process.memory_info().rss / 1024 / 1024
+        Returns:
+            tuple: (prédictions alignées sur records, None pour les lignes invalides, erreurs par ligne)
+        """
+        with timed('load'):
+            model = PredictionService._load_model(ml_model)
+        
+        # Valider et décoder chaque ligne dans une matrice préallouée
+        with timed('decode'):
+            X, valid_indices, errors = model.input_spec.decode_records(records)
+        
+        # Une seule prédiction vectorisée pour toutes les lignes valides
+        predictions = [None] * len(records)
+        if valid_indices:
+            with timed('predict'):
+                values = model.predict_encoded(X)
+            values = values.tolist() if hasattr(values, 'tolist') else list(values)
+            for index, value in zip(valid_indices, values):
+                predictions[index] = value
+        
+        return predictions, errors
+    
+    @staticmethod
+    def predict_array(ml_model, array):
+        """
+        Charge le modèle (via le cache), décode un tableau numpy (corps .npy) et prédit
+        
+        Args:
+            ml_model: MLModel ou ResolvedModel
+            array: Tableau structuré ou matrice numérique (voir InputSpec.decode_array)
+            
+        Returns:
+            numpy array: Prédictions, une par ligne du tableau
+        """
+        with timed('load'):
+            model = PredictionService._load_model(ml_model)
+        
+        with timed('decode'):
+            X = model.input_spec.decode_array(array)
+        
+        with timed('predict'):
+            return model.predict_encoded(X)
+    
+    @staticmethod
+    def format_predictions(predictions, errors, as_array=False):
+        """
+        Prédictions d'un lot en liste JSON, ou en tableau numpy pour une réponse .npy
+        
+        Un tableau .npy ne peut pas porter d'erreur par ligne: avec as_array,
+        un lot contenant des lignes invalides est refusé.
+        """
+        if not as_array:
+            return predictions.tolist() if isinstance(predictions, np.ndarray) else predictions
+        if errors:
+            first = errors[0]
+            raise ValueError(
+                f"{len(errors)} ligne(s) invalide(s), réponse .npy impossible "
+                f"(ligne {first['index']}: {first['error']})"
+            )
+        return np.asarray(predictions)
+    
+    @staticmethod
+    def build_result(api, prediction):
+        """Formate la réponse d'une prédiction unitaire"""
+        return {
+            'prediction': prediction.tolist() if hasattr(prediction, 'tolist') else list(prediction),
+            'model_id': api.model_id,
+            'model_name': api.model.name,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    @staticmethod
+    def build_batch_result(api, predictions, errors):
+        """Formate la réponse d'une prédiction par lot"""
+        return {
+            'predictions': predictions,
+            'errors': errors,
+            'count': len(predictions),
+            'success_count': len(predictions) - len(errors),
+            'error_count': len(errors),
+            'model_id': api.model_id,
+            'model_name': api.model.name,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    @staticmethod
+    def record_success(api_id, request_data, response_data, start_time, phases=None):
+        """
+        Log une requête réussie et comptabilise l'utilisation de l'API
+        
+        Args:
+            api_id: ID de l'API
+            request_data: Données de la requête (JSON string)
+            response_data: Données de la réponse (JSON string)
+            start_time: time.time() au début de la requête
+            phases: Durées par phase en ms (défaut: PhaseTimer de la requête Flask en cours)
+        """
+        response_time = time.time() - start_time
+        phase_timings = PredictionService._phase_timings(phases)
+        
+        with timed('log'):
+            # Dernier échantillon du sampler: aucun appel psutil dans la requête
+            cpu_usage, memory_usage = ResourceSampler.latest()
             
-            # Logger la requête
             PredictionService.log_request(
                 api_id=api_id,
-                request_data=json.dumps(input_data),
-                response_data=json.dumps(result),
+                request_data=request_data,
+                response_data=response_data,
                 response_time=response_time,
                 status_code=200,
-                cpu_usage=(cpu_before + cpu_after) / 2,
-                memory_usage=(mem_before + mem_after) / 2
+                cpu_usage=cpu_usage,
+                memory_usage=memory_usage,
+                phase_timings=phase_timings
             )
             
             # Mettre à jour les stats de l'API
-            api.total_requests += 1
-            api.last_used_at = datetime.utcnow()
-            db.session.commit()
+            UsageCounters.record(api_id)
+    
+    @staticmethod
+    def record_failure(api_id, request_data, start_time, error, phases=None):
+        """Log une requête en échec"""
+        PredictionService.log_request(
+            api_id=api_id,
+            request_data=request_data,
+            response_data=None,
+            response_time=time.time() - start_time,
+            status_code=500,
+            error=str(error),
+            phase_timings=PredictionService._phase_timings(phases)
+        )
+    
+    @staticmethod
+    def _phase_timings(phases=None):
+        """JSON des durées par phase à enregistrer avec la requête, None si désactivé"""
+        if not PredictionService._log_phase_timings:
+            return None
+        if phases is None:
+            timer = current_timer()
+            phases = timer.durations_ms() if timer is not None else None
+        return json.dumps(phases) if phases else None
+    
+    @staticmethod
+    def predict_batch(api_id, payload, max_batch_size=None, api=None, as_array=False):
+        """
+        Effectue les prédictions d'un lot d'enregistrements en un seul appel au modèle
+        
+        Les lignes invalides sont signalées individuellement sans faire échouer le lot.
+        Une seule entrée de log est écrite pour tout le lot.
+        
+        Args:
+            api_id: ID de l'API
+            payload: Liste d'objets, {"records": [...]}, {"columns": {"col": [...]}}
+                     ou tableau numpy (corps .npy)
+            max_batch_size: Nombre maximal d'enregistrements acceptés
+            api: API déjà résolue par require_api_key (évite une requête en base)
+            as_array: Prédictions en tableau numpy (réponse .npy) plutôt qu'en liste
+            
+        Returns:
+            dict: Prédictions alignées sur les enregistrements et erreurs par ligne
+        """
+        start_time = time.time()
+        batch_size = None
+        
+        try:
+            records = PredictionService._normalize_batch(payload)
+            batch_size = len(records)
+            
+            if max_batch_size and batch_size > max_batch_size:
+                raise ValueError(f"Lot trop volumineux: {batch_size} enregistrements (max {max_batch_size})")
+            
+            # Récupérer l'API
+            if api is None:
+                api = PredictionService._get_active_api(api_id)
+            
+            if isinstance(records, np.ndarray):
+                predictions, errors = PredictionService.predict_array(api.model, records), []
+            else:
+                predictions, errors = PredictionService.predict_records(api.model, records)
+            with timed('serialize'):
+                predictions = PredictionService.format_predictions(predictions, errors, as_array)
+                result = PredictionService.build_batch_result(api, predictions, errors)
+            
+            # Logger un résumé du lot (pas les données complètes)
+            PredictionService.record_success(
+                api_id,
+                json.dumps({'batch_size': batch_size}),
+                PredictionService.batch_log_summary(result),
+                start_time
+            )
             
             return result
             
         except Exception as e:
-            # Logger l'erreur
-            response_time = time.time() - start_time
-            PredictionService.log_request(
-                api_id=api_id,
-                request_data=json.dumps(input_data) if input_data else None,
-                response_data=None,
-                response_time=response_time,
-                status_code=500,
-                error=str(e)
-            )
+            PredictionService.record_failure(api_id, json.dumps({'batch_size': batch_size}), start_time, e)
             raise
     
     @staticmethod
-    def _load_model(ml_model):
+    def predict_stream(api_id, records, chunk_size=5000, api=None):
         """
-        Charge le modèle depuis le fichier .pkl
+        Prédit un flux d'enregistrements par morceaux de taille fixe
+        
+        L'API et le modèle sont vérifiés avant le début de la réponse (les
+        erreurs remontent normalement); ensuite, seul un morceau est en
+        mémoire à la fois, quelle que soit la taille du flux.
         
         Args:
-            ml_model: Instance de MLModel
+            api_id: ID de l'API
+            records: Itérable d'enregistrements (lu au fil de la réponse)
+            chunk_size: Nombre d'enregistrements décodés et prédits ensemble
+            api: API déjà résolue par require_api_key (évite une requête en base)
             
         Returns:
-            Le modèle chargé
+            generator: Lignes NDJSON, une par enregistrement
+                ({"index": i, "prediction": ...} ou {"index": i, "error": "..."}),
+                puis une ligne {"summary": {...}} avec le débit en lignes/seconde
         """
-        model_id = ml_model.id
-        
-        # Vérifier le cache
-        if model_id in PredictionService._model_cache:
-            logger.debug(f"Modèle {model_id} chargé depuis le cache")
-            return PredictionService._model_cache[model_id]
+        start_time = time.time()
         
-        # Charger depuis le fichier
-        if not ml_model.model_path or not os.path.exists(ml_model.model_path):
-            raise ValueError(f"Fichier du modèle introuvable: {ml_model.model_path}")
+        if api is None:
+            api = PredictionService._get_active_api(api_id)
+        with timed('load'):
+            model = PredictionService._load_model(api.model)
         
-        try:
-            model = joblib.load(ml_model.model_path)
-            
-            # Ajouter au cache
-            if len(PredictionService._model_cache) >= PredictionService._cache_size:
-                # Supprimer le plus ancien
-                PredictionService._model_cache.pop(next(iter(PredictionService._model_cache)))
-            
-            PredictionService._model_cache[model_id] = model
-            logger.info(f"Modèle {model_id} chargé et mis en cache")
+        def generate():
+            rows = 0
+            error_count = 0
+            try:
+                for chunk in iter_chunks(records, chunk_size):
+                    # Durées cumulées sur tous les morceaux
+                    with timed('decode'):
+                        X, valid_indices, errors = model.input_spec.decode_records(chunk)
+                    with timed('predict'):
+                        values = model.predict_encoded(X).tolist() if valid_indices else []
+                    
+                    lines = [None] * len(chunk)
+                    for position, value in zip(valid_indices, values):
+                        lines[position] = f'{{"index": {rows + position}, "prediction": {json.dumps(value)}}}\n'
+                    for error in errors:
+                        position = error['index']
+                        lines[position] = json.dumps({'index': rows + position, 'error': error['error']}) + '\n'
+                    
+                    rows += len(chunk)
+                    error_count += len(errors)
+                    yield ''.join(lines)
+            except Exception as e:
+                # Statut HTTP déjà envoyé: l'erreur termine le flux
+                logger.error(f"Erreur pendant le flux de prédictions de l'API {api_id}: {str(e)}", exc_info=True)
+                PredictionService.record_failure(api_id, json.dumps({'stream_rows': rows}), start_time, e)
+                code = 'VALIDATION_ERROR' if isinstance(e, ValueError) else 'PREDICTION_ERROR'
+                yield json.dumps({'error': {'code': code, 'message': str(e), 'rows': rows}}) + '\n'
+                return
             
-            return model
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement du modèle {model_id}: {str(e)}")
-            raise ValueError(f"Impossible de charger le modèle: {str(e)}")
+            duration = time.time() - start_time
+            summary = {
+                'rows': rows,
+                'success_count': rows - error_count,
+                'error_count': error_count,
+                'duration': round(duration, 3),
+                'rows_per_second': round(rows / duration, 1) if duration > 0 else None,
+                'model_id': api.model_id,
+                'model_name': api.model.name,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            PredictionService.record_success(
+                api_id, json.dumps({'stream_rows': rows}), json.dumps(summary), start_time
+            )
+            yield json.dumps({'summary': summary}) + '\n'
+        
+        return generate()
+    
+    @staticmethod
+    def batch_log_summary(result):
+        """Résumé d'une réponse batch pour le log (pas les prédictions complètes)"""
+        return json.dumps({
+            'success_count': result['success_count'],
+            'error_count': result['error_count']
+        })
     
     @staticmethod
-    def _validate_inputs(input_data, expected_inputs):
+    def _get_active_api(api_id):
         """
-        Valide que les données d'entrée correspondent aux inputs attendus
+        Récupère une API exportée et vérifie qu'elle est active
         
         Args:
-            input_data: Dictionnaire des données
-            expected_inputs: Liste des colonnes attendues
+            api_id: ID de l'API
+            
+        Returns:
+            ExportedAPI: L'API active
         """
-        if not input_data:
-            raise ValueError("Aucune donnée fournie")
+        api = ExportedAPI.query.get(api_id)
+        if not api:
+            raise ValueError(f"API {api_id} introuvable")
         
-        if not isinstance(input_data, dict):
-            raise ValueError("Les données doivent être un objet JSON")
+        if api.status != 'active':
+            raise ValueError(f"API {api_id} est inactive")
         
-        # Vérifier que toutes les colonnes requises sont présentes
-        missing = set(expected_inputs) - set(input_data.keys())
-        if missing:
-            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+        return api
+    
+    @staticmethod
+    def _load_model(ml_model):
+        """
+        Charge le pipeline du modèle via le cache du processus (voir ModelLoader.load)
         
-        # Vérifier qu'il n'y a pas de colonnes en trop
-        extra = set(input_data.keys()) - set(expected_inputs)
-        if extra:
-            logger.warning(f"Colonnes supplémentaires ignorées: {', '.join(extra)}")
+        Args:
+            ml_model: Instance de MLModel
+            
+        Returns:
+            ModelPipeline ou CompiledPipeline: Le pipeline chargé (prétraitement + estimateur)
+        """
+        return ModelLoader.load(ml_model)
     
     @staticmethod
-    def _prepare_data(input_data, expected_inputs):
+    def _normalize_batch(payload):
         """
-        Prépare les données pour la prédiction
+        Convertit le corps d'une requête batch en liste d'enregistrements
         
         Args:
-            input_data: Dictionnaire des données
-            expected_inputs: Liste des colonnes dans l'ordre
+            payload: Liste d'objets, {"records": [...]}, {"columns": {"col": [...]}}
+                     ou tableau numpy (retourné tel quel)
             
         Returns:
-            numpy array: Données préparées
+            list: Liste d'enregistrements (un élément par ligne), ou le tableau numpy
         """
-        # Créer un DataFrame avec les colonnes dans le bon ordre
-        df = pd.DataFrame([input_data])
-        df = df[expected_inputs]  # Réordonner selon l'ordre attendu
+        if isinstance(payload, np.ndarray):
+            if payload.ndim == 0 or not len(payload):
+                raise ValueError("Aucune donnée fournie")
+            return payload
+        
+        if isinstance(payload, dict) and 'records' in payload:
+            payload = payload['records']
+        elif isinstance(payload, dict) and 'columns' in payload:
+            columns = payload['columns']
+            if not isinstance(columns, dict) or not columns:
+                raise ValueError("'columns' doit être un objet {colonne: [valeurs]}")
+            
+            lengths = set()
+            for name, values in columns.items():
+                if not isinstance(values, list):
+                    raise ValueError(f"La colonne {name} doit être une liste")
+                lengths.add(len(values))
+            if len(lengths) != 1:
+                raise ValueError("Toutes les colonnes doivent avoir la même longueur")
+            
+            names = list(columns.keys())
+            return [dict(zip(names, row)) for row in zip(*columns.values())]
+        
+        if not isinstance(payload, list):
+            raise ValueError("Le lot doit être une liste d'objets, {'records': [...]} ou {'columns': {...}}")
         
-        return df.values
+        if not payload:
+            raise ValueError("Aucune donnée fournie")
+        
+        return payload
     
     @staticmethod
-    def log_request(api_id, request_data, response_data, response_time, status_code, cpu_usage=None, memory_usage=None, error=None):
+    def log_request(api_id, request_data, response_data, response_time, status_code, cpu_usage=None, memory_usage=None, error=None, phase_timings=None):
         """
         Log une requête API
         
@@ -199,18 +593,28 @@ class PredictionService:
             cpu_usage: Usage CPU en %
             memory_usage: Usage mémoire en MB
             error: Message d'erreur si applicable
+            phase_timings: Durées par phase (JSON string)
         """
+        values = {
+            'api_id': api_id,
+            'request_data': request_data,
+            'response_data': response_data,
+            'response_time': response_time,
+            'status_code': status_code,
+            'cpu_usage': cpu_usage,
+            'memory_usage': memory_usage,
+            'error_message': error,
+            'phase_timings': phase_timings,
+            'timestamp': datetime.utcnow()
+        }
+        
+        # Écriture différée: la réponse n'attend pas l'INSERT (file pleine = log abandonné et compté)
+        if RequestLogWriter.is_running():
+            RequestLogWriter.enqueue(values)
+            return
+        
         try:
-            api_request = APIRequest(
-                api_id=api_id,
-                request_data=request_data,
-                response_data=response_data,
-                response_time=response_time,
-                status_code=status_code,
-                cpu_usage=cpu_usage,
-                memory_usage=memory_usage,
-                error_message=error
-            )
+            api_request = APIRequest(**values)
             
             db.session.add(api_request)
             db.session.commit()
@@ -0,0 +1,70 @@
+"""Prédictions exécutées dans les processus du pool du serveur asynchrone
+
+Ce module n'importe que le chargement des modèles et le décodage des
+entrées: un processus du pool (spawn) ne charge ni Flask, ni SQLAlchemy,
+ni les services.
+"""
+import os
+import logging
+from utils.model_loader import ModelLoader
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker(cache_max_bytes, mmap_mode, models):
+    """Initialise un processus du pool: configure son cache puis précharge les modèles"""
+    ModelLoader.configure(cache_max_bytes, mmap_mode)
+    for ml_model in models:
+        try:
+            if not ModelLoader.warm(ml_model):
+                # Modèles suivants moins utilisés: budget du cache atteint
+                break
+        except Exception as e:
+            logger.warning(f"Préchargement impossible pour le modèle {ml_model.id}: {str(e)}")
+
+
+def ping():
+    return os.getpid()
+
+
+def predict(ml_model, input_data):
+    """Prédiction unitaire (même contenu que PredictionService.predict_values, en liste)"""
+    model = ModelLoader.load(ml_model)
+    prediction = model.predict_encoded(model.input_spec.decode(input_data))
+    return prediction.tolist() if hasattr(prediction, 'tolist') else list(prediction)
+
+
+def predict_records(ml_model, records):
+    """
+    Prédiction d'un lot (même contenu que PredictionService.predict_records)
+
+    Returns:
+        tuple: (prédictions alignées sur records, erreurs par ligne)
+    """
+    model = ModelLoader.load(ml_model)
+    X, valid_indices, errors = model.input_spec.decode_records(records)
+
+    predictions = [None] * len(records)
+    if valid_indices:
+        values = model.predict_encoded(X)
+        values = values.tolist() if hasattr(values, 'tolist') else list(values)
+        for index, value in zip(valid_indices, values):
+            predictions[index] = value
+    return predictions, errors
+
+
+def predict_array(ml_model, array):
+    """Prédiction d'un tableau numpy (corps .npy), une prédiction par ligne"""
+    model = ModelLoader.load(ml_model)
+    return model.predict_encoded(model.input_spec.decode_array(array))
+
+
+def input_spec(ml_model):
+    """Colonnes et vocabulaires du modèle, pour décoder dans le processus principal"""
+    spec = ModelLoader.load(ml_model).input_spec
+    return spec.columns, spec.category_maps
+
+
+def predict_encoded(ml_model, X):
+    """Prédiction de lignes déjà décodées"""
+    return ModelLoader.load(ml_model).predict_encoded(X)
@@ -0,0 +1,142 @@
+"""Contrôle d'admission des requêtes de prédiction par API (débit et concurrence)"""
+import math
+import threading
+from utils.token_bucket import TokenBucket
+
+
+class RateLimiter:
+    """
+    Limites d'une API appliquées avant tout travail sur le modèle
+
+    - débit: seau à jetons de rate_limit_per_second jetons par seconde,
+      rafales de rate_limit_burst requêtes (si rate_limit_enabled)
+    - concurrence: au plus max_in_flight requêtes en cours (0 = illimité)
+
+    Une instance par API et par processus (registre de classe): avec
+    plusieurs workers, chaque worker applique les limites de son côté.
+    Les réglages sont relus à chaque requête depuis l'API résolue; les
+    changer met à jour l'instance sans perdre les requêtes en cours.
+    """
+
+    _limiters = {}  # api_id -> RateLimiter
+    _registry_lock = threading.Lock()
+
+    def __init__(self, api_id):
+        self.api_id = api_id
+        self._bucket = None
+        self._max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._counters = {'admitted': 0, 'rate_limited': 0, 'concurrency_limited': 0}
+
+    @staticmethod
+    def is_limited(api):
+        """True si l'API a une limite de débit ou de concurrence"""
+        return bool(api.rate_limit_enabled or api.max_in_flight)
+
+    @staticmethod
+    def admit(api):
+        """
+        Admet une requête ou la rejette
+
+        Une requête admise doit être terminée par release(api).
+
+        Args:
+            api: API résolue (réglages rate_limit_* et max_in_flight)
+
+        Returns:
+            tuple: (corps d'erreur, code HTTP 429, délai Retry-After en secondes), None si admise
+        """
+        if not RateLimiter.is_limited(api):
+            return None
+
+        with RateLimiter._registry_lock:
+            limiter = RateLimiter._limiters.get(api.id)
+            if limiter is None:
+                limiter = RateLimiter._limiters[api.id] = RateLimiter(api.id)
+
+        return limiter._admit(api)
+
+    @staticmethod
+    def release(api):
+        """Termine une requête admise par admit(api)"""
+        if not RateLimiter.is_limited(api):
+            return
+        limiter = RateLimiter._limiters.get(api.id)
+        if limiter is not None:
+            with limiter._lock:
+                limiter._in_flight = max(0, limiter._in_flight - 1)
+
+    @staticmethod
+    def discard(api_id):
+        """Oublie l'état d'une API (supprimée, désactivée ou limites retirées)"""
+        with RateLimiter._registry_lock:
+            RateLimiter._limiters.pop(api_id, None)
+
+    @staticmethod
+    def get_stats(api_id):
+        """Retourne les compteurs de rejet d'une API, None si elle n'a jamais été limitée"""
+        limiter = RateLimiter._limiters.get(api_id)
+        return limiter.stats() if limiter is not None else None
+
+    @staticmethod
+    def get_all_stats():
+        """Retourne les compteurs de toutes les APIs limitées du processus"""
+        with RateLimiter._registry_lock:
+            limiters = list(RateLimiter._limiters.values())
+        return [limiter.stats() for limiter in limiters]
+
+    def _admit(self, api):
+        with self._lock:
+            self._configure(api)
+
+            # Concurrence d'abord: un rejet ne consomme pas de jeton
+            if self._max_in_flight and self._in_flight >= self._max_in_flight:
+                self._counters['concurrency_limited'] += 1
+                return {
+                    'error': {
+                        'code': 'TOO_MANY_CONCURRENT_REQUESTS',
+                        'message': f'Too many concurrent requests for this API (max {self._max_in_flight})'
+                    }
+                }, 429, 1
+
+            if self._bucket is not None:
+                wait = self._bucket.try_acquire()
+                if wait > 0:
+                    self._counters['rate_limited'] += 1
+                    retry_after = max(1, math.ceil(wait))
+                    return {
+                        'error': {
+                            'code': 'RATE_LIMIT_EXCEEDED',
+                            'message': f'Rate limit exceeded, retry after {retry_after} second(s)'
+                        }
+                    }, 429, retry_after
+
+            self._in_flight += 1
+            self._counters['admitted'] += 1
+            return None
+
+    def _configure(self, api):
+        """Applique les réglages courants de l'API (verrou déjà acquis)"""
+        self._max_in_flight = api.max_in_flight or 0
+
+        if not api.rate_limit_enabled:
+            self._bucket = None
+        elif self._bucket is None:
+            self._bucket = TokenBucket(api.rate_limit_per_second, api.rate_limit_burst)
+        elif (self._bucket.rate, self._bucket.capacity) != (api.rate_limit_per_second, api.rate_limit_burst):
+            self._bucket.configure(api.rate_limit_per_second, api.rate_limit_burst)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'api_id': self.api_id,
+                'rate_limit_per_second': self._bucket.rate if self._bucket is not None else None,
+                'rate_limit_burst': self._bucket.capacity if self._bucket is not None else None,
+                'max_in_flight': self._max_in_flight or None,
+                'in_flight': self._in_flight,
+                'admitted': self._counters['admitted'],
+                'rate_limited': self._counters['rate_limited'],
+                'concurrency_limited': self._counters['concurrency_limited'],
+                'rejected': self._counters['rate_limited'] + self._counters['concurrency_limited']
+            }
@@ -0,0 +1,211 @@
+"""Écriture différée (write-behind) des logs de requêtes API"""
+import time
+import queue
+import atexit
+import logging
+import threading
+from sqlalchemy import insert
+from extensions import db
+from models.api_request import APIRequest
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLogWriter:
+    """
+    File bornée de logs de requêtes vidée par un thread d'arrière-plan
+
+    Les prédictions déposent leur log dans la file sans attendre la base;
+    le thread insère les logs par lots (taille ou délai atteint, le premier
+    des deux). Quand la file est pleine, le log est abandonné et compté
+    plutôt que de ralentir la prédiction.
+    """
+
+    _app = None
+    _queue = None
+    _thread = None
+    _stop = threading.Event()
+    _batch_size = 500
+    _flush_interval = 1.0
+    _lock = threading.Lock()
+    _written = threading.Condition(_lock)  # notifié à chaque lot écrit ou en échec
+    _counters = {
+        'enqueued': 0,
+        'written': 0,
+        'dropped': 0,
+        'write_errors': 0,
+        'batches': 0
+    }
+
+    @staticmethod
+    def init_app(app):
+        """Démarre le thread d'écriture si REQUEST_LOG_ASYNC est activé"""
+        if not app.config['REQUEST_LOG_ASYNC']:
+            return
+
+        # Une seule instance active par processus
+        RequestLogWriter.shutdown()
+
+        RequestLogWriter._app = app
+        RequestLogWriter._queue = queue.Queue(maxsize=app.config['REQUEST_LOG_QUEUE_SIZE'])
+        RequestLogWriter._batch_size = app.config['REQUEST_LOG_BATCH_SIZE']
+        RequestLogWriter._flush_interval = app.config['REQUEST_LOG_FLUSH_INTERVAL']
+        RequestLogWriter._stop = threading.Event()
+        RequestLogWriter._thread = threading.Thread(
+            target=RequestLogWriter._run, name='request-log-writer', daemon=True
+        )
+        RequestLogWriter._thread.start()
+
+    @staticmethod
+    def is_running():
+        thread = RequestLogWriter._thread
+        return thread is not None and thread.is_alive()
+
+    @staticmethod
+    def enqueue(values):
+        """
+        Dépose un log dans la file sans bloquer
+
+        Args:
+            values: Dictionnaire des colonnes d'APIRequest
+
+        Returns:
+            bool: True si le log a été accepté, False si la file est pleine ou arrêtée
+        """
+        if not RequestLogWriter.is_running():
+            return False
+
+        try:
+            RequestLogWriter._queue.put_nowait(values)
+        except queue.Full:
+            RequestLogWriter._increment('dropped')
+            return False
+
+        RequestLogWriter._increment('enqueued')
+        return True
+
+    @staticmethod
+    def flush(timeout=5):
+        """
+        Écrit les logs acceptés jusqu'ici, depuis n'importe quel thread
+
+        Vide la file dans le thread appelant, puis attend que le lot déjà
+        retiré de la file par le thread d'arrière-plan soit écrit (ou en
+        échec). Les logs acceptés pendant l'attente ne sont pas attendus.
+
+        Args:
+            timeout: Attente maximale du lot en cours, en secondes
+
+        Returns:
+            bool: True si tous les logs acceptés avant l'appel sont traités
+        """
+        if RequestLogWriter._queue is None:
+            return True
+        with RequestLogWriter._lock:
+            target = RequestLogWriter._counters['enqueued']
+        RequestLogWriter._write_pending()
+
+        with RequestLogWriter._written:
+            return RequestLogWriter._written.wait_for(
+                lambda: RequestLogWriter._processed() >= target, timeout
+            )
+
+    @staticmethod
+    def shutdown(timeout=10):
+        """Arrête le thread après avoir vidé la file"""
+        thread = RequestLogWriter._thread
+        if thread is None:
+            return
+        RequestLogWriter._stop.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"Écriture des logs de requêtes non terminée après {timeout}s")
+        RequestLogWriter._thread = None
+
+    @staticmethod
+    def stats():
+        """Retourne les compteurs de la file (acceptés, écrits, abandonnés, erreurs)"""
+        with RequestLogWriter._lock:
+            stats = dict(RequestLogWriter._counters)
+        q = RequestLogWriter._queue
+        stats['running'] = RequestLogWriter.is_running()
+        stats['queued'] = q.qsize() if q is not None else 0
+        stats['max_queue_size'] = q.maxsize if q is not None else 0
+        return stats
+
+    @staticmethod
+    def _run():
+        """Boucle du thread: regroupe les logs par lots puis les insère"""
+        while not RequestLogWriter._stop.is_set():
+            batch = RequestLogWriter._collect_batch()
+            if batch:
+                RequestLogWriter._write(batch)
+
+        # Arrêt demandé: écrire ce qui reste (shutdown attend la fin du thread)
+        RequestLogWriter._write_pending()
+
+    @staticmethod
+    def _collect_batch():
+        """Attend des logs jusqu'à remplir un lot ou atteindre le délai de flush"""
+        batch = []
+        deadline = time.monotonic() + RequestLogWriter._flush_interval
+        while len(batch) < RequestLogWriter._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or RequestLogWriter._stop.is_set():
+                break
+            try:
+                batch.append(RequestLogWriter._queue.get(timeout=min(remaining, 0.1)))
+            except queue.Empty:
+                continue
+        return batch
+
+    @staticmethod
+    def _write_pending():
+        """Écrit tout ce qui est dans la file, dans le thread appelant"""
+        while True:
+            batch = RequestLogWriter._drain(RequestLogWriter._batch_size)
+            if not batch:
+                return
+            RequestLogWriter._write(batch)
+
+    @staticmethod
+    def _drain(limit):
+        """Retire jusqu'à limit logs de la file sans attendre"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(RequestLogWriter._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _write(batch):
+        """Insère un lot de logs en une seule requête multi-lignes"""
+        try:
+            with RequestLogWriter._app.app_context():
+                db.session.execute(insert(APIRequest), batch)
+                db.session.commit()
+            with RequestLogWriter._written:
+                RequestLogWriter._counters['written'] += len(batch)
+                RequestLogWriter._counters['batches'] += 1
+                RequestLogWriter._written.notify_all()
+        except Exception as e:
+            with RequestLogWriter._written:
+                RequestLogWriter._counters['write_errors'] += len(batch)
+                RequestLogWriter._written.notify_all()
+            logger.error(f"Erreur lors de l'écriture de {len(batch)} logs de requêtes: {str(e)}")
+
+    @staticmethod
+    def _processed():
+        """Logs écrits ou en échec (appelé avec _lock détenu)"""
+        counters = RequestLogWriter._counters
+        return counters['written'] + counters['write_errors']
+
+    @staticmethod
+    def _increment(counter, value=1):
+        with RequestLogWriter._lock:
+            RequestLogWriter._counters[counter] += value
+
+
+atexit.register(RequestLogWriter.shutdown)
@@ -0,0 +1,151 @@
+"""Échantillonnage périodique du CPU et de la mémoire du processus"""
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque, OrderedDict
+from datetime import datetime
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceSampler:
+    """
+    Mesure le CPU et la RSS du processus à intervalle fixe dans un buffer circulaire
+
+    Les prédictions attachent le dernier échantillon à leur log au lieu
+    d'appeler psutil dans le chemin de la requête; le pourcentage CPU est
+    calculé sur tout l'intervalle, ce qui lui donne un sens.
+    """
+
+    _thread = None
+    _stop = threading.Event()
+    _interval = 1.0
+    _lock = threading.Lock()
+    _samples = deque(maxlen=300)  # (timestamp monotonic, cpu %, rss en MB)
+    # Heure UTC -> [somme cpu, somme mémoire, nombre d'échantillons]: le buffer
+    # ne couvre que quelques minutes
+    _hourly = OrderedDict()
+    HOURLY_HISTORY = 48  # heures conservées
+
+    @staticmethod
+    def init_app(app):
+        """Démarre le thread d'échantillonnage si RESOURCE_SAMPLER_ENABLED est activé"""
+        if not app.config['RESOURCE_SAMPLER_ENABLED']:
+            return
+
+        # Une seule instance active par processus
+        ResourceSampler.shutdown()
+
+        ResourceSampler._interval = app.config['RESOURCE_SAMPLE_INTERVAL']
+        with ResourceSampler._lock:
+            ResourceSampler._samples = deque(maxlen=app.config['RESOURCE_SAMPLE_HISTORY'])
+        ResourceSampler._stop = threading.Event()
+        ResourceSampler._thread = threading.Thread(
+            target=ResourceSampler._run, name='resource-sampler', daemon=True
+        )
+        ResourceSampler._thread.start()
+
+    @staticmethod
+    def latest():
+        """
+        Retourne le dernier échantillon
+
+        Returns:
+            tuple: (cpu en %, mémoire en MB), (None, None) si aucun échantillon
+        """
+        with ResourceSampler._lock:
+            if not ResourceSampler._samples:
+                return None, None
+            _, cpu, memory = ResourceSampler._samples[-1]
+            return cpu, memory
+
+    @staticmethod
+    def window_average(seconds):
+        """
+        Moyenne des échantillons des dernières secondes
+
+        Returns:
+            tuple: (cpu moyen en %, mémoire moyenne en MB), (None, None) si aucun échantillon
+        """
+        since = time.monotonic() - seconds
+        with ResourceSampler._lock:
+            window = [sample for sample in ResourceSampler._samples if sample[0] >= since]
+        if not window:
+            return None, None
+        return (
+            sum(sample[1] for sample in window) / len(window),
+            sum(sample[2] for sample in window) / len(window)
+        )
+
+    @staticmethod
+    def get_hourly_averages():
+        """
+        Moyennes des échantillons par heure UTC, de la plus ancienne à la plus récente
+
+        Propres au processus: les agrégats APIMetrics gardent les moyennes par API
+        des échantillons attachés aux requêtes.
+        """
+        with ResourceSampler._lock:
+            hourly = [(hour, list(totals)) for hour, totals in ResourceSampler._hourly.items()]
+        return [
+            {
+                'hour': hour.isoformat(),
+                'avg_cpu_usage': round(cpu_total / count, 2),
+                'avg_memory_usage': round(memory_total / count, 2),
+                'samples': count
+            }
+            for hour, (cpu_total, memory_total, count) in hourly
+        ]
+
+    @staticmethod
+    def get_samples():
+        """Retourne les échantillons du buffer (âge en secondes, cpu, mémoire)"""
+        now = time.monotonic()
+        with ResourceSampler._lock:
+            samples = list(ResourceSampler._samples)
+        return [
+            {'age': round(now - ts, 2), 'cpu_usage': cpu, 'memory_usage': round(memory, 2)}
+            for ts, cpu, memory in samples
+        ]
+
+    @staticmethod
+    def shutdown(timeout=5):
+        thread = ResourceSampler._thread
+        if thread is None:
+            return
+        ResourceSampler._stop.set()
+        thread.join(timeout)
+        ResourceSampler._thread = None
+
+    @staticmethod
+    def _run():
+        process = psutil.Process(os.getpid())
+        # Le premier appel initialise la référence de cpu_percent
+        process.cpu_percent(interval=None)
+        while not ResourceSampler._stop.wait(ResourceSampler._interval):
+            try:
+                sample = (
+                    time.monotonic(),
+                    process.cpu_percent(interval=None),
+                    process.memory_info().rss / 1024 / 1024  # MB
+                )
+            except psutil.Error as e:
+                logger.warning(f"Échantillonnage des ressources impossible: {str(e)}")
+                continue
+            hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+            with ResourceSampler._lock:
+                ResourceSampler._samples.append(sample)
+                totals = ResourceSampler._hourly.get(hour)
+                if totals is None:
+                    totals = ResourceSampler._hourly[hour] = [0.0, 0.0, 0]
+                    while len(ResourceSampler._hourly) > ResourceSampler.HOURLY_HISTORY:
+                        ResourceSampler._hourly.popitem(last=False)
+                totals[0] += sample[1]
+                totals[1] += sample[2]
+                totals[2] += 1
+
+
+atexit.register(ResourceSampler.shutdown)
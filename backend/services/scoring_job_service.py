@@ -0,0 +1,264 @@
+"""Service pour le scoring hors ligne de datasets complets"""
+import os
+import uuid
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from extensions import db
+from models.scoring_job import ScoringJob
+from models.ml_model import MLModel
+from models.dataset import Dataset
+from services.scoring_worker import init_worker, score_chunk
+from utils.api_key_cache import ResolvedModel
+from utils.model_loader import ModelLoader
+from utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Annulation demandée pendant l'exécution d'un job"""
+
+
+class ScoringJobService:
+    """Service pour scorer un dataset stocké avec un modèle entraîné, en arrière-plan"""
+
+    _cancel_events = {}  # job_id -> threading.Event (jobs exécutés par ce processus)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def create_job(model_id, dataset_id, chunk_size=None, workers=None, app=None):
+        """
+        Crée un job de scoring et le lance dans un thread d'arrière-plan
+
+        Args:
+            model_id: ID du modèle entraîné
+            dataset_id: ID du dataset à scorer
+            chunk_size: Lignes lues et prédites par morceau (défaut: SCORING_CHUNK_SIZE)
+            workers: Processus du pool (1 = dans le thread du job, max SCORING_MAX_WORKERS)
+            app: Application Flask (un contexte applicatif est ouvert dans le thread)
+
+        Returns:
+            dict: Le job créé
+        """
+        model = MLModel.query.get(model_id)
+        if not model:
+            raise ValueError(f"Modèle {model_id} introuvable")
+
+        if model.status != 'trained':
+            raise ValueError(f"Le modèle doit être entraîné avant le scoring (statut actuel: {model.status})")
+
+        dataset = Dataset.query.get(dataset_id)
+        if not dataset:
+            raise ValueError(f"Dataset {dataset_id} introuvable")
+
+        missing = [col for col in model.inputs or [] if col not in dataset.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans le dataset: {', '.join(missing)}")
+
+        output_folder = os.path.join(app.config['UPLOAD_FOLDER'], 'scoring')
+        os.makedirs(output_folder, exist_ok=True)
+
+        job = ScoringJob(
+            model_id=model_id,
+            dataset_id=dataset_id,
+            status='pending',
+            chunk_size=chunk_size or app.config['SCORING_CHUNK_SIZE'],
+            workers=min(workers or 1, app.config['SCORING_MAX_WORKERS']),
+            total_rows=dataset.row_count,
+            output_path=os.path.join(output_folder, f"scoring_{model_id}_{dataset_id}_{uuid.uuid4().hex[:8]}.csv")
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        with ScoringJobService._lock:
+            ScoringJobService._cancel_events[job.id] = threading.Event()
+
+        thread = threading.Thread(
+            target=ScoringJobService.run_job, args=(app, job.id), name=f'scoring-job-{job.id}', daemon=True
+        )
+        thread.start()
+
+        logger.info(f"Job de scoring {job.id} créé (modèle {model_id}, dataset {dataset_id})")
+        return job.to_dict()
+
+    @staticmethod
+    def get_job(job_id):
+        job = ScoringJob.query.get(job_id)
+        if not job:
+            raise ValueError(f"Job {job_id} introuvable")
+        return job
+
+    @staticmethod
+    def get_all_jobs(model_id=None):
+        """
+        Récupère les jobs de scoring, les plus récents d'abord
+
+        Args:
+            model_id: Filtre optionnel sur le modèle
+        """
+        query = ScoringJob.query
+        if model_id is not None:
+            query = query.filter_by(model_id=model_id)
+        return [job.to_dict() for job in query.order_by(ScoringJob.created_at.desc()).all()]
+
+    @staticmethod
+    def cancel_job(job_id):
+        """
+        Demande l'annulation d'un job en attente ou en cours
+
+        Le job s'arrête avant le morceau suivant; le fichier partiel est supprimé.
+        """
+        job = ScoringJobService.get_job(job_id)
+        if job.status not in ('pending', 'running'):
+            raise ValueError(f"Le job {job_id} est déjà terminé (statut: {job.status})")
+
+        # Drapeau en base pour un job exécuté par un autre processus
+        job.cancel_requested = True
+        db.session.commit()
+
+        with ScoringJobService._lock:
+            event = ScoringJobService._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+
+        logger.info(f"Annulation demandée pour le job de scoring {job_id}")
+        return job.to_dict()
+
+    @staticmethod
+    def run_job(app, job_id):
+        """
+        Exécute un job: lecture par morceaux, prédiction, écriture du fichier de sortie
+
+        Args:
+            app: Application Flask
+            job_id: ID du job
+        """
+        with app.app_context():
+            job = ScoringJob.query.get(job_id)
+            executor = None
+            part_path = job.output_path + '.part'
+
+            try:
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+
+                ml_model = ResolvedModel(job.model)
+                model = ModelLoader.load(ml_model)
+                outputs = list(job.model.outputs or [])
+
+                # Colonnes catégorielles lues comme texte: les codes ne dépendent pas du
+                # type que pandas infère sur chaque morceau
+                chunks = FileHandler.iter_csv_chunks(
+                    job.dataset.path, job.chunk_size, dtype={col: str for col in model.category_maps}
+                )
+
+                if job.workers > 1:
+                    # spawn: pas de fork des threads du processus serveur; les processus
+                    # n'importent que scoring_worker (pandas et chargement du modèle)
+                    executor = ProcessPoolExecutor(
+                        max_workers=job.workers, mp_context=multiprocessing.get_context('spawn'),
+                        initializer=init_worker,
+                        initargs=(ModelLoader.cache.max_bytes, ModelLoader.mmap_mode)
+                    )
+
+                with open(part_path, 'w', newline='', encoding='utf-8') as output:
+                    scored = ScoringJobService._score_chunks(chunks, ml_model, executor, job.workers)
+                    for index, (frame, (valid, predictions, errors)) in enumerate(scored):
+                        result = ScoringJobService._build_output(frame, valid, predictions, errors, outputs)
+                        result.to_csv(output, header=index == 0, index=False)
+
+                        job.processed_rows += len(frame)
+                        job.error_rows += int((~valid).sum())
+                        db.session.commit()
+
+                        if ScoringJobService._cancel_requested(job):
+                            raise JobCancelled()
+
+                os.replace(part_path, job.output_path)
+                job.status = 'completed'
+                logger.info(f"Job de scoring {job_id} terminé: {job.processed_rows} lignes")
+
+            except JobCancelled:
+                job.status = 'cancelled'
+                logger.info(f"Job de scoring {job_id} annulé après {job.processed_rows} lignes")
+            except Exception as e:
+                db.session.rollback()
+                job.status = 'failed'
+                job.error_message = str(e)
+                logger.error(f"Erreur lors du job de scoring {job_id}: {str(e)}", exc_info=True)
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                db.session.remove()
+
+                with ScoringJobService._lock:
+                    ScoringJobService._cancel_events.pop(job_id, None)
+
+    @staticmethod
+    def _score_chunks(chunks, ml_model, executor, workers):
+        """
+        Prédit les morceaux dans l'ordre, dans le thread ou via le pool
+
+        Avec un pool, au plus 2 morceaux par processus sont en vol: la mémoire
+        reste bornée quelle que soit la taille du dataset.
+
+        Yields:
+            tuple: (morceau, résultat de score_chunk)
+        """
+        inputs = ml_model.inputs
+        if executor is None:
+            for frame in chunks:
+                yield frame, score_chunk(ml_model, frame[inputs])
+            return
+
+        pending = deque()
+        try:
+            for frame in chunks:
+                pending.append((frame, executor.submit(score_chunk, ml_model, frame[inputs])))
+                if len(pending) >= workers * 2:
+                    frame, future = pending.popleft()
+                    yield frame, future.result()
+            while pending:
+                frame, future = pending.popleft()
+                yield frame, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _build_output(frame, valid, predictions, errors, outputs):
+        """Ajoute au morceau les colonnes de prédiction (une par output) et d'erreur"""
+        result = frame.copy()
+        names = [f"{output}_prediction" for output in outputs] or ['prediction']
+
+        if predictions is not None and predictions.ndim == 1:
+            predictions = predictions.reshape(-1, 1)
+
+        for position, name in enumerate(names):
+            column = np.full(len(frame), None, dtype=object)
+            if predictions is not None and position < predictions.shape[1]:
+                column[valid] = predictions[:, position]
+            result[name] = column
+
+        result['scoring_error'] = errors
+        return result
+
+    @staticmethod
+    def _cancel_requested(job):
+        """Annulation demandée dans ce processus ou en base (autre processus)"""
+        with ScoringJobService._lock:
+            event = ScoringJobService._cancel_events.get(job.id)
+        if event is not None and event.is_set():
+            return True
+        return bool(db.session.query(ScoringJob.cancel_requested).filter_by(id=job.id).scalar())
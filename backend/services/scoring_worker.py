@@ -0,0 +1,45 @@
+"""Prédiction des morceaux d'un job de scoring (thread du job ou processus du pool)
+
+Ce module n'importe que pandas et le chargement des modèles: un processus
+du pool (spawn) ne charge ni Flask, ni SQLAlchemy, ni les services.
+"""
+import numpy as np
+import pandas as pd
+from utils.model_loader import ModelLoader
+
+
+def init_worker(cache_max_bytes, mmap_mode):
+    """Initialise un processus du pool avec les réglages du cache du serveur"""
+    ModelLoader.configure(cache_max_bytes, mmap_mode)
+
+
+def score_chunk(ml_model, frame):
+    """
+    Prédit un morceau du dataset
+
+    Les valeurs non numériques des colonnes numériques sont signalées par
+    ligne au lieu d'être imputées silencieusement.
+
+    Args:
+        ml_model: ResolvedModel (picklable)
+        frame: DataFrame des colonnes d'entrée
+
+    Returns:
+        tuple: (masque des lignes prédites, prédictions de ces lignes, erreur par ligne ou None)
+    """
+    model = ModelLoader.load(ml_model)
+    frame = frame.copy()
+    errors = np.full(len(frame), None, dtype=object)
+
+    for col in model.input_columns:
+        if col in model.category_maps:
+            continue
+        values = pd.to_numeric(frame[col], errors='coerce')
+        invalid = (values.isna() & frame[col].notna()).to_numpy()
+        if invalid.any():
+            errors[invalid & pd.isna(errors)] = f"Colonne '{col}': valeur numérique attendue"
+        frame[col] = values
+
+    valid = pd.isna(errors)
+    predictions = model.predict(frame[valid]) if valid.any() else None
+    return valid, predictions, errors
@@ -0,0 +1,179 @@
+"""Compteurs d'utilisation des APIs agrégés en mémoire"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import case, or_, update
+from extensions import db
+from models.exported_api import ExportedAPI
+
+logger = logging.getLogger(__name__)
+
+
+class UsageCounters:
+    """
+    Agrège total_requests / last_used_at par API et les écrit périodiquement
+
+    Au lieu d'un UPDATE de la ligne exported_apis à chaque prédiction (qui
+    sérialise les workers sur le verrou de ligne d'une API populaire), les
+    incréments sont cumulés en mémoire puis appliqués par un thread
+    d'arrière-plan avec un UPDATE atomique par API:
+        total_requests = total_requests + :n
+    Les endpoints de monitoring ajoutent les deltas pas encore écrits.
+    """
+
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+    _flush_interval = 5.0
+    _lock = threading.Lock()
+    _pending = {}   # api_id -> [nombre, dernière utilisation]
+    _flushing = {}  # deltas en cours d'écriture, encore visibles pour le monitoring
+
+    @staticmethod
+    def init_app(app):
+        """Démarre le thread de flush si USAGE_COUNTERS_ASYNC est activé"""
+        if not app.config['USAGE_COUNTERS_ASYNC']:
+            return
+
+        # Une seule instance active par processus
+        UsageCounters.shutdown()
+
+        UsageCounters._app = app
+        UsageCounters._flush_interval = app.config['USAGE_COUNTERS_FLUSH_INTERVAL']
+        UsageCounters._stop = threading.Event()
+        UsageCounters._thread = threading.Thread(
+            target=UsageCounters._run, name='usage-counters', daemon=True
+        )
+        UsageCounters._thread.start()
+
+    @staticmethod
+    def is_running():
+        thread = UsageCounters._thread
+        return thread is not None and thread.is_alive()
+
+    @staticmethod
+    def record(api_id, count=1):
+        """
+        Comptabilise une utilisation de l'API
+
+        Args:
+            api_id: ID de l'API
+            count: Nombre de requêtes à ajouter
+        """
+        now = datetime.utcnow()
+
+        if not UsageCounters.is_running():
+            # Pas de thread de flush: UPDATE immédiat dans la session courante
+            UsageCounters._apply(api_id, count, now)
+            db.session.commit()
+            return
+
+        with UsageCounters._lock:
+            delta = UsageCounters._pending.get(api_id)
+            if delta is None:
+                UsageCounters._pending[api_id] = [count, now]
+            else:
+                delta[0] += count
+                delta[1] = now
+
+    @staticmethod
+    def pending(api_id):
+        """
+        Retourne les deltas pas encore écrits pour une API
+
+        Returns:
+            tuple: (nombre de requêtes, dernière utilisation ou None)
+        """
+        with UsageCounters._lock:
+            count = 0
+            last_used_at = None
+            for deltas in (UsageCounters._flushing, UsageCounters._pending):
+                delta = deltas.get(api_id)
+                if delta is not None:
+                    count += delta[0]
+                    last_used_at = max(last_used_at, delta[1]) if last_used_at else delta[1]
+            return count, last_used_at
+
+    @staticmethod
+    def merge(api_dict):
+        """
+        Ajoute les deltas pas encore écrits au dictionnaire d'une API (to_dict)
+
+        Returns:
+            dict: Le même dictionnaire, mis à jour
+        """
+        count, last_used_at = UsageCounters.pending(api_dict['id'])
+        if count:
+            api_dict['total_requests'] = (api_dict['total_requests'] or 0) + count
+            api_dict['last_used_at'] = last_used_at.isoformat()
+        return api_dict
+
+    @staticmethod
+    def total_pending():
+        """Nombre total de requêtes pas encore écrites, toutes APIs confondues"""
+        with UsageCounters._lock:
+            return sum(delta[0] for deltas in (UsageCounters._flushing, UsageCounters._pending)
+                       for delta in deltas.values())
+
+    @staticmethod
+    def flush():
+        """Écrit les deltas accumulés (un UPDATE atomique par API, un seul commit)"""
+        with UsageCounters._lock:
+            if not UsageCounters._pending:
+                return
+            UsageCounters._flushing = UsageCounters._pending
+            UsageCounters._pending = {}
+            batch = UsageCounters._flushing
+
+        try:
+            with UsageCounters._app.app_context():
+                for api_id, (count, last_used_at) in batch.items():
+                    UsageCounters._apply(api_id, count, last_used_at)
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture des compteurs d'utilisation: {str(e)}")
+            # Remettre les deltas en attente pour le prochain flush
+            with UsageCounters._lock:
+                for api_id, (count, last_used_at) in batch.items():
+                    delta = UsageCounters._pending.setdefault(api_id, [0, last_used_at])
+                    delta[0] += count
+                    delta[1] = max(delta[1], last_used_at)
+        finally:
+            with UsageCounters._lock:
+                UsageCounters._flushing = {}
+
+    @staticmethod
+    def shutdown(timeout=10):
+        """Arrête le thread après un dernier flush"""
+        thread = UsageCounters._thread
+        if thread is None:
+            return
+        UsageCounters._stop.set()
+        thread.join(timeout)
+        UsageCounters._thread = None
+
+    @staticmethod
+    def _run():
+        while not UsageCounters._stop.wait(UsageCounters._flush_interval):
+            UsageCounters.flush()
+        UsageCounters.flush()
+
+    @staticmethod
+    def _apply(api_id, count, last_used_at):
+        """UPDATE atomique côté base, sans relire la ligne"""
+        db.session.execute(
+            update(ExportedAPI)
+            .where(ExportedAPI.id == api_id)
+            .values(
+                total_requests=ExportedAPI.total_requests + count,
+                # Un flush plus ancien (autre worker, autre processus) ne recule pas la date
+                last_used_at=case(
+                    (or_(ExportedAPI.last_used_at.is_(None), ExportedAPI.last_used_at < last_used_at), last_used_at),
+                    else_=ExportedAPI.last_used_at
+                )
+            )
+        )
+
+
+atexit.register(UsageCounters.shutdown)
@@ -0,0 +1,131 @@
+"""Service de préchargement des modèles au démarrage"""
+import time
+import logging
+import threading
+from datetime import datetime
+from extensions import db
+from models.exported_api import ExportedAPI
+from services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Précharge les modèles des APIs actives pour que la première requête
+    après un déploiement ne paie pas le joblib.load
+    """
+
+    _lock = threading.Lock()
+    _state = {
+        'status': 'disabled',
+        'total': 0,
+        'loaded': 0,
+        'skipped': 0,
+        'errors': 0,
+        'started_at': None,
+        'finished_at': None,
+        'duration': None
+    }
+
+    @staticmethod
+    def init_app(app):
+        """
+        Lance le préchargement si MODEL_WARMUP est activé
+
+        En arrière-plan par défaut (MODEL_WARMUP_BACKGROUND), pour que le
+        serveur démarre immédiatement et signale sa progression sur /health.
+        """
+        if not app.config['MODEL_WARMUP']:
+            return
+
+        WarmupService._update(status='pending')
+
+        if app.config['MODEL_WARMUP_BACKGROUND']:
+            thread = threading.Thread(target=WarmupService.run, args=(app,), name='model-warmup', daemon=True)
+            thread.start()
+        else:
+            WarmupService.run(app)
+
+    @staticmethod
+    def run(app):
+        """
+        Précharge les modèles des APIs actives, les plus utilisées d'abord,
+        jusqu'à remplir le budget du cache
+
+        Args:
+            app: Application Flask (un contexte applicatif est ouvert ici)
+        """
+        start = time.time()
+        WarmupService._update(
+            status='warming', loaded=0, skipped=0, errors=0,
+            started_at=datetime.utcnow().isoformat(), finished_at=None, duration=None
+        )
+
+        with app.app_context():
+            try:
+                apis = WarmupService.get_active_apis()
+                WarmupService._update(total=len(apis))
+
+                budget_reached = False
+                for api in apis:
+                    if budget_reached:
+                        WarmupService._increment('skipped')
+                        continue
+
+                    try:
+                        if PredictionService.warm_model(api.model):
+                            WarmupService._increment('loaded')
+                        else:
+                            # Les APIs suivantes sont moins utilisées: on s'arrête là
+                            budget_reached = True
+                            WarmupService._increment('skipped')
+                            logger.info(f"Budget du cache atteint, préchargement arrêté avant l'API {api.id}")
+                    except Exception as e:
+                        WarmupService._increment('errors')
+                        logger.warning(f"Préchargement impossible pour l'API {api.id}: {str(e)}")
+
+                status = 'ready'
+            except Exception as e:
+                logger.error(f"Erreur lors du préchargement des modèles: {str(e)}", exc_info=True)
+                status = 'failed'
+            finally:
+                db.session.remove()
+
+        duration = time.time() - start
+        WarmupService._update(
+            status=status,
+            finished_at=datetime.utcnow().isoformat(),
+            duration=round(duration, 2)
+        )
+        logger.info(f"Préchargement terminé en {duration:.2f}s: {WarmupService.get_state()}")
+
+    @staticmethod
+    def get_active_apis():
+        """APIs actives dans l'ordre de préchargement: les plus utilisées d'abord"""
+        return ExportedAPI.query.filter_by(status='active').order_by(
+            ExportedAPI.total_requests.desc(),
+            ExportedAPI.last_used_at.is_(None),
+            ExportedAPI.last_used_at.desc()
+        ).all()
+
+    @staticmethod
+    def get_state():
+        """Retourne une copie de l'état du préchargement"""
+        with WarmupService._lock:
+            return dict(WarmupService._state)
+
+    @staticmethod
+    def is_ready():
+        """True sauf pendant le préchargement (un échec ne bloque pas le service)"""
+        return WarmupService.get_state()['status'] not in ('pending', 'warming')
+
+    @staticmethod
+    def _update(**values):
+        with WarmupService._lock:
+            WarmupService._state.update(values)
+
+    @staticmethod
+    def _increment(counter):
+        with WarmupService._lock:
+            WarmupService._state[counter] += 1
@@ -0,0 +1,84 @@
+"""Fixtures communes: application sur une base SQLite et des dossiers temporaires
+
+La configuration (config.py) est lue dans l'environnement à son import:
+les variables sont posées ici, avant que les tests n'importent l'application.
+"""
+import io
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORK_FOLDER = tempfile.mkdtemp(prefix='ml-platform-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_FOLDER, 'test.db')}"
+os.environ['UPLOAD_FOLDER'] = os.path.join(WORK_FOLDER, 'uploads')
+os.environ['LOG_FILE'] = os.path.join(WORK_FOLDER, 'app.log')
+
+INPUTS = ['a', 'b', 'cat']
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Application Flask complète (MODEL_FOLDER est relatif: répertoire courant temporaire)"""
+    previous_cwd = os.getcwd()
+    os.chdir(WORK_FOLDER)
+    from app import create_app
+    application = create_app('production')
+    yield application
+    # Dernières écritures différées avant la suppression de la base
+    from services.request_log_writer import RequestLogWriter
+    from services.usage_counters import UsageCounters
+    RequestLogWriter.shutdown()
+    UsageCounters.shutdown()
+    os.chdir(previous_cwd)
+    shutil.rmtree(WORK_FOLDER, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def dataset_id(client):
+    """Dataset CSV uploadé: colonnes numériques a, b, catégorielle cat, cibles y et cls"""
+    rng = np.random.RandomState(0)
+    n = 300
+    df = pd.DataFrame({'a': rng.randn(n) * 10 + 50, 'b': rng.randn(n), 'cat': rng.choice(['x', 'y', 'z'], n)})
+    df['y'] = (df.a * 0.3 + df.b * 5 + (df.cat == 'x') * 4 + rng.randn(n)).round(3)
+    df['cls'] = (df.y > df.y.median()).astype(int)
+    response = client.post(
+        '/datasets/upload',
+        data={'file': (io.BytesIO(df.to_csv(index=False).encode()), 'dataset.csv')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['id']
+
+
+@pytest.fixture
+def trained_model(client, dataset_id):
+    """Fabrique: crée et entraîne un modèle, retourne son ID"""
+    def make(target='y', algorithm='linear_regression'):
+        model_id = client.post('/models/create', json={'name': f'test {algorithm}', 'dataset_id': dataset_id}).get_json()['id']
+        client.post(f'/models/{model_id}/select-io', json={'inputs': INPUTS, 'outputs': [target]})
+        response = client.post(f'/models/{model_id}/train', json={'algorithm': algorithm})
+        assert response.status_code == 200, response.get_json()
+        return model_id
+    return make
+
+
+@pytest.fixture
+def exported_api(client, trained_model):
+    """Fabrique: entraîne et exporte un modèle, retourne (model_id, {'id', 'api_key', ...})"""
+    def make(target='y', algorithm='linear_regression'):
+        model_id = trained_model(target, algorithm)
+        response = client.post(f'/api/export/{model_id}')
+        assert response.status_code in (200, 201), response.get_json()
+        return model_id, response.get_json()
+    return make
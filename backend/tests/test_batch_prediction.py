@@ -0,0 +1,33 @@
+"""Prédiction par lot: une ligne invalide est signalée sans faire échouer les autres"""
+import pytest
+
+RECORD = {'a': 51, 'b': 0.2, 'cat': 'x'}
+
+
+@pytest.fixture
+def api(exported_api):
+    return exported_api('y', 'linear_regression')[1]
+
+
+def test_batch_matches_single_predictions_with_row_errors(client, api):
+    headers = {'X-API-Key': api['api_key']}
+    single = client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers).get_json()['prediction']
+    records = [RECORD, {'a': 'abc', 'b': 1, 'cat': 'y'}, {'a': 1}, RECORD]
+
+    response = client.post(f"/api/predict/{api['id']}/batch", json=records, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+
+    assert body['count'] == 4
+    assert body['success_count'] == 2
+    assert body['error_count'] == 2
+    assert [error['index'] for error in body['errors']] == [1, 2]
+    assert body['predictions'][1] is None and body['predictions'][2] is None
+    assert [body['predictions'][0]] == single
+    assert body['predictions'][3] == body['predictions'][0]
+
+
+def test_batch_rejects_empty_body(client, api):
+    response = client.post(f"/api/predict/{api['id']}/batch", json=[], headers={'X-API-Key': api['api_key']})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,90 @@
+"""Invalidation des caches (modèles, clés API résolues, résultats) au réentraînement, à la désactivation et à la régénération de clé"""
+from services.prediction_service import PredictionService
+
+RECORD = {'a': 51, 'b': 0.2, 'cat': 'x'}
+
+
+def cached_versions(model_id):
+    """Versions du modèle présentes dans le cache des modèles (hors estimateur d'origine)"""
+    prefix = f"({model_id}, "
+    return [
+        item['key'] for item in PredictionService.get_cache_stats()['items']
+        if item['key'].startswith(prefix) and "'source'" not in item['key']
+    ]
+
+
+def predict(client, api, api_key=None):
+    return client.post(f"/api/predict/{api['id']}", json=RECORD, headers={'X-API-Key': api_key or api['api_key']})
+
+
+def test_retrain_serves_new_version(client, exported_api):
+    model_id, api = exported_api('y', 'linear_regression')
+    before = predict(client, api)
+    assert before.status_code == 200
+    assert len(cached_versions(model_id)) == 1
+    old_version = cached_versions(model_id)[0]
+
+    response = client.post(f'/models/{model_id}/train', json={'algorithm': 'decision_tree'})
+    assert response.status_code == 200, response.get_json()
+
+    after = predict(client, api)
+    assert after.status_code == 200
+    assert after.get_json()['prediction'] != before.get_json()['prediction']
+    # Une seule version en cache: l'ancienne est remplacée, pas conservée à côté
+    assert len(cached_versions(model_id)) == 1
+    assert cached_versions(model_id)[0] != old_version
+
+
+def test_deactivate_evicts_model_and_rejects_key(client, exported_api):
+    model_id, api = exported_api()
+    assert predict(client, api).status_code == 200
+    assert cached_versions(model_id)
+
+    response = client.put(f"/api/export/s/{api['id']}/status", json={'status': 'inactive'})
+    assert response.status_code == 200
+
+    assert cached_versions(model_id) == []
+    # La clé résolue en cache ne doit plus servir l'API désactivée
+    assert predict(client, api).status_code != 200
+
+
+def test_deactivate_keeps_model_served_by_another_api(app, client, exported_api):
+    from extensions import db
+    from models.exported_api import ExportedAPI
+
+    model_id, api = exported_api()
+    with app.app_context():
+        other = ExportedAPI(model_id=model_id, api_key='k' * 48, api_endpoint=f'/api/predict/other-{model_id}')
+        db.session.add(other)
+        db.session.commit()
+        other = {'id': other.id, 'api_key': other.api_key}
+    for target in (api, other):
+        client.put(f"/api/export/s/{target['id']}/settings", json={'result_cache_enabled': True})
+        assert predict(client, target).status_code == 200
+
+    assert client.put(f"/api/export/s/{api['id']}/status", json={'status': 'inactive'}).status_code == 200
+
+    # Modèle et résultats mémoïsés de l'autre API conservés, cache de l'API désactivée supprimé
+    assert cached_versions(model_id)
+    assert PredictionService.get_result_cache_stats(api['id']) is None
+    assert PredictionService.get_result_cache_stats(other['id'])['entries'] == 1
+    response = predict(client, other)
+    assert response.status_code == 200
+    assert PredictionService.get_result_cache_stats(other['id'])['hits'] == 1
+
+    assert client.delete(f"/api/export/s/{other['id']}").status_code == 200
+    assert cached_versions(model_id) == []
+
+
+def test_regenerate_key_invalidates_cached_key(client, exported_api):
+    model_id, api = exported_api()
+    # Deux requêtes: la seconde est servie par le cache des clés résolues
+    assert predict(client, api).status_code == 200
+    assert predict(client, api).status_code == 200
+
+    response = client.post(f"/api/export/s/{api['id']}/regenerate-key")
+    assert response.status_code == 200
+    new_key = response.get_json()['api_key']
+
+    assert predict(client, api).status_code in (401, 403)
+    assert predict(client, api, api_key=new_key).status_code == 200
@@ -0,0 +1,85 @@
+"""Le pipeline compilé (numpy) prédit exactement comme le pipeline scikit-learn sauvegardé par joblib"""
+import types
+import joblib
+import numpy as np
+import pytest
+from utils.ml_algorithms import MLAlgorithms
+from utils.model_pipeline import ModelPipeline
+from utils.compiled_predictor import CompiledPipeline, compile_pipeline, compiled_path
+from utils.model_loader import ModelLoader
+
+COLUMNS = ['f0', 'f1', 'f2', 'f3']
+CASES = [
+    ('classification', 'logistic_regression'),
+    ('classification', 'decision_tree'),
+    ('classification', 'random_forest'),
+    ('regression', 'linear_regression'),
+    ('regression', 'decision_tree'),
+    ('regression', 'random_forest'),
+]
+
+
+def make_data(problem_type, n_samples):
+    """Données synthétiques avec quelques valeurs manquantes (comme benchmarks/compiled_predictor.py)"""
+    rng = np.random.RandomState(42)
+    X = rng.randn(n_samples, len(COLUMNS))
+    X[rng.rand(n_samples, len(COLUMNS)) < 0.02] = np.nan
+    signal = np.nan_to_num(X[:, :3]).sum(axis=1)
+    if problem_type == 'classification':
+        y = np.array(['a', 'b', 'c'])[np.digitize(signal, [-1.0, 1.0])]
+    else:
+        y = signal + rng.randn(n_samples) * 0.1
+    return X, y
+
+
+def assert_same_predictions(problem_type, expected, actual):
+    if problem_type == 'classification':
+        assert (np.asarray(expected) == np.asarray(actual)).all()
+    else:
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.fixture(scope='module', params=CASES, ids=['-'.join(case) for case in CASES])
+def saved(request, tmp_path_factory):
+    """Pipeline entraîné écrit comme par l'entraînement: .pkl joblib et artefact compilé à côté"""
+    problem_type, algorithm = request.param
+    X, y = make_data(problem_type, 600)
+    result = MLAlgorithms.train_and_evaluate(algorithm, X, X[:100], y, y[:100], problem_type)
+    pipeline = ModelPipeline(result['model_instance'], COLUMNS, imputer=result['imputer'], scaler=result['scaler'])
+    compiled = compile_pipeline(pipeline)
+    assert compiled is not None
+
+    model_path = str(tmp_path_factory.mktemp(algorithm) / 'model.pkl')
+    joblib.dump(pipeline, model_path, compress=0)
+    joblib.dump(compiled, compiled_path(model_path), compress=0)
+    return problem_type, model_path
+
+
+@pytest.fixture
+def batch():
+    values = np.random.RandomState(0).randn(1000, len(COLUMNS))
+    values[::50, 1] = np.nan
+    return values
+
+
+def test_compiled_matches_joblib_pipeline(saved, batch):
+    problem_type, model_path = saved
+    pipeline = joblib.load(model_path)
+    compiled = joblib.load(compiled_path(model_path))
+
+    for row in batch[:20]:
+        assert_same_predictions(problem_type, pipeline.predict_encoded(row[None, :]), compiled.predict_encoded(row[None, :]))
+    # Au-delà de max_rows sans estimateur d'origine: parcours numpy par morceaux
+    assert_same_predictions(problem_type, pipeline.predict_encoded(batch), compiled.predict_encoded(batch))
+
+
+def test_model_loader_serves_compiled_pipeline(saved, batch):
+    problem_type, model_path = saved
+    ml_model = types.SimpleNamespace(id=f'test-{model_path}', model_path=model_path, inputs=COLUMNS, trained_at=None)
+    expected = joblib.load(model_path).predict_encoded(batch)
+
+    model = ModelLoader.load(ml_model)
+    assert isinstance(model, CompiledPipeline)
+    # Gros lot: estimateur d'origine chargé via le cache (entrée 'source') pour les arbres
+    assert_same_predictions(problem_type, expected, model.predict_encoded(batch))
+    assert_same_predictions(problem_type, expected[:5], model.predict_encoded(batch[:5]))
@@ -0,0 +1,33 @@
+"""Limite de débit par API: 429 avec Retry-After au-delà du burst, requêtes refusées non comptées"""
+
+RECORD = {'a': 51, 'b': 0.2, 'cat': 'x'}
+
+
+def test_burst_then_429_with_retry_after(client, exported_api):
+    _, api = exported_api()
+    response = client.put(
+        f"/api/export/s/{api['id']}/settings",
+        json={'rate_limit_enabled': True, 'rate_limit_per_second': 0.5, 'rate_limit_burst': 2}
+    )
+    assert response.status_code == 200, response.get_json()
+
+    headers = {'X-API-Key': api['api_key']}
+    statuses = [client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers).status_code for _ in range(2)]
+    assert statuses == [200, 200]
+
+    response = client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers)
+    assert response.status_code == 429
+    assert response.get_json()['error']['code'] == 'RATE_LIMIT_EXCEEDED'
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_disabling_rate_limit_admits_requests(client, exported_api):
+    _, api = exported_api()
+    settings = f"/api/export/s/{api['id']}/settings"
+    client.put(settings, json={'rate_limit_enabled': True, 'rate_limit_per_second': 0.5, 'rate_limit_burst': 1})
+    headers = {'X-API-Key': api['api_key']}
+    assert client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers).status_code == 200
+    assert client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers).status_code == 429
+
+    client.put(settings, json={'rate_limit_enabled': False})
+    assert client.post(f"/api/predict/{api['id']}", json=RECORD, headers=headers).status_code == 200
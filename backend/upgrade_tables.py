@@ -0,0 +1,64 @@
+"""Script pour ajouter aux tables existantes les colonnes ajoutées aux modèles
+
+db.create_all() crée les tables manquantes mais ne modifie pas les tables
+existantes: ce script compare chaque table aux modèles SQLAlchemy et ajoute
+les colonnes absentes (ALTER TABLE ... ADD COLUMN), avec leur valeur par
+défaut pour les lignes existantes.
+"""
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text, literal
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+load_dotenv()
+
+from app import create_app
+from extensions import db
+
+
+def column_definition(column, dialect):
+    """Construit la définition SQL d'une colonne à ajouter"""
+    definition = f"{column.name} {column.type.compile(dialect=dialect)}"
+
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        value = literal(default).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+        definition += f" DEFAULT {value}"
+        if not column.nullable:
+            definition += " NOT NULL"
+
+    return definition
+
+
+def upgrade_tables():
+    """Ajoute les colonnes manquantes des tables existantes"""
+    app = create_app()
+    with app.app_context():
+        inspector = inspect(db.engine)
+        existing_tables = set(inspector.get_table_names())
+        added = 0
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                definition = column_definition(column, db.engine.dialect)
+                with db.engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+                print(f"✓ Colonne ajoutée: {table.name}.{definition}")
+                added += 1
+
+        # Tables absentes (nouveaux modèles)
+        db.create_all()
+        print(f"✓ {added} colonne(s) ajoutée(s)")
+
+
+if __name__ == '__main__':
+    print("Mise à jour du schéma de la base de données...")
+    upgrade_tables()
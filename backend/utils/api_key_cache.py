@@ -0,0 +1,116 @@
+"""Cache en mémoire des clés API résolues"""
+import time
+import hashlib
+import threading
+
+
+class ResolvedModel:
+    """Copie détachée des champs de MLModel utilisés pour servir les prédictions"""
+
+    def __init__(self, ml_model):
+        self.id = ml_model.id
+        self.name = ml_model.name
+        self.inputs = list(ml_model.inputs or [])
+        self.outputs = list(ml_model.outputs or [])
+        self.algorithm = ml_model.algorithm
+        self.model_path = ml_model.model_path
+        self.trained_at = ml_model.trained_at
+
+
+class ResolvedAPI:
+    """
+    Copie détachée d'une ExportedAPI et de son modèle
+
+    Expose les mêmes attributs que l'objet SQLAlchemy pour les routes de
+    prédiction, sans session ni requête en base.
+    """
+
+    def __init__(self, api):
+        self.id = api.id
+        self.model_id = api.model_id
+        self.status = api.status
+        self.created_at = api.created_at
+        self.micro_batch_enabled = api.micro_batch_enabled
+        self.micro_batch_window_ms = api.micro_batch_window_ms
+        self.micro_batch_max_size = api.micro_batch_max_size
+        self.result_cache_enabled = api.result_cache_enabled
+        self.result_cache_ttl = api.result_cache_ttl
+        self.result_cache_max_entries = api.result_cache_max_entries
+        self.rate_limit_enabled = api.rate_limit_enabled
+        self.rate_limit_per_second = api.rate_limit_per_second
+        self.rate_limit_burst = api.rate_limit_burst
+        self.max_in_flight = api.max_in_flight
+        self.model = ResolvedModel(api.model)
+
+
+class APIKeyCache:
+    """
+    Cache TTL des clés API résolues
+
+    Les entrées sont indexées par l'empreinte SHA-256 de la clé (la clé en
+    clair n'est pas conservée en mémoire). Seules les clés valides sont mises
+    en cache; les invalidations explicites couvrent les changements faits par
+    ce processus, le TTL borne le retard des autres workers.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # empreinte -> (expiration, ResolvedAPI)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _fingerprint(api_key):
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+    def get(self, api_key):
+        """Retourne l'API résolue si elle est en cache et non expirée, None sinon"""
+        fingerprint = self._fingerprint(api_key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[fingerprint]
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry[1]
+
+    def put(self, api_key, resolved):
+        """Met en cache une API résolue (sans effet si le TTL vaut 0)"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[self._fingerprint(api_key)] = (time.monotonic() + self.ttl, resolved)
+
+    def invalidate_api(self, api_id):
+        """Supprime les entrées d'une API"""
+        with self._lock:
+            self._drop(lambda resolved: resolved.id == api_id)
+
+    def invalidate_model(self, model_id):
+        """Supprime les entrées des APIs d'un modèle (réentraîné ou supprimé)"""
+        with self._lock:
+            self._drop(lambda resolved: resolved.model_id == model_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Retourne la taille du cache et les compteurs hits/misses"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+    def _drop(self, predicate):
+        """Supprime les entrées correspondant au prédicat (verrou déjà acquis)"""
+        stale = [key for key, (_, resolved) in self._entries.items() if predicate(resolved)]
+        for key in stale:
+            del self._entries[key]
@@ -59,23 +59,49 @@ class FileHandler:
     def read_csv_file(file_path):
         """Lit un fichier CSV avec pandas - détecte automatiquement le délimiteur"""
         try:
-            # Essayer de détecter le délimiteur automatiquement
-            with open(file_path, 'r', encoding='utf-8') as f:
-                first_line = f.readline()
-                # Détecter le délimiteur le plus probable
-                if ';' in first_line and first_line.count(';') > first_line.count(','):
-                    delimiter = ';'
-                elif '\t' in first_line:
-                    delimiter = '\t'
-                else:
-                    delimiter = ','
-            
             # Lire le CSV avec le délimiteur détecté
-            df = pd.read_csv(file_path, sep=delimiter)
+            df = pd.read_csv(file_path, sep=FileHandler.detect_delimiter(file_path))
             return df
         except Exception as e:
             raise ValueError(f"Erreur lors de la lecture du CSV: {str(e)}")
     
+    @staticmethod
+    def detect_delimiter(file_path):
+        """Détecte le délimiteur le plus probable à partir de la première ligne"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+        
+        return FileHandler.delimiter_of(first_line)
+    
+    @staticmethod
+    def delimiter_of(line):
+        """Délimiteur le plus probable d'une ligne d'en-tête (';', tabulation ou ',')"""
+        if ';' in line and line.count(';') > line.count(','):
+            return ';'
+        elif '\t' in line:
+            return '\t'
+        return ','
+    
+    @staticmethod
+    def iter_csv_chunks(file_path, chunk_size, dtype=None):
+        """
+        Lit un CSV par morceaux (même détection du délimiteur que read_csv_file)
+        
+        Args:
+            file_path: Chemin du fichier
+            chunk_size: Nombre de lignes par morceau
+            dtype: Types imposés par colonne (ex: str pour les colonnes catégorielles)
+            
+        Returns:
+            Itérateur de DataFrames
+        """
+        return pd.read_csv(
+            file_path,
+            sep=FileHandler.detect_delimiter(file_path),
+            chunksize=chunk_size,
+            dtype=dtype
+        )
+    
     @staticmethod
     def extract_column_info(df):
         """Extrait les informations sur les colonnes"""
@@ -0,0 +1,58 @@
+"""Histogramme à seaux fixes, thread-safe"""
+import bisect
+import threading
+
+
+class Histogram:
+    """
+    Compte les observations par seau (bornes supérieures inclusives)
+
+    Les comptes exposés sont cumulatifs ("le"), comme les histogrammes
+    Prometheus; les observations au-delà de la dernière borne tombent
+    dans le seau "+Inf".
+    """
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self):
+        """
+        Retourne l'état de l'histogramme
+
+        Returns:
+            dict: count, sum, mean et buckets [{le, count}] cumulatifs
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total = self._sum
+
+        cumulative = 0
+        buckets = []
+        for bound, value in zip(self.buckets + ['+Inf'], counts):
+            cumulative += value
+            buckets.append({'le': bound, 'count': cumulative})
+
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else None,
+            'buckets': buckets
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
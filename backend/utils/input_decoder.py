@@ -0,0 +1,227 @@
+"""Décodage des entrées JSON directement en matrice numpy"""
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+
+
+class InputSpec:
+    """
+    Spécification compilée des entrées d'un modèle: ordre des colonnes,
+    colonnes numériques et vocabulaires des colonnes catégorielles
+
+    Décode les objets JSON directement dans une matrice float64 préallouée,
+    avec le même encodage qu'à l'entraînement (catégorie inconnue -> -1,
+    valeur manquante -> NaN pour les colonnes numériques, 'nan' pour les
+    catégorielles), sans passer par un DataFrame pandas.
+    """
+
+    def __init__(self, columns, category_maps=None):
+        self.columns = list(columns)
+        self.category_maps = dict(category_maps or {})
+        self._required = frozenset(self.columns)
+        # (position, colonne, vocabulaire ou None pour une colonne numérique)
+        self._fields = [(j, col, self.category_maps.get(col)) for j, col in enumerate(self.columns)]
+        numeric = [(j, col) for j, col, mapping in self._fields if mapping is None]
+        self._numeric_positions = [j for j, _ in numeric]
+        # itemgetter sur plusieurs clés retourne un tuple: extraction de tout le bloc numérique en C
+        self._numeric_getter = itemgetter(*[col for _, col in numeric]) if len(numeric) > 1 else None
+
+    @property
+    def n_columns(self):
+        return len(self.columns)
+
+    def decode(self, record):
+        """
+        Décode un enregistrement en matrice (1, n_colonnes)
+
+        Args:
+            record: Dictionnaire {colonne: valeur}
+
+        Returns:
+            numpy array: Ligne encodée, prête pour l'imputer/scaler
+        """
+        self._check_record(record)
+        row = np.empty((1, len(self._fields)), dtype=np.float64)
+        for j, col, mapping in self._fields:
+            value = record[col]
+            if mapping is None:
+                row[0, j] = self._to_float(col, value)
+            else:
+                row[0, j] = self._category_code(mapping, value)
+        return row
+
+    def decode_records(self, records):
+        """
+        Décode un lot d'enregistrements colonne par colonne
+
+        Les lignes invalides (pas un objet, colonne manquante, valeur non
+        numérique) sont écartées et signalées sans faire échouer le lot.
+
+        Args:
+            records: Liste de dictionnaires
+
+        Returns:
+            tuple: (matrice des lignes valides, indices de ces lignes, erreurs par ligne)
+        """
+        errors = {}
+        valid_indices = []
+        required = self._required
+        for index, record in enumerate(records):
+            # Test en ligne pour le cas courant; _check_record construit le message d'erreur
+            if isinstance(record, dict) and record.keys() >= required:
+                valid_indices.append(index)
+                continue
+            try:
+                self._check_record(record)
+            except ValueError as e:
+                errors[index] = str(e)
+
+        rows = [records[index] for index in valid_indices]
+        X = np.empty((len(rows), len(self._fields)), dtype=np.float64)
+        invalid_rows = {}
+
+        numeric_done = False
+        if self._numeric_getter is not None and rows:
+            try:
+                # Chemin rapide: tout le bloc numérique converti en une passe
+                # (échoue sur None ou une valeur non numérique: repli colonne par colonne)
+                block = np.fromiter(
+                    chain.from_iterable(map(self._numeric_getter, rows)),
+                    dtype=np.float64,
+                    count=len(rows) * len(self._numeric_positions)
+                )
+                X[:, self._numeric_positions] = block.reshape(len(rows), -1)
+                numeric_done = True
+            except (TypeError, ValueError):
+                pass
+
+        for j, col, mapping in self._fields:
+            if mapping is None and numeric_done:
+                continue
+            values = [row[col] for row in rows]
+            if mapping is not None:
+                code = self._category_code
+                X[:, j] = [
+                    mapping.get(value, -1) if value.__class__ is str else code(mapping, value)
+                    for value in values
+                ]
+                continue
+            try:
+                # Chemin rapide: conversion de toute la colonne en C (None -> NaN)
+                X[:, j] = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                # Conversion valeur par valeur pour identifier les lignes fautives
+                for position, value in enumerate(values):
+                    try:
+                        X[position, j] = self._to_float(col, value)
+                    except ValueError as e:
+                        invalid_rows.setdefault(position, str(e))
+
+        if invalid_rows:
+            keep = np.ones(len(rows), dtype=bool)
+            for position, message in invalid_rows.items():
+                keep[position] = False
+                errors[valid_indices[position]] = message
+            X = X[keep]
+            valid_indices = [index for position, index in enumerate(valid_indices) if keep[position]]
+
+        return X, valid_indices, [
+            {'index': index, 'error': errors[index]} for index in sorted(errors)
+        ]
+
+    def decode_array(self, array):
+        """
+        Décode un tableau numpy (corps .npy) en matrice (n, n_colonnes)
+
+        - tableau structuré à une dimension: un champ par colonne d'entrée,
+          les champs texte sont encodés comme les catégories JSON
+        - tableau numérique à deux dimensions: colonnes dans l'ordre de
+          self.columns, pour les modèles sans colonne catégorielle; un
+          tableau float64 est utilisé tel quel, sans copie
+
+        Les NaN sont des valeurs manquantes, imputées comme null en JSON.
+
+        Args:
+            array: numpy array
+
+        Returns:
+            numpy array: Matrice encodée, prête pour l'imputer/scaler
+        """
+        if array.dtype.names:
+            if array.ndim != 1:
+                raise ValueError("Un tableau structuré doit avoir une seule dimension (une ligne par élément)")
+            missing = [col for col in self.columns if col not in array.dtype.names]
+            if missing:
+                raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+
+            X = np.empty((len(array), len(self._fields)), dtype=np.float64)
+            for j, col, mapping in self._fields:
+                values = array[col]
+                if mapping is not None:
+                    X[:, j] = self._category_codes(mapping, values)
+                elif values.dtype.kind in 'biuf':
+                    X[:, j] = values
+                else:
+                    raise ValueError(f"Colonne '{col}': valeur numérique attendue, reçu le type {values.dtype}")
+            return X
+
+        if array.ndim != 2 or array.shape[1] != len(self._fields):
+            raise ValueError(
+                f"Tableau de forme (n, {len(self._fields)}) attendu (colonnes: {', '.join(self.columns)}), "
+                f"reçu {array.shape}"
+            )
+        if array.dtype.kind not in 'biuf':
+            raise ValueError(f"Tableau numérique attendu, reçu le type {array.dtype}")
+        if self.category_maps:
+            raise ValueError(
+                f"Colonnes catégorielles ({', '.join(self.category_maps)}): "
+                "envoyer un tableau structuré avec des champs texte"
+            )
+        return np.asarray(array, dtype=np.float64)
+
+    def sample_record(self):
+        """Enregistrement factice valide (0 ou première catégorie connue)"""
+        return {
+            col: next(iter(mapping)) if mapping else 0.0
+            for _, col, mapping in self._fields
+        }
+
+    def _check_record(self, record):
+        if not isinstance(record, dict):
+            raise ValueError("Les données doivent être un objet JSON")
+        if not record.keys() >= self._required:
+            missing = [col for col in self.columns if col not in record]
+            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+
+    @staticmethod
+    def _to_float(col, value):
+        if value is None:
+            return np.nan
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                pass
+        raise ValueError(f"Colonne '{col}': valeur numérique attendue, reçu {value!r}")
+
+    @staticmethod
+    def _category_code(mapping, value):
+        # Même conversion qu'à l'entraînement: astype(str), valeur manquante -> 'nan'
+        if value is None:
+            value = 'nan'
+        elif not isinstance(value, str):
+            value = str(value)
+        return mapping.get(value, -1)
+
+    @staticmethod
+    def _category_codes(mapping, values):
+        """Codes d'une colonne numpy: chaque valeur distincte n'est encodée qu'une fois"""
+        if values.dtype.kind == 'S':
+            values = values.astype('U')
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.array(
+            [InputSpec._category_code(mapping, value.item()) for value in uniques], dtype=np.float64
+        )
+        return codes[inverse]
@@ -0,0 +1,101 @@
+"""Familles de métriques en mémoire et format texte Prometheus"""
+import threading
+from utils.histogram import Histogram
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    """{'api_id': 1, 'status': 200} -> '{api_id="1",status="200"}' ('' sans labels)"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def format_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_family(name, metric_type, help_text, samples):
+    """
+    Bloc texte d'une métrique (format d'exposition Prometheus 0.0.4)
+
+    Args:
+        name: Nom de la métrique
+        metric_type: 'counter', 'gauge' ou 'histogram'
+        help_text: Description (ligne # HELP)
+        samples: Liste de (suffixe, labels, valeur)
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+    return '\n'.join(lines)
+
+
+class CounterFamily:
+    """Compteurs indexés par valeurs de labels"""
+
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # tuple de valeurs -> total
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, value=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+        samples = [('', dict(zip(self.labelnames, labelvalues)), value) for labelvalues, value in items]
+        return render_family(self.name, 'counter', self.help_text, samples)
+
+
+class HistogramFamily:
+    """Histogrammes (utils/histogram.py) indexés par valeurs de labels, mêmes seaux pour tous"""
+
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._histograms = {}  # tuple de valeurs -> Histogram
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        histogram = self._histograms.get(labelvalues)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(labelvalues, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._histograms.items(), key=lambda item: tuple(map(str, item[0])))
+
+        samples = []
+        for labelvalues, histogram in items:
+            labels = dict(zip(self.labelnames, labelvalues))
+            snapshot = histogram.snapshot()
+            for bucket in snapshot['buckets']:
+                le = bucket['le'] if bucket['le'] == '+Inf' else format_value(float(bucket['le']))
+                samples.append(('_bucket', {**labels, 'le': le}, bucket['count']))
+            samples.append(('_sum', labels, snapshot['sum']))
+            samples.append(('_count', labels, snapshot['count']))
+        return render_family(self.name, 'histogram', self.help_text, samples)
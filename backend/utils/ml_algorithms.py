@@ -3,15 +3,9 @@ import time
 import numpy as np
 import pandas as pd
 import logging
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.svm import SVC, SVR
-from sklearn.metrics import accuracy_score, r2_score, mean_squared_error, mean_absolute_error
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.impute import SimpleImputer
+
+# scikit-learn est importé dans les méthodes d'entraînement: un worker qui
+# ne fait que servir des prédictions ne charge pas toute la pile d'entraînement
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +49,9 @@ class MLAlgorithms:
     @staticmethod
     def preprocess_data(X_train, X_test, y_train, y_test):
         """Prétraite les données: encode les catégories, gère les valeurs manquantes et normalise"""
+        from sklearn.preprocessing import StandardScaler, LabelEncoder
+        from sklearn.impute import SimpleImputer
+        
         try:
             # Convertir en DataFrame pour faciliter le traitement
             X_train_df = pd.DataFrame(X_train) if not isinstance(X_train, pd.DataFrame) else X_train.copy()
@@ -62,12 +59,12 @@ class MLAlgorithms:
             
             # Identifier les colonnes catégorielles (object/string)
             categorical_columns = X_train_df.select_dtypes(include=['object']).columns.tolist()
+            label_encoders = {}
             
             if categorical_columns:
                 logger.info(f"Colonnes catégorielles détectées: {categorical_columns}")
                 
                 # Encoder les colonnes catégorielles
-                label_encoders = {}
                 for col in categorical_columns:
                     le = LabelEncoder()
                     # Fit sur train
@@ -96,11 +93,11 @@ class MLAlgorithms:
             logger.info(f"Données prétraitées: {X_train_scaled.shape[0]} samples d'entraînement, {X_test_scaled.shape[0]} samples de test")
             logger.info(f"Features après encodage: {X_train_scaled.shape[1]}")
             
-            return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer
+            return X_train_scaled, X_test_scaled, y_train, y_test, scaler, imputer, label_encoders
         except Exception as e:
             logger.error(f"Erreur lors du prétraitement: {str(e)}", exc_info=True)
             # Retourner les données originales en cas d'erreur
-            return X_train, X_test, y_train, y_test, None, None
+            return X_train, X_test, y_train, y_test, None, None, {}
     
     @staticmethod
     def detect_problem_type(y_data):
@@ -133,6 +130,9 @@ class MLAlgorithms:
     @staticmethod
     def train_linear_regression(X_train, X_test, y_train, y_test):
         """Entraîne un modèle de régression linéaire"""
+        from sklearn.linear_model import LinearRegression
+        from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+        
         model = LinearRegression()
         model.fit(X_train, y_train)
         y_pred = model.predict(X_test)
@@ -152,6 +152,9 @@ class MLAlgorithms:
     @staticmethod
     def train_logistic_regression(X_train, X_test, y_train, y_test):
         """Entraîne un modèle de régression logistique"""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.metrics import accuracy_score
+        
         model = LogisticRegression(max_iter=1000, random_state=42)
         model.fit(X_train, y_train)
         y_pred = model.predict(X_test)
@@ -165,6 +168,9 @@ class MLAlgorithms:
     @staticmethod
     def train_knn(X_train, X_test, y_train, y_test, problem_type):
         """Entraîne un modèle KNN"""
+        from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
+        from sklearn.metrics import accuracy_score, r2_score, mean_squared_error, mean_absolute_error
+        
         if problem_type == 'classification':
             model = KNeighborsClassifier(n_neighbors=5)
             model.fit(X_train, y_train)
@@ -183,6 +189,9 @@ class MLAlgorithms:
     @staticmethod
     def train_decision_tree(X_train, X_test, y_train, y_test, problem_type):
         """Entraîne un arbre de décision"""
+        from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+        from sklearn.metrics import accuracy_score, r2_score, mean_squared_error, mean_absolute_error
+        
         if problem_type == 'classification':
             model = DecisionTreeClassifier(random_state=42)
             model.fit(X_train, y_train)
@@ -201,6 +210,9 @@ class MLAlgorithms:
     @staticmethod
     def train_random_forest(X_train, X_test, y_train, y_test, problem_type):
         """Entraîne un Random Forest"""
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        from sklearn.metrics import accuracy_score, r2_score, mean_squared_error, mean_absolute_error
+        
         if problem_type == 'classification':
             model = RandomForestClassifier(n_estimators=100, random_state=42)
             model.fit(X_train, y_train)
@@ -219,6 +231,9 @@ class MLAlgorithms:
     @staticmethod
     def train_svm(X_train, X_test, y_train, y_test, problem_type):
         """Entraîne un SVM"""
+        from sklearn.svm import SVC, SVR
+        from sklearn.metrics import accuracy_score, r2_score, mean_squared_error, mean_absolute_error
+        
         if problem_type == 'classification':
             model = SVC(random_state=42)
             model.fit(X_train, y_train)
@@ -235,8 +250,13 @@ class MLAlgorithms:
         return model, score, metrics
     
     @staticmethod
-    def train_and_evaluate(algorithm, X_train, X_test, y_train, y_test, problem_type):
-        """Entraîne un algorithme et retourne le score"""
+    def train_and_evaluate(algorithm, X_train, X_test, y_train, y_test, problem_type, prepared=None):
+        """
+        Entraîne un algorithme et retourne le score
+        
+        prepared: résultat de preprocess_data déjà calculé pour ces données
+        (partagé entre les algorithmes d'un même test), sinon calculé ici
+        """
         start_time = time.time()
         
         try:
@@ -244,8 +264,10 @@ class MLAlgorithms:
             logger.info(f"Forme des données: X_train={X_train.shape}, X_test={X_test.shape}")
             
             # Prétraiter les données
-            X_train_processed, X_test_processed, y_train_processed, y_test_processed, scaler, imputer = \
-                MLAlgorithms.preprocess_data(X_train, X_test, y_train, y_test)
+            if prepared is None:
+                prepared = MLAlgorithms.preprocess_data(X_train, X_test, y_train, y_test)
+            X_train_processed, X_test_processed, y_train_processed, y_test_processed, scaler, imputer, label_encoders = \
+                prepared
             
             if algorithm == 'linear_regression':
                 model, score, metrics = MLAlgorithms.train_linear_regression(
@@ -297,7 +319,8 @@ class MLAlgorithms:
                 'training_time': round(training_time, 2),
                 'model_instance': model,
                 'scaler': scaler,
-                'imputer': imputer
+                'imputer': imputer,
+                'label_encoders': label_encoders
             }
         except Exception as e:
             logger.error(f"Erreur lors de l'entraînement de {algorithm}: {str(e)}", exc_info=True)
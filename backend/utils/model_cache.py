@@ -0,0 +1,198 @@
+"""Cache LRU des modèles chargés, borné en octets et thread-safe"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ModelCache:
+    """
+    Cache LRU des modèles chargés en mémoire
+
+    La capacité est exprimée en octets: chaque entrée est comptée pour sa taille
+    estimée (taille du fichier sérialisé), si bien qu'un gros Random Forest
+    occupe autant de budget que plusieurs petits modèles linéaires.
+
+    Les clés sont des tuples (identifiant, version[, partie]): stocker une
+    nouvelle version d'un identifiant remplace les versions précédentes (et
+    leurs parties), si bien qu'un modèle réentraîné est rechargé sans toucher
+    aux autres entrées. Les parties d'une même version coexistent.
+
+    Toutes les opérations sont protégées par un verrou, et un verrou par clé
+    garantit qu'un modèle absent n'est chargé qu'une seule fois même si
+    plusieurs threads le demandent en même temps.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé -> (valeur, taille en octets)
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._loading_locks = {}
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._loads = 0
+        self._load_errors = 0
+        self._oversized = 0
+        self._total_load_time = 0.0
+        self._max_load_time = 0.0
+
+    def configure(self, max_bytes):
+        """Modifie la capacité et évince si nécessaire"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_until(0)
+
+    def get(self, key):
+        """
+        Retourne la valeur en cache (et la marque comme récemment utilisée)
+
+        Returns:
+            La valeur, ou None si absente
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def get_or_load(self, key, loader):
+        """
+        Retourne la valeur en cache ou la charge via loader
+
+        Args:
+            key: Clé du cache
+            loader: Fonction sans argument retournant (valeur, taille en octets)
+
+        Returns:
+            La valeur en cache ou nouvellement chargée
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        with loading_lock:
+            # Un autre thread a pu charger la valeur pendant l'attente
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+
+            start = time.perf_counter()
+            try:
+                value, size = loader()
+            except Exception:
+                with self._lock:
+                    self._load_errors += 1
+                    self._loading_locks.pop(key, None)
+                raise
+
+            load_time = time.perf_counter() - start
+            with self._lock:
+                self._loads += 1
+                self._total_load_time += load_time
+                self._max_load_time = max(self._max_load_time, load_time)
+                self._store(key, value, size)
+                self._loading_locks.pop(key, None)
+
+            return value
+
+    def put(self, key, value, size):
+        """Ajoute ou remplace une entrée"""
+        with self._lock:
+            self._store(key, value, size)
+
+    def invalidate(self, key):
+        """Supprime une entrée; retourne True si elle existait"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._current_bytes -= entry[1]
+            return True
+
+    def invalidate_id(self, identifier):
+        """Supprime toutes les versions d'un identifiant; retourne le nombre d'entrées supprimées"""
+        with self._lock:
+            return self._drop_versions(identifier)
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache
+
+        Returns:
+            dict: Occupation, hits/misses, évictions et temps de chargement
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'oversized_rejections': self._oversized,
+                'loads': self._loads,
+                'load_errors': self._load_errors,
+                'total_load_time': round(self._total_load_time, 4),
+                'avg_load_time': round(self._total_load_time / self._loads, 4) if self._loads else 0.0,
+                'max_load_time': round(self._max_load_time, 4),
+                # Du plus récemment au moins récemment utilisé
+                'items': [
+                    {'key': str(key), 'size_bytes': size}
+                    for key, (_, size) in reversed(self._entries.items())
+                ]
+            }
+
+    def _store(self, key, value, size):
+        """Insère une entrée (verrou déjà acquis)"""
+        # Les anciennes versions du même identifiant sont obsolètes (et l'entrée remplacée)
+        stale = [
+            existing for existing in self._entries
+            if existing[0] == key[0] and (existing[1] != key[1] or existing == key)
+        ]
+        for existing in stale:
+            _, size_removed = self._entries.pop(existing)
+            self._current_bytes -= size_removed
+
+        if size > self.max_bytes:
+            # Trop gros pour le cache: la valeur est utilisée sans être conservée
+            self._oversized += 1
+            return
+
+        self._evict_until(size)
+        self._entries[key] = (value, size)
+        self._current_bytes += size
+
+    def _drop_versions(self, identifier):
+        """Supprime toutes les entrées d'un identifiant (verrou déjà acquis)"""
+        stale = [key for key in self._entries if key[0] == identifier]
+        for key in stale:
+            _, size = self._entries.pop(key)
+            self._current_bytes -= size
+        return len(stale)
+
+    def _evict_until(self, incoming_size):
+        """Évince les entrées les moins récemment utilisées (verrou déjà acquis)"""
+        while self._entries and self._current_bytes + incoming_size > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._current_bytes -= size
+            self._evictions += 1
@@ -0,0 +1,144 @@
+"""Chargement des modèles entraînés, avec cache LRU (sans Flask ni base de données)"""
+import os
+import logging
+import joblib
+from utils.model_pipeline import ModelPipeline
+from utils.compiled_predictor import compiled_path
+from utils.model_cache import ModelCache
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """
+    Charge les pipelines des modèles depuis leurs fichiers .pkl et les garde
+    dans un ModelCache (un par processus)
+
+    N'importe que joblib, numpy et les pipelines: les processus des jobs de
+    scoring l'utilisent sans importer l'application Flask ni les modèles
+    SQLAlchemy. Dans le serveur, PredictionService passe par lui.
+    """
+
+    cache = ModelCache(max_bytes=1024 * 1024 * 1024)
+
+    # Mode mmap de joblib.load ('r': les tableaux numpy restent dans le page cache,
+    # partagés entre les processus workers au lieu d'être copiés dans chaque tas)
+    mmap_mode = None
+
+    @staticmethod
+    def configure(cache_max_bytes, mmap_mode=None):
+        """Règle la capacité du cache et le mode mmap"""
+        ModelLoader.cache.configure(cache_max_bytes)
+        ModelLoader.mmap_mode = mmap_mode
+
+    @staticmethod
+    def version(ml_model):
+        """
+        Calcule la version d'un modèle pour la clé du cache
+
+        Args:
+            ml_model: MLModel ou ResolvedModel
+
+        Returns:
+            str: Date d'entraînement, ou date de modification du fichier à défaut
+        """
+        if ml_model.trained_at:
+            return ml_model.trained_at.isoformat()
+
+        try:
+            return str(os.stat(ml_model.model_path).st_mtime_ns)
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def load(ml_model):
+        """
+        Charge le pipeline du modèle depuis le fichier .pkl (ou sa version compilée)
+
+        Args:
+            ml_model: MLModel ou ResolvedModel
+
+        Returns:
+            ModelPipeline ou CompiledPipeline: Le pipeline chargé (prétraitement + estimateur)
+        """
+        model_id = ml_model.id
+        model_path = ml_model.model_path
+        inputs = ml_model.inputs
+        version = ModelLoader.version(ml_model)
+        mmap_mode = ModelLoader.mmap_mode
+
+        def loader():
+            # Charger depuis le fichier
+            if not model_path or not os.path.exists(model_path):
+                raise ValueError(f"Fichier du modèle introuvable: {model_path}")
+
+            # Version compilée (numpy seul) si l'algorithme est supporté: pas
+            # d'import de scikit-learn et un predict sans validation d'entrée
+            path = compiled_path(model_path)
+            if not os.path.exists(path):
+                path = model_path
+
+            try:
+                # Les anciens fichiers ne contiennent que l'estimateur
+                model = ModelPipeline.wrap(joblib.load(path, mmap_mode=mmap_mode), inputs)
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du modèle {model_id}: {str(e)}")
+                raise ValueError(f"Impossible de charger le modèle: {str(e)}")
+
+            if path != model_path:
+                # Gros lots des forêts: estimateur d'origine chargé à la demande, en cache à part
+                model.source_loader = lambda: ModelLoader.load_source_estimator(
+                    model_id, version, model_path, inputs
+                )
+
+            # Fichier non compressé: sa taille approche l'empreinte mémoire du modèle
+            size = os.path.getsize(path)
+            logger.info(f"Modèle {model_id} chargé et mis en cache ({size} octets, {type(model).__name__})")
+            return model, size
+
+        # La version dans la clé fait recharger un modèle réentraîné sans redémarrage
+        return ModelLoader.cache.get_or_load((model_id, version), loader)
+
+    @staticmethod
+    def warm(ml_model):
+        """
+        Charge un modèle dans le cache et exécute une prédiction factice
+        (imports et chemins de code chauds avant la première requête)
+
+        Returns:
+            bool: False si le modèle ne tient pas dans le budget restant du cache
+        """
+        stats = ModelLoader.cache.stats()
+        size = os.path.getsize(ml_model.model_path) if ml_model.model_path and os.path.exists(ml_model.model_path) else 0
+        if stats['current_bytes'] + size > stats['max_bytes']:
+            return False
+
+        model = ModelLoader.load(ml_model)
+        model.predict_encoded(model.input_spec.decode(model.input_spec.sample_record()))
+        return True
+
+    @staticmethod
+    def load_source_estimator(model_id, version, model_path, inputs):
+        """
+        Estimateur scikit-learn d'origine d'un modèle compilé
+
+        Gardé dans une entrée distincte du cache (même identifiant et version,
+        partie 'source'): sa taille est comptée dans le budget, il est évincé
+        et invalidé comme le modèle et chargé avec le même mode mmap.
+
+        Returns:
+            Estimateur scikit-learn
+        """
+        mmap_mode = ModelLoader.mmap_mode
+
+        def loader():
+            try:
+                pipeline = ModelPipeline.wrap(joblib.load(model_path, mmap_mode=mmap_mode), inputs)
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement de l'estimateur d'origine du modèle {model_id}: {str(e)}")
+                raise ValueError(f"Impossible de charger le modèle: {str(e)}")
+            size = os.path.getsize(model_path)
+            logger.info(f"Estimateur d'origine du modèle {model_id} chargé et mis en cache ({size} octets)")
+            return pipeline.estimator, size
+
+        return ModelLoader.cache.get_or_load((model_id, version, 'source'), loader)
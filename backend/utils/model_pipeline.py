@@ -0,0 +1,98 @@
+"""Pipeline de prédiction sauvegardé avec le modèle"""
+import numpy as np
+from utils.input_decoder import InputSpec
+from utils.compiled_predictor import CompiledPipeline
+
+
+class ModelPipeline:
+    """
+    Regroupe tout ce qui a été ajusté à l'entraînement: encodeurs des colonnes
+    catégorielles, imputer, scaler, estimateur et ordre des colonnes d'entrée.
+
+    Sérialisé tel quel avec joblib, il garantit que le service de prédiction
+    applique exactement le prétraitement utilisé pour calculer le score.
+    """
+
+    def __init__(self, estimator, input_columns, label_encoders=None, imputer=None, scaler=None):
+        self.estimator = estimator
+        self.input_columns = list(input_columns)
+        self.imputer = imputer
+        self.scaler = scaler
+
+        # Dictionnaires catégorie -> code, appliqués avec Series.map (vectorisé)
+        self.category_maps = {
+            col: {category: code for code, category in enumerate(encoder.classes_)}
+            for col, encoder in (label_encoders or {}).items()
+        }
+        self._compile()
+
+    def _compile(self):
+        """Compile la spécification des entrées (recalculée au chargement, jamais sérialisée)"""
+        self.input_spec = InputSpec(self.input_columns, self.category_maps)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('input_spec', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
+
+    @classmethod
+    def wrap(cls, artifact, input_columns):
+        """
+        Retourne l'artefact s'il s'agit déjà d'un pipeline, sinon l'encapsule
+        (anciens fichiers .pkl ne contenant que l'estimateur)
+        """
+        if isinstance(artifact, (cls, CompiledPipeline)):
+            return artifact
+        return cls(artifact, input_columns)
+
+    def transform(self, X):
+        """
+        Applique l'encodage, l'imputation et la normalisation
+
+        Args:
+            X: DataFrame contenant les colonnes d'entrée (ou matrice dans l'ordre des colonnes)
+
+        Returns:
+            numpy array: Matrice prête pour l'estimateur
+        """
+        import pandas as pd
+
+        if isinstance(X, pd.DataFrame):
+            df = X[self.input_columns]
+        else:
+            df = pd.DataFrame(X, columns=self.input_columns)
+
+        if self.category_maps:
+            df = df.copy()
+            for col, mapping in self.category_maps.items():
+                # Même conversion qu'à l'entraînement (astype(str), valeur manquante -> 'nan'),
+                # les catégories inconnues sont encodées -1
+                values = df[col].astype(object).where(df[col].notna(), np.nan).astype(str)
+                df[col] = values.map(mapping).fillna(-1)
+
+        return self.transform_encoded(df.values.astype(float))
+
+    def transform_encoded(self, values):
+        """
+        Applique l'imputation et la normalisation à une matrice déjà encodée
+        (colonnes catégorielles converties en codes, voir InputSpec)
+        """
+        if self.imputer is not None:
+            values = self.imputer.transform(values)
+
+        if self.scaler is not None:
+            values = self.scaler.transform(values)
+
+        return values
+
+    def predict(self, X):
+        """Transforme les données puis prédit en un seul appel vectorisé"""
+        return self.estimator.predict(self.transform(X))
+
+    def predict_encoded(self, values):
+        """Prédit à partir d'une matrice produite par input_spec (sans pandas)"""
+        return self.estimator.predict(self.transform_encoded(values))
@@ -0,0 +1,78 @@
+"""Format binaire .npy des lots de prédiction (corps de requête et de réponse)"""
+import io
+import numpy as np
+from numpy.lib import format as npy_format
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+NPY_MIMETYPE = 'application/x-npy'
+
+
+def wants_npy(accept_header):
+    """True si le header Accept préfère une réponse .npy au JSON (JSON par défaut)"""
+    if not accept_header:
+        return False
+    accept = parse_accept_header(accept_header, MIMEAccept)
+    return accept.best_match(['application/json', NPY_MIMETYPE]) == NPY_MIMETYPE
+
+
+def load_npy(body):
+    """
+    Lit un tableau .npy sans copier les données
+
+    Le tableau retourné est une vue en lecture seule sur body (np.frombuffer):
+    du corps de la requête au modèle, seule la conversion en matrice float64
+    éventuelle alloue de la mémoire. Les tableaux d'objets (pickle) sont refusés.
+
+    Args:
+        body: Contenu du fichier .npy (bytes)
+
+    Returns:
+        numpy array
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = npy_format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(stream)
+        else:
+            # Version 3.0 (noms de champs UTF-8): lecture standard, avec copie
+            return np.load(stream, allow_pickle=False)
+    except (ValueError, SyntaxError, EOFError) as e:
+        raise ValueError(f"Fichier .npy invalide: {str(e)}")
+
+    if dtype.hasobject:
+        raise ValueError("Les tableaux .npy d'objets (pickle) ne sont pas acceptés")
+
+    count = int(np.prod(shape, dtype=np.int64))
+    offset = stream.tell()
+    if len(body) - offset != count * dtype.itemsize:
+        raise ValueError(f"Fichier .npy tronqué: {len(body) - offset} octets de données pour la forme {shape}")
+
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def dump_npy(array):
+    """
+    Sérialise des prédictions au format .npy
+
+    Les étiquettes de classe stockées en objets (colonnes texte du dataset)
+    sont converties en tableau de chaînes ou de nombres, sans pickle.
+    """
+    array = np.asarray(array)
+    if array.dtype.hasobject:
+        array = np.asarray(array.tolist())
+    stream = io.BytesIO()
+    np.save(stream, array, allow_pickle=False)
+    return stream.getvalue()
+
+
+def npy_headers(result):
+    """Métadonnées d'une réponse batch, transmises en headers avec un corps .npy"""
+    return {
+        'X-Model-Id': str(result['model_id']),
+        'X-Prediction-Count': str(result['count'])
+    }
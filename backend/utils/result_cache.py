@@ -0,0 +1,87 @@
+"""Cache des résultats de prédiction d'une API (TTL + LRU)"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Mémoïse les prédictions unitaires d'une API
+
+    La clé combine la version du modèle et une empreinte de la ligne déjà
+    décodée par InputSpec: l'ordre des colonnes est celui du modèle et deux
+    écritures équivalentes d'une même valeur ("1", 1, 1.0) donnent la même
+    clé. Les entrées expirent après ttl secondes; au-delà de max_entries,
+    la moins récemment utilisée est évincée.
+    """
+
+    def __init__(self, model_id, max_entries, ttl):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé -> (expiration, prédiction)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def make_key(model_version, X):
+        """
+        Clé canonique d'une ligne encodée pour une version du modèle
+
+        Args:
+            model_version: Version du modèle (date d'entraînement)
+            X: Ligne encodée (1, n_colonnes), float64
+
+        Returns:
+            tuple: (version, empreinte blake2b des octets de la ligne)
+        """
+        return model_version, hashlib.blake2b(X.tobytes(), digest_size=16).digest()
+
+    def get(self, key):
+        """Retourne la prédiction en cache, None si absente ou expirée"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key, prediction):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Retourne la taille et les compteurs du cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'model_id': self.model_id,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
@@ -0,0 +1,69 @@
+"""Lecture en flux des corps de requête CSV et NDJSON"""
+import io
+import csv
+import json
+from itertools import chain, islice
+from utils.file_handler import FileHandler
+
+
+def iter_csv_records(stream, encoding='utf-8-sig', delimiter=None):
+    """
+    Lit un CSV (ligne d'en-tête puis données) enregistrement par enregistrement
+
+    Les champs vides deviennent None, comme les NaN de pandas.read_csv à
+    l'entraînement; une ligne trop courte est complétée par des valeurs vides.
+
+    Args:
+        stream: Flux binaire (corps de la requête ou fichier uploadé)
+        encoding: Encodage du texte (utf-8-sig ignore le BOM d'Excel)
+        delimiter: Séparateur des champs (défaut: détecté sur l'en-tête, comme à l'upload)
+
+    Yields:
+        dict: {colonne: valeur}
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    first_line = text.readline()
+    if delimiter is None:
+        delimiter = FileHandler.delimiter_of(first_line)
+    reader = csv.reader(chain([first_line], text), delimiter=delimiter)
+    header = next(reader, None)
+    if not header:
+        return
+
+    width = len(header)
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        yield {col: (value if value != '' else None) for col, value in zip(header, row)}
+
+
+def iter_ndjson_records(stream):
+    """
+    Lit un flux NDJSON (un objet JSON par ligne), en ignorant les lignes vides
+
+    Une ligne qui n'est pas du JSON valide donne None: elle est signalée
+    comme erreur de ligne par InputSpec.decode_records sans arrêter le flux.
+
+    Yields:
+        dict: Enregistrement décodé (None si la ligne est invalide)
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_chunks(iterable, size):
+    """Regroupe un itérable en listes d'au plus size éléments"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
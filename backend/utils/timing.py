@@ -0,0 +1,78 @@
+"""Mesure des phases d'une requête de prédiction (header Server-Timing)"""
+import time
+from contextlib import contextmanager, nullcontext
+from flask import g, has_request_context
+
+
+class PhaseTimer:
+    """
+    Durées des phases d'une requête, mesurées avec une horloge monotone
+
+    Une phase mesurée plusieurs fois (plusieurs morceaux d'un lot par
+    exemple) est cumulée; l'ordre des phases est celui de leur première
+    mesure.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._phases = {}  # nom -> secondes
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        """Secondes écoulées depuis la création du timer"""
+        return time.perf_counter() - self.started_at
+
+    def durations(self):
+        """Retourne {phase: durée en secondes}"""
+        return dict(self._phases)
+
+    def durations_ms(self):
+        """Retourne {phase: durée en millisecondes}"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self._phases.items()}
+
+    def header(self):
+        """
+        Valeur du header Server-Timing, avec la durée totale écoulée
+
+        Exemple: "auth;dur=0.041, load;dur=0.012, predict;dur=0.380, total;dur=0.602"
+        """
+        total = self.elapsed() * 1000
+        parts = [f"{name};dur={duration}" for name, duration in self.durations_ms().items()]
+        parts.append(f"total;dur={round(total, 3)}")
+        return ', '.join(parts)
+
+
+def start_request_timer():
+    """Crée le PhaseTimer de la requête Flask en cours"""
+    g.phase_timer = PhaseTimer()
+    return g.phase_timer
+
+
+def current_timer():
+    """PhaseTimer de la requête en cours, None hors requête (threads, processus du pool)"""
+    if not has_request_context():
+        return None
+    return g.get('phase_timer')
+
+
+def timed(name):
+    """Mesure une phase de la requête en cours (sans effet hors requête)"""
+    timer = current_timer()
+    return timer.phase(name) if timer is not None else nullcontext()
+
+
+def record_phase(name, seconds):
+    """Ajoute une durée déjà mesurée à la requête en cours (sans effet hors requête)"""
+    timer = current_timer()
+    if timer is not None:
+        timer.add(name, seconds)
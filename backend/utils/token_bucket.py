@@ -0,0 +1,43 @@
+"""Seau à jetons (limitation de débit)"""
+import time
+
+
+class TokenBucket:
+    """
+    Seau de capacity jetons rempli à rate jetons par seconde
+
+    Chaque requête admise consomme un jeton: le débit moyen est borné par
+    rate, avec des rafales d'au plus capacity requêtes. Non thread-safe:
+    l'appelant protège l'accès (voir services/rate_limiter.py).
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def configure(self, rate, capacity):
+        """Change le débit et la capacité sans rendre les jetons déjà consommés"""
+        self._refill()
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, float(capacity))
+
+    def try_acquire(self):
+        """
+        Consomme un jeton s'il y en a un
+
+        Returns:
+            float: 0 si le jeton est accordé, sinon le délai en secondes avant le prochain jeton
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(float(self.capacity), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now